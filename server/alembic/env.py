@@ -29,6 +29,14 @@ target_metadata = Base.metadata
 # --- Debug (optional) ---
 print("Tables detected:", Base.metadata.tables.keys())
 
+# Bảng chỉ mục tìm kiếm (FTS5 + shadow tables, tsvector) được quản lý bằng DDL riêng
+# trong app/models/movie_search.py -> autogenerate không được đề xuất xóa chúng
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and compare_to is None:
+        return not (name.startswith("movies_fts") or name == "movie_search")
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,6 +59,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -74,7 +83,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,31 @@
+"""add_booking_expires_at
+
+Revision ID: a3f1c2d4e5b6
+Revises: dbd8c5c37193
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c2d4e5b6'
+down_revision: Union[str, Sequence[str], None] = 'dbd8c5c37193'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Hạn giữ ghế của booking pending (NULL = không giới hạn / đã thanh toán)
+    op.add_column('bookings', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_bookings_expires_at'), 'bookings', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_bookings_expires_at'), table_name='bookings')
+    op.drop_column('bookings', 'expires_at')
@@ -0,0 +1,54 @@
+"""partial_unique_active_booking_seat
+
+Revision ID: a9d4e2c7f016
+Revises: f2c7d9a4b1e3
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e2c7f016'
+down_revision: Union[str, Sequence[str], None] = 'f2c7d9a4b1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_WHERE = sa.text("status IN ('pending', 'confirmed')")
+
+
+def _drop_user_id_desc_index() -> None:
+    # Batch trên SQLite dựng lại bảng từ reflection, làm mất DESC của ix_bookings_user_id_id
+    # (f2c7d9a4b1e3) -> bỏ index trước batch rồi tạo lại tường minh sau đó
+    op.drop_index('ix_bookings_user_id_id', table_name='bookings')
+
+
+def _create_user_id_desc_index() -> None:
+    op.create_index('ix_bookings_user_id_id', 'bookings', ['user_id', sa.text('id DESC')], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # uq_showtime_seat tính cả booking đã hủy -> muốn đặt lại ghế phải xóa lịch sử.
+    # Thay bằng unique index chỉ trên booking active (SQLite: batch tạo lại bảng để bỏ constraint)
+    _drop_user_id_desc_index()
+    with op.batch_alter_table('bookings') as batch_op:
+        batch_op.drop_constraint('uq_showtime_seat', type_='unique')
+    _create_user_id_desc_index()
+    op.create_index(
+        'uq_bookings_showtime_seat_active', 'bookings', ['showtime_id', 'seat_id'], unique=True,
+        sqlite_where=ACTIVE_WHERE, postgresql_where=ACTIVE_WHERE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Thất bại nếu 1 ghế của suất chiếu đã có nhiều booking (lịch sử hủy rồi đặt lại)
+    op.drop_index('uq_bookings_showtime_seat_active', table_name='bookings')
+    _drop_user_id_desc_index()
+    with op.batch_alter_table('bookings') as batch_op:
+        batch_op.create_unique_constraint('uq_showtime_seat', ['showtime_id', 'seat_id'])
+    _create_user_id_desc_index()
@@ -0,0 +1,56 @@
+"""add_movie_search_index
+
+Revision ID: b7d2e9f04c1a
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e9f04c1a'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c2d4e5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Chỉ mục full-text cho tìm kiếm phim + nạp dữ liệu có sẵn
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5("
+            "title, description, genre, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO movies_fts (rowid, title, description, genre) "
+            "SELECT id, coalesce(title, ''), coalesce(description, ''), coalesce(genre, '') FROM movies"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS movie_search ("
+            "movie_id INTEGER PRIMARY KEY REFERENCES movies(id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_movie_search_document ON movie_search USING GIN (document)")
+        op.execute(
+            "INSERT INTO movie_search (movie_id, document) "
+            "SELECT id, "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(genre, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C') "
+            "FROM movies"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS movies_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP TABLE IF EXISTS movie_search")
@@ -0,0 +1,28 @@
+"""add_favorites_movie_id_index
+
+Revision ID: c41e8a7b9d20
+Revises: b7d2e9f04c1a
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e8a7b9d20'
+down_revision: Union[str, Sequence[str], None] = 'b7d2e9f04c1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Đếm like theo phim (GROUP BY movie_id) mà không quét toàn bảng favorites
+    op.create_index('ix_favorites_movie_id', 'favorites', ['movie_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_favorites_movie_id', table_name='favorites')
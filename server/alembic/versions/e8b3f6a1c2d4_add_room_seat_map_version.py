@@ -0,0 +1,29 @@
+"""add_room_seat_map_version
+
+Revision ID: e8b3f6a1c2d4
+Revises: c41e8a7b9d20
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3f6a1c2d4'
+down_revision: Union[str, Sequence[str], None] = 'c41e8a7b9d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Version của sơ đồ ghế (ETag cho GET /seats/room/{room_id}/map)
+    op.add_column('rooms', sa.Column('seat_map_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('rooms', 'seat_map_version')
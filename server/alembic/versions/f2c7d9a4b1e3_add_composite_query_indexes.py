@@ -0,0 +1,67 @@
+"""add_composite_query_indexes
+
+Revision ID: f2c7d9a4b1e3
+Revises: e8b3f6a1c2d4
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c7d9a4b1e3'
+down_revision: Union[str, Sequence[str], None] = 'e8b3f6a1c2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tên, bảng, cột) - khớp với các query nóng
+COMPOSITE_INDEXES = [
+    # BookingRepository.get_by_showtime: showtime_id = ? AND status IN ('pending', 'confirmed')
+    ('ix_bookings_showtime_id_status', 'bookings', ['showtime_id', 'status']),
+    # get_paginated_by_user_with_details: user_id = ? ORDER BY id DESC (không cần sort tạm)
+    ('ix_bookings_user_id_id', 'bookings', ['user_id', sa.text('id DESC')]),
+    # ShowtimeService.validate_conflict: room_id = ? AND start_time < ? AND end_time > ?
+    ('ix_showtimes_room_id_start_end', 'showtimes', ['room_id', 'start_time', 'end_time']),
+    # ShowtimeRepository.get_paginated_by_movie: movie_id = ? AND end_time >= now ORDER BY start_time
+    ('ix_showtimes_movie_id_end_start', 'showtimes', ['movie_id', 'end_time', 'start_time']),
+    # PaymentRepository.get_by_user (+ lọc theo status)
+    ('ix_payments_created_by_status', 'payments', ['created_by', 'status']),
+]
+
+# Index 1 cột đã nằm ở đầu index ghép ở trên -> bỏ để giảm chi phí ghi
+REDUNDANT_INDEXES = [
+    ('ix_bookings_showtime_id', 'bookings', ['showtime_id']),
+    ('ix_bookings_user_id', 'bookings', ['user_id']),
+    ('ix_showtimes_room_id', 'showtimes', ['room_id']),
+    ('ix_showtimes_movie_id', 'showtimes', ['movie_id']),
+    ('ix_payments_created_by', 'payments', ['created_by']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for name, table, columns in COMPOSITE_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    if dialect == 'postgresql':
+        # Partial index: seat hold chỉ quét booking pending còn hạn giữ ghế
+        op.create_index(
+            'ix_bookings_pending_expires_at', 'bookings', ['expires_at'], unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+        )
+    for name, table, _ in REDUNDANT_INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for name, table, columns in REDUNDANT_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    if dialect == 'postgresql':
+        op.drop_index('ix_bookings_pending_expires_at', table_name='bookings')
+    for name, table, _ in reversed(COMPOSITE_INDEXES):
+        op.drop_index(name, table_name=table)
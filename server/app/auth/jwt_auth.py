@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
@@ -9,25 +8,32 @@ from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.models.user import User
 from app.config.settings import settings
+from app.auth.token_cache import UserSnapshot, token_cache
+from app.auth.password_hasher import password_hasher
 
 # Cấu hình từ settings
 SECRET_KEY = settings.JWT_SECRET_KEY
 ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # HTTP Bearer token
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Xác minh mật khẩu"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Xác minh mật khẩu (bcrypt chạy trong process pool của password_hasher)"""
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash mật khẩu"""
-    return pwd_context.hash(password)
+    """Hash mật khẩu (bcrypt chạy trong process pool của password_hasher)"""
+    return password_hasher.hash(password)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Bản async của verify_password cho route async def"""
+    return await password_hasher.averify(plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    """Bản async của get_password_hash cho route async def"""
+    return await password_hasher.ahash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Tạo JWT access token"""
@@ -62,32 +68,56 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         return None
     return user
 
-def get_current_user_from_token(
+def _credentials_error(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """Lấy current user từ JWT token"""
+) -> UserSnapshot:
+    """
+    Lấy snapshot (id, role, trạng thái) của current user từ JWT token.
+    Token đã gặp được lấy từ token_cache: không decode lại JWT, không query DB.
+    """
     token = credentials.credentials
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached[1]
+
     payload = verify_token(token)
     
     user_id_raw = payload.get("sub")
     if user_id_raw is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error()
     
     # Convert to int (sub có thể là string hoặc int)
     user_id: int = int(user_id_raw) if isinstance(user_id_raw, str) else user_id_raw
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error("User not found")
+
+    snapshot = UserSnapshot.from_user(user)
+    token_cache.set(token, payload, snapshot)
+    return snapshot
+
+def get_current_user_from_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Lấy current user (ORM object đầy đủ) từ JWT token.
+    Chỉ dùng cho endpoint cần đọc / sửa profile; kiểm tra quyền dùng get_current_principal.
+    """
+    principal = get_current_principal(credentials, db)
+    # Cache miss vừa load user -> db.get lấy lại từ identity map, không query thêm
+    user = db.get(User, principal.id)
+    if user is None:
+        token_cache.invalidate_user(principal.id)
+        raise _credentials_error("User not found")
     
     return user
-
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from app.config.logger import logger
+from app.config.settings import settings
+
+# Password hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Chạy bcrypt (~100-250 ms CPU mỗi lần) trong process pool riêng để không chiếm
+    GIL của process phục vụ request.
+
+    Số job đang chạy + đang chờ bị giới hạn bởi max_pending: vượt quá -> 503
+    (kèm Retry-After) thay vì xếp hàng vô hạn. max_workers=0 -> hash ngay trong
+    thread gọi (dùng cho script / môi trường 1 core).
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    # -------------------- LIFECYCLE --------------------
+    def start(self) -> None:
+        """Tạo process pool trước (tránh request đầu tiên phải chờ khởi động worker)."""
+        with self._lock:
+            self._ensure_executor()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def configure(self, max_workers: int, max_pending: Optional[int] = None) -> None:
+        """Đổi số worker (vd. benchmark theo số core); pool cũ được tắt."""
+        self.shutdown()
+        self.max_workers = max_workers
+        if max_pending is not None:
+            self.max_pending = max_pending
+
+    def _ensure_executor(self) -> Optional[ProcessPoolExecutor]:
+        # Gọi khi đã giữ lock
+        if self.max_workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"[PasswordHasher] Started process pool with {self.max_workers} workers")
+        return self._executor
+
+    # -------------------- BACKPRESSURE --------------------
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, fn: Callable, *args) -> Optional[Future]:
+        """Gửi job vào pool; None nếu chạy inline (không có pool hoặc pool bị hỏng)."""
+        with self._lock:
+            executor = self._ensure_executor()
+        if executor is None:
+            return None
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            logger.error("[PasswordHasher] Process pool is broken, recreating it")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            return None
+
+    def _run(self, fn: Callable, *args):
+        self._acquire()
+        try:
+            future = self._submit(fn, *args)
+            return fn(*args) if future is None else future.result()
+        finally:
+            self._release()
+
+    async def _arun(self, fn: Callable, *args):
+        self._acquire()
+        try:
+            future = self._submit(fn, *args)
+            if future is None:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.wrap_future(future)
+        finally:
+            self._release()
+
+    # -------------------- PUBLIC API --------------------
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._run(_verify, password, hashed_password)
+
+    async def ahash(self, password: str) -> str:
+        """Bản async: chờ kết quả trên event loop, không giữ thread nào."""
+        return await self._arun(_hash, password)
+
+    async def averify(self, password: str, hashed_password: str) -> bool:
+        return await self._arun(_verify, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -1,7 +1,9 @@
 from fastapi import Depends, HTTPException, status, Security
-from fastapi.security import HTTPBearer
-from app.auth.jwt_auth import get_current_user_from_token
-from app.models.user import User
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from app.auth.jwt_auth import get_current_principal
+from app.auth.token_cache import UserSnapshot
+from app.config.database import get_db
 from typing import Optional
 
 def requires_role(*roles: str):
@@ -9,7 +11,7 @@ def requires_role(*roles: str):
     Decorator dùng để giới hạn quyền truy cập theo vai trò (role).
     Ví dụ: @router.post("/movies", dependencies=[Depends(requires_role("admin"))])
     """
-    def role_checker(current_user: User = Depends(get_current_user_from_token)):
+    def role_checker(current_user: UserSnapshot = Depends(get_current_principal)):
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -22,7 +24,7 @@ def requires_active_user():
     """
     Decorator để đảm bảo user phải active
     """
-    def active_checker(current_user: User = Depends(get_current_user_from_token)):
+    def active_checker(current_user: UserSnapshot = Depends(get_current_principal)):
         if not current_user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -35,7 +37,7 @@ def requires_verified_user():
     """
     Decorator để đảm bảo user phải verified
     """
-    def verified_checker(current_user: User = Depends(get_current_user_from_token)):
+    def verified_checker(current_user: UserSnapshot = Depends(get_current_principal)):
         if not current_user.is_verified:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -44,21 +46,23 @@ def requires_verified_user():
         return current_user
     return verified_checker
 
-def get_current_user(current_user: User = Depends(get_current_user_from_token)):
+def get_current_user(current_user: UserSnapshot = Depends(get_current_principal)):
     """
-    Dependency để lấy current user (đã authenticated)
+    Dependency để lấy current user (đã authenticated) dưới dạng UserSnapshot (id, role, ...).
+    Cần ORM User đầy đủ thì dùng get_current_user_from_token.
     """
     return current_user
 
 def get_optional_user(
-    credentials: Optional[HTTPBearer] = Security(HTTPBearer(auto_error=False))
-) -> Optional[User]:
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(HTTPBearer(auto_error=False)),
+    db: Session = Depends(get_db)
+) -> Optional[UserSnapshot]:
     """
     Dependency để lấy current user nếu có token, không thì trả None
     """
     if credentials is None:
         return None
     try:
-        return get_current_user_from_token(credentials)
-    except:
+        return get_current_principal(credentials, db)
+    except HTTPException:
         return None
@@ -0,0 +1,111 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from app.config.settings import settings
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    Thông tin tối thiểu của user đã xác thực, đủ cho kiểm tra quyền (id, role, trạng thái).
+    Bất biến để có thể dùng chung giữa các request.
+    """
+
+    id: int
+    role: str
+    is_active: bool
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(id=user.id, role=user.role, is_active=bool(user.is_active), is_verified=bool(user.is_verified))
+
+
+class TokenCache:
+    """
+    LRU giới hạn kích thước: sha256(token) -> (claims đã verify, UserSnapshot).
+
+    Entry hết hạn tại `exp` của token (hoặc sớm hơn theo max_ttl_seconds), nên
+    request tiếp theo với cùng token không phải decode JWT lẫn query bảng users.
+    Thay đổi user (update / delete / đổi mật khẩu) gọi invalidate_user().
+    """
+
+    def __init__(self, max_entries: int = 10000, max_ttl_seconds: int = 300, enabled: bool = True):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[float, dict, UserSnapshot]]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Tuple[dict, UserSnapshot]]:
+        if not self.enabled:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, claims, snapshot = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return claims, snapshot
+
+    def set(self, token: str, claims: dict, snapshot: UserSnapshot) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.max_ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        key = self._key(token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, claims, snapshot)
+            self._keys_by_user.setdefault(snapshot.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Xóa mọi token đã cache của user."""
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, set()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        # Gọi khi đã giữ lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[2].id
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+token_cache = TokenCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    max_ttl_seconds=settings.AUTH_CACHE_MAX_TTL_SECONDS,
+    enabled=settings.AUTH_CACHE_ENABLED,
+)
@@ -0,0 +1,9 @@
+from app.cache.backends import MemoryCacheBackend, RedisCacheBackend
+from app.cache.response_cache import ResponseCache, response_cache
+
+__all__ = [
+    "MemoryCacheBackend",
+    "RedisCacheBackend",
+    "ResponseCache",
+    "response_cache",
+]
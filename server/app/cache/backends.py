@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from app.config.logger import logger
+
+
+class MemoryCacheBackend:
+    """
+    LRU + TTL trong process. Phiên bản của tag cũng nằm trong process nên chỉ
+    phù hợp khi chạy 1 worker; nhiều worker -> dùng RedisCacheBackend.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._tag_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_tag_versions(self, tags: Iterable[str]) -> List[int]:
+        with self._lock:
+            return [self._tag_versions.get(tag, 0) for tag in tags]
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_versions.clear()
+
+
+class RedisCacheBackend:
+    """
+    Cache dùng chung giữa các worker qua Redis (REDIS_URL). Entry hết hạn bằng
+    EX của Redis; phiên bản tag là các key INCR (không hết hạn).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, password: Optional[str] = None, prefix: str = "movie_booking:cache:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        self.client = redis.Redis.from_url(url, password=password)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def get_tag_versions(self, tags: Iterable[str]) -> List[int]:
+        values = self.client.mget([f"{self.prefix}tag:{tag}" for tag in tags])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(f"{self.prefix}tag:{tag}")
+        pipe.execute()
+
+    def size(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*", count=1000))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*", count=1000))
+        if keys:
+            self.client.delete(*keys)
+        logger.info(f"[RedisCacheBackend] Cleared {len(keys)} keys")
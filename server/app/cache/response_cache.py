@@ -0,0 +1,132 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.cache.backends import MemoryCacheBackend, RedisCacheBackend
+from app.config.logger import logger
+from app.config.settings import settings
+
+
+class ResponseCache:
+    """
+    Read-through cache cho các endpoint catalog: lưu sẵn bytes JSON của response,
+    key = route + query string + phiên bản của các tag.
+
+    Invalidate theo tag chỉ là tăng phiên bản tag (O(1)): key cũ không còn được
+    đọc tới và tự rơi khỏi cache theo TTL / LRU.
+    """
+
+    def __init__(self, backend, ttl_seconds: int = 60, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._adapters: Dict[Any, TypeAdapter] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    # -------------------- READ --------------------
+    def respond(
+        self,
+        request: Request,
+        model: Any,
+        tags: Sequence[str],
+        build: Callable[[], Any],
+        ttl: Optional[int] = None,
+        enabled: bool = True,
+    ):
+        """
+        Trả response từ cache nếu có; nếu không gọi `build()`, serialize theo `model`
+        (response_model của route) rồi lưu lại. enabled=False -> bỏ qua cache.
+        """
+        if not (self.enabled and enabled):
+            return build()
+
+        try:
+            key = self._key(request, tags, self.backend.get_tag_versions(tags))
+            body = self.backend.get(key)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"[ResponseCache] Backend read failed, serving uncached: {e}")
+            return build()
+
+        if body is not None:
+            self._count("hits")
+            return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+        self._count("misses")
+        adapter = self._adapter(model)
+        body = adapter.dump_json(adapter.validate_python(build(), from_attributes=True))
+        try:
+            self.backend.set(key, body, ttl or self.ttl_seconds)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"[ResponseCache] Backend write failed: {e}")
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+    @staticmethod
+    def _key(request: Request, tags: Sequence[str], versions: Sequence[int]) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        tag_part = ",".join(f"{tag}={version}" for tag, version in zip(tags, versions))
+        return f"{request.url.path}?{query}|{tag_part}"
+
+    def _adapter(self, model: Any) -> TypeAdapter:
+        adapter = self._adapters.get(model)
+        if adapter is None:
+            adapter = self._adapters.setdefault(model, TypeAdapter(model))
+        return adapter
+
+    # -------------------- INVALIDATION --------------------
+    def invalidate(self, *tags: str) -> None:
+        if not self.enabled or not tags:
+            return
+        try:
+            self.backend.bump_tags(tags)
+        except Exception as e:
+            self._count("errors")
+            logger.error(f"[ResponseCache] Failed to invalidate tags {tags}: {e}")
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = self.errors = 0
+
+    # -------------------- STATS --------------------
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        lookups = hits + misses
+        try:
+            entries = self.backend.size()
+        except Exception:
+            entries = None
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+def build_response_cache() -> ResponseCache:
+    backend_name = settings.CACHE_BACKEND.lower()
+    if backend_name == "redis" and settings.REDIS_URL:
+        backend = RedisCacheBackend(settings.REDIS_URL, password=settings.REDIS_PASSWORD)
+    else:
+        if backend_name == "redis":
+            logger.warning("CACHE_BACKEND=redis but REDIS_URL is not set. Falling back to in-process cache.")
+        backend = MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    return ResponseCache(backend, ttl_seconds=settings.CACHE_TTL_SECONDS, enabled=settings.CACHE_ENABLED)
+
+
+response_cache = build_response_cache()
@@ -1,13 +1,29 @@
 
+import time
 from app.config.settings import settings
+from app.metrics import db_pool_wait_seconds
+from app.metrics.query_tracker import query_tracker
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 DATABASE_URL = settings.DATABASE_URL
 
 def _is_sqlite(url: str) -> bool:
     return url.startswith("sqlite")
 
+class TimedQueuePool(QueuePool):
+    """QueuePool đo thời gian chờ lấy connection (db_pool_wait_seconds trên /metrics)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait_seconds.observe((), time.perf_counter() - started)
+
 def _build_engine():
     base_args = {
         "echo": bool(settings.DEBUG),
@@ -17,6 +33,7 @@ def _build_engine():
         base_args["connect_args"] = {"check_same_thread": False}
     else:
         base_args.update({
+            "poolclass": TimedQueuePool,
             "pool_size": settings.DB_POOL_SIZE,
             "max_overflow": settings.DB_MAX_OVERFLOW,
             "pool_timeout": settings.DB_POOL_TIMEOUT,
@@ -26,6 +43,8 @@ def _build_engine():
     return create_engine(DATABASE_URL, **base_args)
 
 engine = _build_engine()
+# Đếm query / thời gian DB theo request (metrics, header debug, phát hiện N+1)
+query_tracker.instrument(engine)
 
 if _is_sqlite(DATABASE_URL):
     @event.listens_for(engine, "connect")
@@ -48,4 +67,62 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# -------------------- ASYNC ENGINE (opt-in) --------------------
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """sqlite:///x.db -> sqlite+aiosqlite:///x.db, postgresql://... -> postgresql+asyncpg://..."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def _build_async_engine(url: str):
+    base_args = {
+        "echo": bool(settings.DEBUG),
+    }
+
+    if _is_sqlite(url):
+        base_args["connect_args"] = {"check_same_thread": False}
+    else:
+        base_args.update({
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+        })
+
+    async_engine = create_async_engine(url, **base_args)
+
+    if _is_sqlite(url):
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def set_async_sqlite_pragma(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    query_tracker.instrument(async_engine.sync_engine)
+    return async_engine
+
+# Chỉ tạo khi bật ASYNC_DB_ENABLED để không bắt buộc cài aiosqlite / asyncpg
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or (to_async_url(DATABASE_URL) if settings.ASYNC_DB_ENABLED else None)
+async_engine = _build_async_engine(ASYNC_DATABASE_URL) if settings.ASYNC_DB_ENABLED else None
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+async def get_async_db():
+    if async_engine is None:
+        raise RuntimeError("Async database engine is disabled. Set ASYNC_DB_ENABLED=true to use it.")
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
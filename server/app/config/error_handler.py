@@ -29,6 +29,9 @@ def register_exception_handlers(app: FastAPI):
     async def http_exception_handler(request: Request, exc: HTTPException):
         """Handle HTTPException và đảm bảo CORS headers được thêm vào"""
         headers = get_cors_headers(request)
+        # Giữ header của exception (WWW-Authenticate, Retry-After, ...)
+        if exc.headers:
+            headers = {**exc.headers, **headers}
         return JSONResponse(
             status_code=exc.status_code,
             content={"detail": exc.detail},
@@ -1,19 +1,141 @@
+import atexit
+import itertools
+import json
 import logging
+import queue
 import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+LOGGER_NAME = "movie_booking"
+TEXT_FORMAT = "[%(asctime)s] | %(levelname)-8s | %(name)s | %(request_id)s | %(funcName)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Request id của request đang xử lý (LoggingMiddleware set), gắn vào mọi log record
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """Gắn request_id hiện tại vào record (phải chạy ở thread của request, trước khi vào queue)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Chỉ giữ 1/N record dưới WARNING (log đọc của repository rất nhiều); WARNING trở lên luôn giữ.
+    Đếm tuần tự thay vì random để kết quả ổn định.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.set_rate(rate)
+        self._counter = itertools.count()
+
+    def set_rate(self, rate: float) -> None:
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if not self.every:
+            return False
+        return next(self._counter) % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """1 dòng JSON / record, chạy trên thread của QueueListener."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "func": record.funcName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _stdout_handler(json_output: bool = False) -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+    return handler
+
 
 # Cấu hình logger chuẩn toàn hệ thống
-logger = logging.getLogger("movie_booking")
+logger = logging.getLogger(LOGGER_NAME)
 logger.setLevel(logging.INFO)
 
-# Nếu chưa có handler, thêm handler tránh log bị trùng
+# Log của repository (rất nhiều) đi qua logger con để chỉnh level / sampling riêng
+repository_logger = logging.getLogger(f"{LOGGER_NAME}.repository")
+repository_sampler = SamplingFilter()
+repository_logger.addFilter(repository_sampler)
+
+_request_id_filter = RequestIdFilter()
+
+# Nếu chưa có handler, thêm handler tránh log bị trùng (được thay bằng QueueHandler trong configure_logging)
 if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        "[%(asctime)s] | %(levelname)-8s | %(name)s | %(funcName)s | %(message)s",
-        "%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    _default_handler = _stdout_handler()
+    _default_handler.addFilter(_request_id_filter)
+    logger.addHandler(_default_handler)
+
+_listener: Optional[QueueListener] = None
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """'movie_booking.repository=WARNING,sqlalchemy.engine=INFO' -> {tên logger: level}."""
+    levels = {}
+    for item in (spec or "").split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: str = "INFO", json_output: bool = False, levels: Optional[Dict[str, str]] = None,
+                      repository_sample_rate: float = 1.0) -> None:
+    """
+    Chuyển logger sang QueueHandler: thread của request chỉ đưa record vào queue,
+    format + ghi stdout chạy trên thread của QueueListener. Gọi lại được (idempotent).
+    """
+    global _listener
+    logger.setLevel(level.upper())
+    for name, module_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+    repository_sampler.set_rate(repository_sample_rate)
+
+    if _listener is not None:
+        _listener.stop()
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(_request_id_filter)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, _stdout_handler(json_output), respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Ghi nốt các record còn trong queue rồi dừng listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
 
 # Cho phép import như logger.info(...)
 def info(msg: str, *args, **kwargs):
@@ -39,6 +39,15 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = Field(default="HS256", env="JWT_ALGORITHM")
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, env="JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7, env="JWT_REFRESH_TOKEN_EXPIRE_DAYS")
+    # Cache token -> (claims, user snapshot) trong process; entry hết hạn theo exp của token
+    # hoặc sau AUTH_CACHE_MAX_TTL_SECONDS (giới hạn độ trễ khi chạy nhiều worker)
+    AUTH_CACHE_ENABLED: bool = Field(default=True, env="AUTH_CACHE_ENABLED")
+    AUTH_CACHE_MAX_ENTRIES: int = Field(default=10000, env="AUTH_CACHE_MAX_ENTRIES")
+    AUTH_CACHE_MAX_TTL_SECONDS: int = Field(default=300, env="AUTH_CACHE_MAX_TTL_SECONDS")
+    # bcrypt chạy trong process pool riêng; 0 worker = hash ngay trong thread của request.
+    # Quá PASSWORD_HASH_MAX_PENDING job đang chờ -> trả 503 thay vì xếp hàng vô hạn
+    PASSWORD_HASH_WORKERS: int = Field(default=2, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=32, env="PASSWORD_HASH_MAX_PENDING")
     
     # Password Settings
     PASSWORD_MIN_LENGTH: int = Field(default=8, env="PASSWORD_MIN_LENGTH")
@@ -52,6 +61,8 @@ class Settings(BaseSettings):
     RATE_LIMIT_PERIOD: int = Field(default=60, env="RATE_LIMIT_PERIOD")  # seconds
     AUTH_RATE_LIMIT_CALLS: int = Field(default=100, env="AUTH_RATE_LIMIT_CALLS")
     AUTH_RATE_LIMIT_PERIOD: int = Field(default=60, env="AUTH_RATE_LIMIT_PERIOD")  # seconds
+    # memory (giới hạn theo từng process) | redis (dùng REDIS_URL, chung cho mọi worker / node)
+    RATE_LIMIT_BACKEND: str = Field(default="memory", env="RATE_LIMIT_BACKEND")
     
     # IP Whitelist/Blacklist
     IP_WHITELIST: Optional[List[str]] = Field(default=None, env="IP_WHITELIST")
@@ -78,10 +89,44 @@ class Settings(BaseSettings):
     DB_POOL_TIMEOUT: int = Field(default=30, env="DB_POOL_TIMEOUT")
     DB_POOL_RECYCLE: int = Field(default=3600, env="DB_POOL_RECYCLE")
     
+    # Async engine (opt-in) - bật các route đọc /async/... dùng AsyncSession
+    # ASYNC_DATABASE_URL để trống -> suy ra từ DATABASE_URL (aiosqlite / asyncpg)
+    ASYNC_DB_ENABLED: bool = Field(default=False, env="ASYNC_DB_ENABLED")
+    ASYNC_DATABASE_URL: Optional[str] = Field(default=None, env="ASYNC_DATABASE_URL")
+    
+    # Seat hold (giữ ghế khi checkout) - 0 để tắt
+    SEAT_HOLD_TTL_SECONDS: int = Field(default=8 * 60, env="SEAT_HOLD_TTL_SECONDS")
+    SEAT_HOLD_RELEASE_BATCH_SIZE: int = Field(default=500, env="SEAT_HOLD_RELEASE_BATCH_SIZE")
+    
+    # Stream trạng thái ghế (SSE /showtimes/{id}/seats/stream)
+    # memory (chỉ client cùng process) | redis (pub/sub qua REDIS_URL, chung cho mọi worker / node)
+    SEAT_STREAM_BACKEND: str = Field(default="memory", env="SEAT_STREAM_BACKEND")
+    # Số delta tối đa chờ gửi cho 1 client; đầy -> bỏ delta, gửi lại snapshot
+    SEAT_STREAM_QUEUE_SIZE: int = Field(default=64, env="SEAT_STREAM_QUEUE_SIZE")
+    SEAT_STREAM_KEEPALIVE_SECONDS: float = Field(default=15.0, env="SEAT_STREAM_KEEPALIVE_SECONDS")
+    
+    # Response cache cho các endpoint catalog (memory | redis - redis dùng REDIS_URL)
+    CACHE_ENABLED: bool = Field(default=True, env="CACHE_ENABLED")
+    CACHE_BACKEND: str = Field(default="memory", env="CACHE_BACKEND")
+    CACHE_TTL_SECONDS: int = Field(default=60, env="CACHE_TTL_SECONDS")
+    CACHE_MAX_ENTRIES: int = Field(default=2048, env="CACHE_MAX_ENTRIES")
+    
+    # Metrics dạng Prometheus tại GET /metrics (nên chặn endpoint này ở reverse proxy)
+    METRICS_ENABLED: bool = Field(default=True, env="METRICS_ENABLED")
+    # Header X-DB-Query-Count / X-DB-Query-Time trên mỗi response (chỉ nên bật khi debug)
+    QUERY_DEBUG_HEADERS: bool = Field(default=False, env="QUERY_DEBUG_HEADERS")
+    # 1 câu SQL (đã bỏ literal) chạy >= N lần trong 1 request -> log cảnh báo N+1
+    QUERY_REPEAT_THRESHOLD: int = Field(default=5, env="QUERY_REPEAT_THRESHOLD")
+    
     # Logging Settings
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
     LOG_FORMAT: str = Field(default="%(asctime)s - %(name)s - %(levelname)s - %(message)s", env="LOG_FORMAT")
     LOG_FILE: str = Field(default="app.log", env="LOG_FILE")
+    LOG_JSON: bool = Field(default=False, env="LOG_JSON")
+    # Level theo từng logger, vd "movie_booking.repository=WARNING,sqlalchemy.engine=INFO"
+    LOG_LEVELS: str = Field(default="", env="LOG_LEVELS")
+    # Tỉ lệ giữ log INFO/DEBUG của repository (WARNING trở lên luôn giữ)
+    LOG_REPOSITORY_SAMPLE_RATE: float = Field(default=1.0, env="LOG_REPOSITORY_SAMPLE_RATE")
     
     # Email Settings (for future use)
     SMTP_HOST: Optional[str] = Field(default=None, env="SMTP_HOST")
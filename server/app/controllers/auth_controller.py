@@ -13,6 +13,7 @@ from app.auth.jwt_auth import (
     get_current_user_from_token,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from app.auth.token_cache import token_cache
 from app.schemas.user_schema import (
     UserCreate, 
     UserRead, 
@@ -121,6 +122,7 @@ def change_password(
     # Cập nhật mật khẩu mới
     current_user.hashed_password = get_password_hash(password_data.new_password)
     db.commit()
+    token_cache.invalidate_user(current_user.id)
     
     return {"message": "Password changed successfully"}
 
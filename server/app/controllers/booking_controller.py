@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, status, Query, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.schemas.booking_schema import BookingCreate, BookingRead, BookingDetailRead
+from app.schemas.booking_schema import (
+    BookingCreate, BookingRead, BookingDetailRead, SeatOccupancyRead,
+    BookingBatchRequest, BookingBatchPayRequest, BookingBatchResult, CheckoutRequest, CheckoutResult,
+)
 from app.schemas.base_schema import PaginatedResponse, PaginationParams, create_paginated_response
 from app.dependencies import get_pagination_params
 from app.config.database import get_db
 from app.services.booking_service import BookingService
 from app.repositories.booking_repo import BookingRepository
-from app.models.user import User
 from app.auth.permissions import get_current_user, requires_role
+from app.auth.token_cache import UserSnapshot
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 booking_service = BookingService(BookingRepository())
@@ -20,14 +23,16 @@ def list_bookings(
     db: Session = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination_params),
 ):
-    bookings, total = booking_service.get_bookings_paginated(db, page=pagination.page, size=pagination.size)
-    return create_paginated_response(bookings, total, pagination)
+    bookings, total = booking_service.get_bookings_paginated(
+        db, page=pagination.page, size=pagination.size, cursor=pagination.cursor, with_total=pagination.with_total
+    )
+    return create_paginated_response(bookings, total, pagination, cursor_key=lambda b: (b.id,))
 
 # -------------------- GET BOOKING BY ID --------------------
 @router.get("/{booking_id}", response_model=BookingRead)
 def get_booking_by_id(
     booking_id: int, 
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     booking = booking_service.get_booking_by_id(db, booking_id)
@@ -44,7 +49,7 @@ def get_booking_by_id(
 @router.get("/user/{user_id}", response_model=PaginatedResponse[BookingDetailRead])
 def get_user_bookings(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination_params),
 ):
@@ -52,14 +57,16 @@ def get_user_bookings(
     if current_user.role != "admin" and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Forbidden: You can only view your own bookings")
     
-    bookings, total = booking_service.get_user_bookings_paginated_with_details(db, user_id, page=pagination.page, size=pagination.size)
-    return create_paginated_response(bookings, total, pagination)
+    bookings, total = booking_service.get_user_bookings_paginated_with_details(
+        db, user_id, page=pagination.page, size=pagination.size, cursor=pagination.cursor, with_total=pagination.with_total
+    )
+    return create_paginated_response(bookings, total, pagination, cursor_key=lambda b: (b["id"],))
 
 # -------------------- CREATE BOOKING --------------------
 @router.post("/", response_model=List[BookingRead], status_code=status.HTTP_201_CREATED)
 def create_booking(
     booking_in: List[BookingCreate], 
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Tạo booking(s) - user chỉ có thể tạo booking cho chính mình"""
@@ -98,11 +105,26 @@ def create_booking(
     
     return created_bookings
 
+# -------------------- CREATE GROUP BOOKING (ALL-OR-NOTHING) --------------------
+@router.post("/group", response_model=List[BookingRead], status_code=status.HTTP_201_CREATED)
+def create_group_booking(
+    booking_in: List[BookingCreate],
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Đặt nhiều ghế trong 1 transaction - hoặc đặt được tất cả, hoặc không ghế nào.
+    Trả về 409 kèm danh sách toàn bộ ghế bị trùng để client chọn lại 1 lần."""
+    for booking_data in booking_in:
+        if booking_data.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Forbidden: You can only create bookings for yourself")
+
+    return booking_service.create_group_booking(db, booking_in)
+
 # -------------------- CANCEL BOOKING --------------------
 @router.put("/{booking_id}/cancel", response_model=BookingRead)
 def cancel_booking(
     booking_id: int, 
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     booking = booking_service.get_booking_by_id(db, booking_id)
@@ -119,7 +141,7 @@ def cancel_booking(
 @router.delete("/{booking_id}", response_model=BookingRead)
 def delete_booking(
     booking_id: int, 
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     booking = booking_service.get_booking_by_id(db, booking_id)
@@ -137,7 +159,7 @@ def delete_booking(
 def pay_booking(
     booking_id: int,
     payment_method: str = Query("bank_transfer", description="Payment method (bank_transfer, momo, zalopay, etc.)"),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Thanh toán booking - tạo payment và link với booking"""
@@ -151,6 +173,55 @@ def pay_booking(
     
     return booking_service.pay_booking(db, booking_id, payment_method)
 
+# -------------------- CHECKOUT (1 PAYMENT / CART) --------------------
+@router.post("/checkout", response_model=CheckoutResult, status_code=status.HTTP_201_CREATED)
+def checkout_bookings(
+    payload: CheckoutRequest,
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Thanh toán các booking pending của user hiện tại bằng 1 payment (tổng tiền), 1 commit.
+    Có booking không hợp lệ thì không booking nào được thanh toán (400 kèm danh sách id)."""
+    return booking_service.checkout(db, current_user.id, payload.booking_ids, payload.payment_method)
+
+# -------------------- BATCH CANCEL / PAY / EXPIRE --------------------
+def _batch_owner(current_user: UserSnapshot, payload: BookingBatchRequest) -> Optional[int]:
+    """Admin thao tác trên mọi booking; user chỉ trên booking của mình và không theo cả suất chiếu."""
+    if current_user.role == "admin":
+        return None
+    if payload.showtime_id is not None:
+        raise HTTPException(status_code=403, detail="Forbidden: Only admins can update a whole showtime")
+    return current_user.id
+
+@router.post("/batch-cancel", response_model=BookingBatchResult)
+def batch_cancel_bookings(
+    payload: BookingBatchRequest,
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Hủy nhiều booking (hoặc cả suất chiếu) trong 1 transaction, hủy luôn payment không còn booking nào.
+    Id không tồn tại / đã hủy / của user khác nằm trong skipped_ids."""
+    return booking_service.batch_cancel(
+        db, payload.booking_ids, payload.showtime_id, user_id=_batch_owner(current_user, payload)
+    )
+
+@router.post("/batch-pay", response_model=BookingBatchResult)
+def batch_pay_bookings(
+    payload: BookingBatchPayRequest,
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Thanh toán các booking pending còn hạn giữ: 1 payment cho mỗi user, 1 commit."""
+    return booking_service.batch_pay(
+        db, payload.booking_ids, payload.showtime_id,
+        user_id=_batch_owner(current_user, payload), payment_method=payload.payment_method,
+    )
+
+@router.post("/batch-expire", response_model=BookingBatchResult, dependencies=[Depends(requires_role("admin"))])
+def batch_expire_bookings(payload: BookingBatchRequest, db: Session = Depends(get_db)):
+    """Trả ngay ghế của các booking pending đã quá hạn giữ."""
+    return booking_service.batch_expire(db, payload.booking_ids, payload.showtime_id)
+
 # -------------------- GET BOOKINGS BY SHOWTIME --------------------
 @router.get("/showtime/{showtime_id}", response_model=List[BookingRead])
 def get_bookings_for_showtime(showtime_id: int, db: Session = Depends(get_db)):
@@ -158,3 +229,10 @@ def get_bookings_for_showtime(showtime_id: int, db: Session = Depends(get_db)):
     to determine which seats are already occupied when users select seats."""
     bookings = booking_service.get_bookings_by_showtime(db, showtime_id)
     return bookings
+
+# -------------------- SEAT OCCUPANCY BITMAP --------------------
+@router.get("/showtime/{showtime_id}/occupancy", response_model=SeatOccupancyRead)
+def get_showtime_occupancy(showtime_id: int, db: Session = Depends(get_db)):
+    """Sơ đồ ghế đã đặt dạng bitmap - nhẹ hơn nhiều so với danh sách booking và
+    được phục vụ từ bộ nhớ, không query DB sau lần đọc đầu tiên."""
+    return booking_service.get_showtime_occupancy(db, showtime_id)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.permissions import requires_role
+from app.cache import response_cache
+
+router = APIRouter(prefix="/cache", tags=["Cache"], dependencies=[Depends(requires_role("admin"))])
+
+@router.get("/stats")
+def get_cache_stats():
+    """Số lần hit / miss của response cache (dùng để theo dõi tỉ lệ hit)."""
+    return response_cache.stats()
+
+@router.post("/clear")
+def clear_cache():
+    response_cache.clear()
+    return {"message": "Response cache cleared"}
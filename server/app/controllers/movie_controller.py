@@ -1,37 +1,53 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, Request, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.schemas.movie_schema import MovieCreate, MovieRead, MovieBase
 from app.schemas.base_schema import PaginatedResponse, PaginationParams, create_paginated_response
 from app.dependencies import get_pagination_params
-from app.config.database import get_db
+from app.config.database import get_db, get_async_db
 from app.services.movie_service import MovieService
 from app.repositories.movie_repo import MovieRepository
 from app.auth.permissions import requires_role
+from app.cache import response_cache
 
 router = APIRouter(prefix="/movies", tags=["Movies"])
 movie_service = MovieService(MovieRepository())
 
+# Route đọc chạy trên AsyncSession, chỉ được đăng ký khi ASYNC_DB_ENABLED=true
+async_router = APIRouter(prefix="/async/movies", tags=["Movies (async)"])
+
 @router.get("/", response_model=PaginatedResponse[MovieRead])
 def get_all_movies(
+    request: Request,
     db: Session = Depends(get_db), 
     pagination: PaginationParams = Depends(get_pagination_params),
     search: Optional[str] = Query(None, description="Search query for title, description, or genre"),
     ):
     
-    # Nếu có search query, tìm kiếm; nếu không, lấy danh sách bình thường
-    if search:
-        movies, total = movie_service.search_movies(db, search, page=pagination.page, size=pagination.size)
-    else:
-        movies, total = movie_service.get_movies_paginated(db, page=pagination.page, size=pagination.size)
-    
-    return create_paginated_response(movies, total, pagination)
+    def build():
+        # Nếu có search query, tìm kiếm; nếu không, lấy danh sách bình thường
+        # Kết quả search xếp theo độ liên quan nên chỉ phân trang bằng page/size (không có cursor)
+        if search:
+            movies, total = movie_service.search_movies(
+                db, search, page=pagination.page, size=pagination.size, with_total=pagination.with_total
+            )
+            return create_paginated_response(movies, total, pagination)
+
+        movies, total = movie_service.get_movies_paginated(
+            db, page=pagination.page, size=pagination.size, cursor=pagination.cursor, with_total=pagination.with_total
+        )
+        return create_paginated_response(movies, total, pagination, cursor_key=lambda m: (m.id,))
+
+    return response_cache.respond(request, PaginatedResponse[MovieRead], ("movies",), build)
     
 
 @router.get("/{movie_id}", response_model=MovieRead)
-def get_movie_by_id(movie_id: int, db: Session = Depends(get_db)):
-    return movie_service.get_movie_by_id(db, movie_id)
+def get_movie_by_id(movie_id: int, request: Request, db: Session = Depends(get_db)):
+    return response_cache.respond(
+        request, MovieRead, (f"movie:{movie_id}",), lambda: movie_service.get_movie_by_id(db, movie_id)
+    )
 
 @router.post("/", response_model=MovieRead, status_code=status.HTTP_201_CREATED,dependencies=[Depends(requires_role("admin"))])
 def create_movie(movie_data: MovieCreate, db: Session = Depends(get_db)):
@@ -44,3 +60,22 @@ def update_movie(movie_id: int, movie_data: MovieBase, db: Session = Depends(get
 @router.delete("/{movie_id}", response_model=MovieRead, dependencies=[Depends(requires_role("admin"))])
 def delete_movie(movie_id: int, db: Session = Depends(get_db)):
     return movie_service.delete_movie(db, movie_id)
+
+
+# -------------------- ASYNC READ --------------------
+@async_router.get("/", response_model=PaginatedResponse[MovieRead])
+async def get_all_movies_async(
+    db: AsyncSession = Depends(get_async_db),
+    pagination: PaginationParams = Depends(get_pagination_params),
+    search: Optional[str] = Query(None, description="Search query for title, description, or genre"),
+    ):
+    if search:
+        movies, total = await movie_service.asearch_movies(db, search, page=pagination.page, size=pagination.size)
+    else:
+        movies, total = await movie_service.aget_movies_paginated(db, page=pagination.page, size=pagination.size)
+
+    return create_paginated_response(movies, total, pagination)
+
+@async_router.get("/{movie_id}", response_model=MovieRead)
+async def get_movie_by_id_async(movie_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await movie_service.aget_movie_by_id(db, movie_id)
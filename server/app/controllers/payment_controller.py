@@ -6,8 +6,8 @@ from app.config.database import get_db
 from app.services.payment_service import PaymentService
 from app.repositories.payment_repo import PaymentRepository
 from app.schemas.payment_schema import PaymentCreate, PaymentRead
-from app.models.user import User
 from app.auth.permissions import get_current_user, requires_role
+from app.auth.token_cache import UserSnapshot
 from app.config import logger
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
@@ -16,7 +16,7 @@ payment_service = PaymentService()
 @router.post("/", response_model=PaymentRead, status_code=status.HTTP_201_CREATED)
 def create_payment(
     payment_data: PaymentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Tạo payment mới (user chỉ có thể tạo payment cho chính mình)"""
@@ -37,7 +37,7 @@ def create_payment(
 
 @router.get("/me", response_model=List[PaymentRead])
 def get_my_payments(
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Lấy tất cả payments của user hiện tại"""
@@ -51,7 +51,7 @@ def get_all_payments(db: Session = Depends(get_db)):
 @router.get("/{payment_id}", response_model=PaymentRead)
 def get_payment_by_id(
     payment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Lấy payment theo ID (admin hoặc chính chủ)"""
@@ -68,7 +68,7 @@ def get_payment_by_id(
 def update_payment_status(
     payment_id: int,
     new_status: str = Query(..., description="New payment status"),
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Cập nhật status của payment (admin hoặc chính chủ)"""
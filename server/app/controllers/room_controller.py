@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.config.logger import logger
-from app.schemas.room_schema import RoomCreate, RoomRead, RoomUpdate
+from app.schemas.room_schema import RoomCreate, RoomRead, RoomUpdate, BatchSeatGenerationRequest
 from app.schemas.base_schema import PaginatedResponse, PaginationParams, create_paginated_response
 from app.dependencies import get_pagination_params
 from app.config.database import get_db
@@ -60,6 +60,12 @@ def delete_room(room_id: int, db: Session = Depends(get_db)):
     logger.info(f"DELETE /rooms/{room_id} called")
     return room_service.delete_room(db, room_id)
 
+# -------------------- GENERATE SEATS (BATCH) --------------------
+@router.post("/generate-seats", dependencies=[Depends(requires_role("admin"))])
+def generate_seats_batch(request: BatchSeatGenerationRequest, db: Session = Depends(get_db)):
+    logger.info(f"POST /rooms/generate-seats called for {len(request.rooms)} rooms overwrite={request.overwrite}")
+    return room_service.generate_seats_batch(db, request.rooms, request.overwrite)
+
 # -------------------- GENERATE SEATS --------------------
 @router.post("/{room_id}/generate-seats", dependencies=[Depends(requires_role("admin"))])
 def generate_seats(room_id: int, overwrite: bool = False, db: Session = Depends(get_db)):
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -7,6 +7,8 @@ from app.schemas.seat_schema import SeatCreate, SeatRead, SeatBase
 from app.services.seat_service import SeatService
 from app.repositories.seat_repo import SeatRepository
 from app.auth.permissions import requires_role
+from app.cache import response_cache
+from app.services.seat_map_service import seat_map_service
 
 router = APIRouter(prefix="/seats", tags=["Seats"])
 
@@ -44,11 +46,30 @@ def get_all_seats(db: Session = Depends(get_db)):
 
 
 @router.get("/room/{room_id}", response_model=List[SeatRead])
-def get_seats_by_room(room_id: int, db: Session = Depends(get_db)):
+def get_seats_by_room(room_id: int, request: Request, db: Session = Depends(get_db)):
     """
     Lấy danh sách ghế trong một phòng cụ thể 
     """
-    return seat_service.get_seats_by_room(db, room_id)
+    return response_cache.respond(
+        request, List[SeatRead], ("seats", f"room:{room_id}"), lambda: seat_service.get_seats_by_room(db, room_id)
+    )
+
+
+@router.get("/room/{room_id}/map")
+def get_seat_map(room_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Sơ đồ ghế dạng cột của phòng (rows / numbers / types / price_modifiers / active bitmap).
+    Trả ETag theo version; If-None-Match khớp bản đang cache -> 304, không query DB.
+    """
+    seat_map = seat_map_service.get(db, room_id)
+    if seat_map is None:
+        raise HTTPException(status_code=404, detail="Room not found")
+
+    if_none_match = request.headers.get("if-none-match")
+    headers = {"ETag": seat_map.etag, "Cache-Control": "no-cache"}
+    if if_none_match and seat_map.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=seat_map.body, media_type="application/json", headers=headers)
 
 
 # -------------------- UPDATE --------------------
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.config.database import get_db
-from app.schemas.showtime_schema import ShowtimeCreate, ShowtimeRead, ShowtimeBase
+from app.config.database import get_db, get_async_db
+from app.schemas.showtime_schema import ShowtimeCreate, ShowtimeRead, ShowtimeBase, ShowtimeImportRequest, ShowtimeImportResult
 from app.services.showtime_service import ShowtimeService
 from app.repositories.showtime_repo import ShowtimeRepository
 from app.schemas.base_schema import PaginatedResponse, PaginationParams, create_paginated_response
 from app.dependencies import get_pagination_params
 from app.auth.permissions import requires_role, get_optional_user
-from app.models.user import User
+from app.auth.token_cache import UserSnapshot
+from app.cache import response_cache
+from app.services.seat_stream_service import seat_stream_service
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/showtimes", tags=["Showtimes"])
 showtime_service = ShowtimeService(ShowtimeRepository())
 
 
+def showtime_cursor_key(showtime):
+    return (showtime.start_time, showtime.id)
+
+# Route đọc chạy trên AsyncSession, chỉ được đăng ký khi ASYNC_DB_ENABLED=true.
+# Không hỗ trợ include_past: get_optional_user cần Session đồng bộ.
+async_router = APIRouter(prefix="/async/showtimes", tags=["Showtimes (async)"])
+
+
 # -------------------- CREATE --------------------
 @router.post("/", response_model=ShowtimeRead, dependencies=[Depends(requires_role("admin"))])
 def create_showtime(showtime_in: ShowtimeCreate, db: Session = Depends(get_db)):
@@ -27,14 +39,16 @@ def get_all_showtimes(
     db: Session = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination_params),
     include_past: bool = Query(False, description="Include past showtimes (admin only)"),
-    current_user: Optional[User] = Depends(get_optional_user),
+    current_user: Optional[UserSnapshot] = Depends(get_optional_user),
 ):
     # Chỉ admin mới có thể xem showtime đã kết thúc
     if include_past and (not current_user or current_user.role != "admin"):
         include_past = False
     
-    showtimes, total = showtime_service.get_paginated(db, pagination.page, pagination.size, include_past)
-    return create_paginated_response(showtimes, total, pagination)
+    showtimes, total = showtime_service.get_paginated(
+        db, pagination.page, pagination.size, include_past, cursor=pagination.cursor, with_total=pagination.with_total
+    )
+    return create_paginated_response(showtimes, total, pagination, cursor_key=showtime_cursor_key)
 
 
 # -------------------- GET BY ID --------------------
@@ -50,17 +64,26 @@ def get_showtime(showtime_id: int, db: Session = Depends(get_db)):
 @router.get("/movie/{movie_id}", response_model=PaginatedResponse[ShowtimeRead])
 def get_showtimes_by_movie(
     movie_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination_params),
     include_past: bool = Query(False, description="Include past showtimes (admin only)"),
-    current_user: Optional[User] = Depends(get_optional_user),
+    current_user: Optional[UserSnapshot] = Depends(get_optional_user),
 ):
     # Chỉ admin mới có thể xem showtime đã kết thúc
     if include_past and (not current_user or current_user.role != "admin"):
         include_past = False
     
-    showtimes, total = showtime_service.get_paginated_by_movie(db, movie_id, pagination.page, pagination.size, include_past)
-    return create_paginated_response(showtimes, total, pagination)
+    def build():
+        showtimes, total = showtime_service.get_paginated_by_movie(
+            db, movie_id, pagination.page, pagination.size, include_past, cursor=pagination.cursor, with_total=pagination.with_total
+        )
+        return create_paginated_response(showtimes, total, pagination, cursor_key=showtime_cursor_key)
+
+    # Response của admin (include_past) khác của khách nên không cache
+    return response_cache.respond(
+        request, PaginatedResponse[ShowtimeRead], ("showtimes",), build, enabled=not include_past
+    )
 
 
 # -------------------- UPDATE --------------------
@@ -78,6 +101,13 @@ def delete_showtime(showtime_id: int, db: Session = Depends(get_db)):
     return {"message": "Showtime deleted successfully"}
 
 
+# -------------------- BULK IMPORT --------------------
+@router.post("/import", response_model=ShowtimeImportResult, dependencies=[Depends(requires_role("admin"))])
+def import_showtimes(payload: ShowtimeImportRequest, db: Session = Depends(get_db)):
+    """Tạo lịch chiếu hàng loạt; các dòng trùng giờ được trả về trong conflicts."""
+    return showtime_service.import_schedule(db, payload.showtimes, payload.all_or_nothing)
+
+
 # -------------------- BULK DELETE --------------------
 class IdsPayload(BaseModel):
     ids: List[int]
@@ -87,9 +117,53 @@ def batch_delete_showtimes(payload: IdsPayload, db: Session = Depends(get_db)):
     deleted = showtime_service.delete_many(db, payload.ids or [])
     return {"deleted": deleted}
 
+# -------------------- LIVE SEAT STREAM (SSE) --------------------
+@router.get("/{showtime_id}/seats/stream", response_class=StreamingResponse)
+async def stream_seat_availability(showtime_id: int):
+    """Server-Sent Events: 1 event `snapshot` (giống /bookings/showtime/{id}/occupancy) rồi các
+    event `delta` {"booked": [seat_id...], "released": [...]} khi ghế được đặt / trả - thay cho poll."""
+    events = await seat_stream_service.open(showtime_id)
+    if events is None:
+        raise HTTPException(status_code=404, detail="Showtime not found")
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Không cho proxy (nginx) buffer stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # -------------------- UPDATE EXPIRED SHOWTIMES --------------------
 @router.post("/update-expired", dependencies=[Depends(requires_role("admin"))])
 def update_expired_showtimes(db: Session = Depends(get_db)):
     """Tự động update status showtime đã kết thúc thành 'completed'"""
     count = showtime_service.update_expired_showtimes(db)
     return {"updated": count, "message": f"Updated {count} expired showtimes to 'completed' status"}
+
+
+# -------------------- ASYNC READ --------------------
+@async_router.get("/", response_model=PaginatedResponse[ShowtimeRead])
+async def get_all_showtimes_async(
+    db: AsyncSession = Depends(get_async_db),
+    pagination: PaginationParams = Depends(get_pagination_params),
+):
+    showtimes, total = await showtime_service.aget_paginated(db, pagination.page, pagination.size)
+    return create_paginated_response(showtimes, total, pagination)
+
+
+@async_router.get("/{showtime_id}", response_model=ShowtimeRead)
+async def get_showtime_async(showtime_id: int, db: AsyncSession = Depends(get_async_db)):
+    showtime = await showtime_service.aget(db, showtime_id)
+    if not showtime:
+        raise HTTPException(status_code=404, detail="Showtime not found")
+    return showtime
+
+
+@async_router.get("/movie/{movie_id}", response_model=PaginatedResponse[ShowtimeRead])
+async def get_showtimes_by_movie_async(
+    movie_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    pagination: PaginationParams = Depends(get_pagination_params),
+):
+    showtimes, total = await showtime_service.aget_paginated_by_movie(db, movie_id, pagination.page, pagination.size)
+    return create_paginated_response(showtimes, total, pagination)
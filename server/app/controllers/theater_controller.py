@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -9,6 +9,7 @@ from app.repositories.theater_repo import TheaterRepository
 from app.schemas.base_schema import PaginatedResponse, PaginationParams, create_paginated_response
 from app.dependencies import get_pagination_params
 from app.auth.permissions import requires_role
+from app.cache import response_cache
 
 router = APIRouter(prefix="/theaters", tags=["Theaters"])
 
@@ -16,13 +17,17 @@ theater_service = TheaterService(TheaterRepository())
 
 @router.get("/", response_model=PaginatedResponse[TheaterRead])
 def get_theaters(
+    request: Request,
     db: Session = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination_params)
 ):
-    skip = (pagination.page - 1) * pagination.size
-    theaters = theater_service.get_all(db, skip=skip, limit=pagination.size)
-    total = theater_service.repository.count(db)
-    return create_paginated_response(theaters, total, pagination)
+    def build():
+        skip = (pagination.page - 1) * pagination.size
+        theaters = theater_service.get_all(db, skip=skip, limit=pagination.size)
+        total = theater_service.repository.count(db)
+        return create_paginated_response(theaters, total, pagination)
+
+    return response_cache.respond(request, PaginatedResponse[TheaterRead], ("theaters",), build)
 
 @router.get("/{theater_id}", response_model=TheaterRead)
 def get_theater(theater_id: int, db: Session = Depends(get_db)):
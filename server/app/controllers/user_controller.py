@@ -11,12 +11,14 @@ from app.dependencies import get_pagination_params
 from app.config import logger
 from app.models.user import User
 from app.auth.permissions import get_current_user, requires_role
+from app.auth.jwt_auth import get_current_user_from_token
+from app.auth.token_cache import UserSnapshot
 
 router = APIRouter(prefix="/users", tags=["Users"])
 user_service = UserService()
 
 @router.get("/me")
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: User = Depends(get_current_user_from_token)):
     return {
         "id": current_user.id,
         "email": current_user.email,
@@ -36,8 +38,10 @@ def get_users(
     db: Session = Depends(get_db)
 ):
     skip = (pagination.page - 1) * pagination.size
-    users, total = user_service.get_all_paginated(db, skip=skip, limit=pagination.size)
-    return create_paginated_response(users, total, pagination)
+    users, total = user_service.get_all_paginated(
+        db, skip=skip, limit=pagination.size, cursor=pagination.cursor, with_total=pagination.with_total
+    )
+    return create_paginated_response(users, total, pagination, cursor_key=lambda u: (u.id,))
 
 @router.get("/{user_id}", response_model=UserRead, dependencies=[Depends(requires_role("admin"))])
 def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
@@ -56,7 +60,7 @@ def get_user_by_email(email: str, db: Session = Depends(get_db)):
 def update_user(
     user_id: int, 
     user_in: UserUpdate, 
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     # Admin có thể sửa bất kỳ user nào, user chỉ có thể sửa chính mình
@@ -71,7 +75,7 @@ def update_user(
 @router.delete("/{user_id}", dependencies=[Depends(requires_role("admin"))])
 def delete_user(
     user_id: int, 
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Xóa user (chỉ admin mới có quyền)"""
@@ -1,11 +1,14 @@
 
+from typing import Optional
 from fastapi import Query, Depends
 from app.schemas.base_schema import PaginationParams
 
 
 def get_pagination_params(
     page: int = Query(1, ge=1, description="Current page number"),
-    size: int = Query(10, ge=1, le=100, description="Number of items per page")
+    size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor (keyset pagination, overrides page)"),
+    with_total: bool = Query(True, description="Set false to skip counting the total (faster deep pages)"),
 ) -> PaginationParams:
     """
     Dependency function để lấy pagination params từ query string.
@@ -13,5 +16,5 @@ def get_pagination_params(
     Sử dụng trong controllers:
         pagination: PaginationParams = Depends(get_pagination_params)
     """
-    return PaginationParams(page=page, size=size)
+    return PaginationParams(page=page, size=size, cursor=cursor, with_total=with_total)
 
@@ -1,16 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.config.settings import settings
-from app.controllers import movie_controller, user_controller, booking_controller, room_controller, seat_controller, showtime_controller, theater_controller, favorite_controller, auth_controller, payment_controller
+from app.controllers import movie_controller, user_controller, booking_controller, room_controller, seat_controller, showtime_controller, theater_controller, favorite_controller, auth_controller, payment_controller, cache_controller, metrics_controller
 from app.config.error_handler import register_exception_handlers
 from app.middleware import setup_middleware, setup_development_middleware
+from app.services.seat_hold_service import seat_hold_service
+from app.auth.password_hasher import password_hasher
+from app.config.database import async_engine
+from app.config.logger import configure_logging, parse_levels
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background scheduler trả ghế của các hold hết hạn
+    seat_hold_service.start()
+    # Process pool cho bcrypt (login / register / đổi mật khẩu)
+    password_hasher.start()
+    yield
+    seat_hold_service.stop()
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 def create_app():
+    # Ghi log qua QueueHandler / QueueListener (I/O không chạy trên thread của request)
+    configure_logging(
+        level=settings.LOG_LEVEL,
+        json_output=settings.LOG_JSON,
+        levels=parse_levels(settings.LOG_LEVELS),
+        repository_sample_rate=settings.LOG_REPOSITORY_SAMPLE_RATE,
+    )
+
     app = FastAPI(
         title=settings.PROJECT_NAME, 
         version="1.0.0",
         debug=settings.DEBUG,
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # Setup middleware
@@ -31,6 +57,14 @@ def create_app():
     app.include_router(favorite_controller.router)
     app.include_router(auth_controller.router)
     app.include_router(payment_controller.router)
+    app.include_router(cache_controller.router)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_controller.router)
+
+    # Route đọc async (opt-in) chạy song song với bản sync để so sánh
+    if settings.ASYNC_DB_ENABLED:
+        app.include_router(movie_controller.async_router)
+        app.include_router(showtime_controller.async_router)
     
     # Register error handler
     register_exception_handlers(app)
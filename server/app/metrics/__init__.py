@@ -0,0 +1,95 @@
+from app.metrics.registry import CallbackGauge, Counter, Gauge, Histogram, Registry
+
+# Registry chung của process, render ở GET /metrics
+registry = Registry()
+
+# -------------------- HTTP --------------------
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Total HTTP requests by method, route template and status",
+    ("method", "route", "status"),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template",
+    ("method", "route"),
+))
+http_requests_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ("method",),
+))
+
+# -------------------- DATABASE --------------------
+db_pool_wait_seconds = registry.register(Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+
+
+def _pool_stats():
+    from app.config.database import engine
+
+    pool = engine.pool
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, name, None)
+        if callable(reader):
+            yield (name,), reader()
+
+
+registry.register(CallbackGauge(
+    "db_pool_connections", "Connection pool state (size, checkedin, checkedout, overflow)",
+    _pool_stats, ("state",),
+))
+
+# -------------------- RATE LIMIT / CACHE --------------------
+def _rate_limit_rejections():
+    from app.middleware.rate_limit import rejections
+
+    return [((scope,), count) for scope, count in sorted(rejections.items())]
+
+
+def _response_cache_stats():
+    from app.cache import response_cache
+
+    stats = response_cache.stats()
+    return [(("hits",), stats["hits"]), (("misses",), stats["misses"]), (("errors",), stats["errors"]),
+            (("hit_ratio",), stats["hit_ratio"]), (("entries",), stats["entries"])]
+
+
+def _password_hasher_stats():
+    from app.auth.password_hasher import password_hasher
+
+    stats = password_hasher.stats()
+    return [((key,), stats[key]) for key in ("pending", "max_pending", "rejected")]
+
+
+def _seat_stream_stats():
+    from app.services.seat_stream_service import seat_stream_service
+
+    stats = seat_stream_service.stats()
+    return [((key,), stats[key]) for key in ("subscribers", "showtimes", "published", "dropped")]
+
+
+registry.register(CallbackGauge(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter", _rate_limit_rejections, ("scope",),
+    kind="counter",
+))
+registry.register(CallbackGauge(
+    "response_cache", "Response cache counters and hit ratio", _response_cache_stats, ("stat",),
+))
+registry.register(CallbackGauge(
+    "password_hasher", "Password hashing pool queue state", _password_hasher_stats, ("stat",),
+))
+registry.register(CallbackGauge(
+    "seat_stream", "Live seat stream subscribers and delta counters", _seat_stream_stats, ("stat",),
+))
+
+__all__ = [
+    "CallbackGauge",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "db_pool_wait_seconds",
+    "http_request_duration_seconds",
+    "http_requests_in_progress",
+    "http_requests_total",
+    "registry",
+]
@@ -0,0 +1,119 @@
+import re
+import time
+from collections import Counter as Tally
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config.logger import logger
+from app.config.settings import settings
+from app.metrics import registry
+from app.metrics.registry import Counter, Histogram
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+|\$\d+)\s*,)+\s*(?:\?|%s|:\w+|\$\d+)\s*\)")
+
+db_queries_total = registry.register(Counter("db_queries_total", "SQL statements executed"))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+))
+db_repeated_queries_total = registry.register(Counter(
+    "db_repeated_queries_total", "Requests that repeated one statement fingerprint (likely N+1)", ("route",),
+))
+
+
+def fingerprint(statement: str) -> str:
+    """Chuẩn hóa câu SQL (bỏ literal, gộp IN (?, ?, ...)) để nhận ra cùng 1 query chạy lặp."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    return _PLACEHOLDER_LIST.sub("(?)", normalized)
+
+
+class QueryStats:
+    """Số query, tổng thời gian DB và số lần lặp của từng fingerprint trong 1 request."""
+
+    __slots__ = ("count", "duration", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Tally = Tally()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Các fingerprint chạy >= threshold lần (dấu hiệu N+1)."""
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+
+class QueryTracker:
+    """
+    Đo query qua event before/after_cursor_execute của engine và cộng vào QueryStats
+    của request hiện tại (ContextVar, được copy sang thread chạy endpoint sync).
+    budget: số query tối đa / request; vượt thì ghi vào violations (test suite dùng ở strict mode).
+    """
+
+    def __init__(self, repeat_threshold: int = 5):
+        self.repeat_threshold = repeat_threshold
+        self.budget: Optional[int] = None
+        self.violations: List[Tuple[str, int]] = []
+        self._current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+    def instrument(self, engine) -> None:
+        if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            return
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.get("query_started")
+        duration = time.perf_counter() - started.pop() if started else 0.0
+        db_queries_total.inc()
+        db_query_duration_seconds.observe((), duration)
+        stats = self._current.get()
+        if stats is not None:
+            stats.record(statement, duration)
+
+    @property
+    def current(self) -> Optional[QueryStats]:
+        return self._current.get()
+
+    @contextmanager
+    def track(self) -> Iterator[QueryStats]:
+        stats = QueryStats()
+        token = self._current.set(stats)
+        try:
+            yield stats
+        finally:
+            self._current.reset(token)
+
+    def finish(self, method: str, route: str, stats: QueryStats) -> None:
+        """Ghi metrics của 1 request đã xong; cảnh báo N+1 và kiểm tra budget."""
+        db_queries_per_request.observe((route,), stats.count)
+        repeated = stats.repeated(self.repeat_threshold)
+        if repeated:
+            db_repeated_queries_total.inc((route,))
+            sql, times = repeated[0]
+            logger.warning("Possible N+1: %s %s ran %d queries, %dx %s", method, route, stats.count, times, sql[:200])
+        if self.budget is not None and stats.count > self.budget:
+            self.violations.append((f"{method} {route}", stats.count))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+query_tracker = QueryTracker(repeat_threshold=settings.QUERY_REPEAT_THRESHOLD)
@@ -0,0 +1,171 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ThreadShards:
+    """
+    Mỗi thread ghi vào shard riêng (threading.local) nên ghi metric không cần lock;
+    lock chỉ dùng khi 1 thread tạo shard lần đầu và khi gom số liệu lúc scrape.
+    """
+
+    def __init__(self, factory: Callable[[], dict]):
+        self._factory = factory
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._factory()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def snapshot(self) -> List[list]:
+        with self._lock:
+            shards = list(self._shards)
+        # list(dict.items()) chạy trọn trong C nên an toàn khi thread khác đang ghi
+        return [list(shard.items()) for shard in shards]
+
+    def clear(self) -> None:
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Bộ đếm chỉ tăng (hoặc gauge cộng dồn nếu kind="gauge", dùng cho inc/dec)."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), kind: str = "counter"):
+        self.name, self.help, self.labelnames, self.kind = name, help, tuple(labelnames), kind
+        self._shards = _ThreadShards(dict)
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        shard = self._shards.get()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def values(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for items in self._shards.snapshot():
+            for labels, value in items:
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in sorted(self.values().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+    def clear(self) -> None:
+        self._shards.clear()
+
+
+class Gauge(Counter):
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames, kind="gauge")
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards(dict)
+
+    def observe(self, labels: Labels, value: float) -> None:
+        shard = self._shards.get()
+        state = shard.get(labels)
+        if state is None:
+            # [đếm theo bucket (không cộng dồn) ..., +Inf, sum, count]
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def values(self) -> Dict[Labels, list]:
+        totals: Dict[Labels, list] = {}
+        for items in self._shards.snapshot():
+            for labels, state in items:
+                total = totals.setdefault(labels, [0] * len(state))
+                for i, value in enumerate(list(state)):
+                    total[i] += value
+        return totals
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        names = self.labelnames + ("le",)
+        for labels, state in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, labels + (_format_bound(bound),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}"
+
+    def clear(self) -> None:
+        self._shards.clear()
+
+
+class CallbackGauge:
+    """
+    Metric đọc giá trị lúc scrape (vd. trạng thái connection pool, tỉ lệ hit của cache);
+    kind="counter" cho các bộ đếm sẵn có ở module khác.
+    """
+
+    def __init__(self, name: str, help: str, callback: Callable[[], Iterable[Tuple[Labels, float]]],
+                 labelnames: Sequence[str] = (), kind: str = "gauge"):
+        self.name, self.help, self.labelnames, self.callback = name, help, tuple(labelnames), callback
+        self.kind = kind
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in self.callback():
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+    def clear(self) -> None:
+        pass
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from app.middleware.cors import setup_cors_middleware
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.metrics import MetricsMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware, AuthRateLimitMiddleware
 from app.middleware.security import SecurityHeadersMiddleware, CORSSecurityMiddleware
 from app.middleware.validation import RequestValidationMiddleware, IPWhitelistMiddleware
@@ -45,6 +46,10 @@ def setup_middleware(app: FastAPI):
     
     # 8. Logging Middleware (cuối cùng để log tất cả)
     app.add_middleware(LoggingMiddleware)
+    
+    # 9. Metrics Middleware (ngoài cùng để đo cả thời gian của các middleware khác)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, debug_headers=settings.QUERY_DEBUG_HEADERS)
 
 def setup_production_middleware(app: FastAPI):
     """Cấu hình middleware cho production"""
@@ -74,6 +79,10 @@ def setup_production_middleware(app: FastAPI):
     
     # Logging
     app.add_middleware(LoggingMiddleware)
+    
+    # Metrics
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, debug_headers=settings.QUERY_DEBUG_HEADERS)
 
 def setup_development_middleware(app: FastAPI):
     """Cấu hình middleware cho development"""
@@ -103,3 +112,7 @@ def setup_development_middleware(app: FastAPI):
     
     # Logging chi tiết
     app.add_middleware(LoggingMiddleware)
+    
+    # Metrics
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, debug_headers=settings.QUERY_DEBUG_HEADERS)
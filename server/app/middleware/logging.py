@@ -1,56 +1,62 @@
 import time
-import logging
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.config.logger import logger
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware để log các request và response"""
-    
-    async def dispatch(self, request: Request, call_next):
-        # Log request
-        start_time = time.time()
-        
+import uuid
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config.logger import logger, request_id_var
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+class LoggingMiddleware:
+    """
+    Middleware (ASGI thuần) để log các request và response.
+    Gán request id (lấy từ header X-Request-ID hoặc tạo mới) cho mọi log trong request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        headers = Headers(scope=scope)
+        request_id = headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
         # Lấy thông tin request
-        method = request.method
-        url = str(request.url)
-        client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Log request info
-        logger.info(
-            f"Request: {method} {url} - "
-            f"IP: {client_ip} - "
-            f"User-Agent: {user_agent}"
-        )
-        
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+
+        # Log request info (DEBUG: mỗi request chỉ 1 dòng INFO lúc trả response)
+        logger.debug("Request: %s %s - IP: %s - User-Agent: %s",
+                     method, path, client_ip, headers.get("user-agent", "unknown"))
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Calculate processing time
+                process_time = time.perf_counter() - start_time
+
+                # Log response info
+                logger.info("Response: %s - Time: %.4fs - Method: %s - URL: %s - IP: %s",
+                            message["status"], process_time, method, path, client_ip)
+
+                # Add processing time / request id to response headers
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Process-Time"] = str(process_time)
+                response_headers[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
         # Process request
         try:
-            response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log response info
-            logger.info(
-                f"Response: {response.status_code} - "
-                f"Time: {process_time:.4f}s - "
-                f"Method: {method} - "
-                f"URL: {url}"
-            )
-            
-            # Add processing time to response headers
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            return response
-            
+            await self.app(scope, receive, send_with_timing)
         except Exception as e:
             # Log error
-            process_time = time.time() - start_time
-            logger.error(
-                f"Error: {str(e)} - "
-                f"Time: {process_time:.4f}s - "
-                f"Method: {method} - "
-                f"URL: {url}"
-            )
+            logger.error("Error: %s - Time: %.4fs - Method: %s - URL: %s",
+                         e, time.perf_counter() - start_time, method, path)
             raise
+        finally:
+            request_id_var.reset(token)
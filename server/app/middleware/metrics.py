@@ -0,0 +1,62 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import http_request_duration_seconds, http_requests_in_progress, http_requests_total
+from app.metrics.query_tracker import query_tracker
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Route template mà router đã match (vd "/movies/{movie_id}" thay vì "/movies/42")
+    để số series không tăng theo id; router ghi route vào scope nên không phải match lại.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Middleware (ASGI thuần) đếm request và đo latency theo method / route template / status,
+    kèm số query SQL của request (debug_headers=True thì trả về qua X-DB-Query-Count / X-DB-Query-Time).
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.debug_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Query-Time"] = f"{stats.duration * 1000:.2f}ms"
+                    repeated = stats.fingerprints.most_common(1)
+                    headers["X-DB-Query-Max-Repeat"] = str(repeated[0][1] if repeated else 0)
+            await send(message)
+
+        # Route chỉ biết sau khi router match -> request đang chạy chỉ gán nhãn theo method
+        http_requests_in_progress.inc((method,))
+        try:
+            with query_tracker.track() as stats:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec((method,))
+            route = route_template(scope)
+            http_request_duration_seconds.observe((method, route), time.perf_counter() - started)
+            http_requests_total.inc((method, route, str(status_code)))
+            query_tracker.finish(method, route, stats)
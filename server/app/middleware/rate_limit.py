@@ -1,157 +1,147 @@
-import time
-from typing import Dict, Tuple
-from fastapi import Request, status
+from collections import defaultdict
+from typing import Dict
+from fastapi import HTTPException, Request, status
 from fastapi.responses import JSONResponse, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from collections import defaultdict, deque
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware để giới hạn số lượng request"""
-    
-    def __init__(self, app, calls: int = 100, period: int = 60):
-        super().__init__(app)
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.jwt_auth import verify_token
+from app.auth.token_cache import token_cache
+from app.config.settings import settings
+from app.middleware.rate_limit_backends import rate_limit_backend
+
+LOCALHOST_IPS = ("127.0.0.1", "localhost", "::1")
+
+# Số request bị chặn theo scope ("api" / "auth") - dùng cho monitoring
+rejections: Dict[str, int] = defaultdict(int)
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Key giới hạn: user id nếu có JWT hợp lệ (1 user dùng nhiều IP / nhiều user
+    sau 1 NAT đều được tính đúng), không thì IP. Không query database.
+    """
+    authorization = request.headers.get("authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        token = authorization[7:].strip()
+        cached = token_cache.get(token)
+        if cached is not None:
+            return f"user:{cached[1].id}"
+        try:
+            subject = verify_token(token).get("sub")
+        except HTTPException:
+            subject = None
+        if subject is not None:
+            return f"user:{subject}"
+    return f"ip:{_client_ip(request)}"
+
+
+def _is_local_development(client_ip: str) -> bool:
+    if not (settings.DEBUG or settings.ENVIRONMENT == "development"):
+        return False
+    return client_ip in LOCALHOST_IPS or client_ip.startswith("127.")
+
+
+def _preflight_response(request: Request) -> Response:
+    # Ensure CORS preflight is handled quickly and does not get rate-limited
+    origin = request.headers.get("origin") or "*"
+    headers = {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Allow-Headers": (
+            "Content-Type, Authorization, X-Requested-With, Accept, Origin, X-CSRF-Token"
+        ),
+        "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
+    }
+    return Response(status_code=200, headers=headers)
+
+
+class RateLimitMiddleware:
+    """Middleware (ASGI thuần) để giới hạn số lượng request (sliding-window-counter, xem rate_limit_backends)"""
+
+    scope = "api"
+    header_prefix = "X-RateLimit"
+    message = "Rate limit exceeded"
+
+    def __init__(self, app: ASGIApp, calls: int = 100, period: int = 60, backend=None):
+        self.app = app
         self.calls = calls  # Số lượng request cho phép
         self.period = period  # Thời gian tính bằng giây
-        self.requests: Dict[str, deque] = defaultdict(deque)
-    
-    async def dispatch(self, request: Request, call_next):
-        # Lấy IP của client
-        client_ip = request.client.host if request.client else "unknown"
-        
+        self.backend = backend or rate_limit_backend
+
+    def applies_to(self, request: Request) -> bool:
+        return True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        if not self.applies_to(request):
+            await self.app(scope, receive, send)
+            return
+
         # Bypass rate limiting cho localhost trong development
-        from app.config.settings import settings
-        if settings.DEBUG or settings.ENVIRONMENT == "development":
-            if client_ip in ["127.0.0.1", "localhost", "::1"] or client_ip.startswith("127."):
-                # Trong development, bypass rate limiting cho localhost
-                response = await call_next(request)
-                return response
-        
-        # Lấy thời gian hiện tại
-        current_time = time.time()
-        
-        # Làm sạch các request cũ
-        self._clean_old_requests(client_ip, current_time)
-        
+        if _is_local_development(_client_ip(request)):
+            await self.app(scope, receive, send)
+            return
+
         # Nếu là preflight OPTIONS, trả ngay 200 (không tính giới hạn)
         if request.method == "OPTIONS":
-            # Ensure CORS preflight is handled quickly and does not get rate-limited
-            origin = request.headers.get("origin") or "*"
-            headers = {
-                "Access-Control-Allow-Origin": origin,
-                "Access-Control-Allow-Credentials": "true",
-                "Access-Control-Allow-Headers": (
-                    "Content-Type, Authorization, X-Requested-With, Accept, Origin, X-CSRF-Token"
-                ),
-                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
-            }
-            return Response(status_code=200, headers=headers)
+            await _preflight_response(request)(scope, receive, send)
+            return
 
-        # Kiểm tra số lượng request
-        if len(self.requests[client_ip]) >= self.calls:
+        result = await self.backend.hit(f"{self.scope}:{rate_limit_key(request)}", self.calls, self.period)
+        if not result.allowed:
+            rejections[self.scope] += 1
             origin = request.headers.get("origin") or "*"
             headers = {
                 "Access-Control-Allow-Origin": origin,
                 "Access-Control-Allow-Credentials": "true",
                 "Access-Control-Allow-Headers": "Authorization, Content-Type",
+                "Retry-After": str(self.period),
             }
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"detail": f"Rate limit exceeded: {self.calls} requests per {self.period} seconds"},
+                content={"detail": f"{self.message}: {self.calls} requests per {self.period} seconds"},
                 headers=headers,
             )
-        
-        # Thêm request mới
-        self.requests[client_ip].append(current_time)
-        
-        # Process request
-        response = await call_next(request)
-        
+            await response(scope, receive, send)
+            return
+
         # Thêm rate limit headers
-        remaining = self.calls - len(self.requests[client_ip])
-        response.headers["X-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(current_time + self.period))
-        
-        return response
-    
-    def _clean_old_requests(self, client_ip: str, current_time: float):
-        """Xóa các request cũ hơn period"""
-        while (self.requests[client_ip] and 
-               current_time - self.requests[client_ip][0] > self.period):
-            self.requests[client_ip].popleft()
-
-class AuthRateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting riêng cho auth endpoints"""
-    
-    def __init__(self, app, calls: int = 5, period: int = 300):  # 5 calls per 5 minutes
-        super().__init__(app)
-        self.calls = calls
-        self.period = period
-        self.requests: Dict[str, deque] = defaultdict(deque)
-    
-    async def dispatch(self, request: Request, call_next):
-        # Chỉ áp dụng cho auth endpoints
-        if not request.url.path.startswith("/auth/"):
-            return await call_next(request)
+        rate_limit_headers = {
+            f"{self.header_prefix}-Limit": str(result.limit),
+            f"{self.header_prefix}-Remaining": str(result.remaining),
+            f"{self.header_prefix}-Reset": str(result.reset),
+        }
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for header, value in rate_limit_headers.items():
+                    headers[header] = value
+            await send(message)
 
-        # Allow preflight through without counting
-        if request.method == "OPTIONS":
-            origin = request.headers.get("origin") or "*"
-            headers = {
-                "Access-Control-Allow-Origin": origin,
-                "Access-Control-Allow-Credentials": "true",
-                "Access-Control-Allow-Headers": (
-                    "Content-Type, Authorization, X-Requested-With, Accept, Origin, X-CSRF-Token"
-                ),
-                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
-            }
-            return Response(status_code=200, headers=headers)
-        
-        client_ip = request.client.host if request.client else "unknown"
-        
-        # Bypass rate limiting cho localhost trong development
-        from app.config.settings import settings
-        if settings.DEBUG or settings.ENVIRONMENT == "development":
-            if client_ip in ["127.0.0.1", "localhost", "::1"] or client_ip.startswith("127."):
-                # Trong development, bypass rate limiting cho localhost
-                response = await call_next(request)
-                return response
-        
-        current_time = time.time()
-        
-        # Làm sạch các request cũ
-        self._clean_old_requests(client_ip, current_time)
-        
-        # Kiểm tra số lượng request
-        if len(self.requests[client_ip]) >= self.calls:
-            origin = request.headers.get("origin") or "*"
-            headers = {
-                "Access-Control-Allow-Origin": origin,
-                "Access-Control-Allow-Credentials": "true",
-                "Access-Control-Allow-Headers": "Authorization, Content-Type",
-            }
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"detail": f"Auth rate limit exceeded: {self.calls} requests per {self.period} seconds"},
-                headers=headers,
-            )
-        
-        # Thêm request mới
-        self.requests[client_ip].append(current_time)
-        
         # Process request
-        response = await call_next(request)
-        
-        # Thêm rate limit headers
-        remaining = self.calls - len(self.requests[client_ip])
-        response.headers["X-Auth-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-Auth-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-Auth-RateLimit-Reset"] = str(int(current_time + self.period))
-        
-        return response
-    
-    def _clean_old_requests(self, client_ip: str, current_time: float):
-        """Xóa các request cũ hơn period"""
-        while (self.requests[client_ip] and 
-               current_time - self.requests[client_ip][0] > self.period):
-            self.requests[client_ip].popleft()
+        await self.app(scope, receive, send_with_headers)
+
+
+class AuthRateLimitMiddleware(RateLimitMiddleware):
+    """Rate limiting riêng cho auth endpoints"""
+
+    scope = "auth"
+    header_prefix = "X-Auth-RateLimit"
+    message = "Auth rate limit exceeded"
+
+    def __init__(self, app: ASGIApp, calls: int = 5, period: int = 300, backend=None):  # 5 calls per 5 minutes
+        super().__init__(app, calls=calls, period=period, backend=backend)
+
+    def applies_to(self, request: Request) -> bool:
+        # Chỉ áp dụng cho auth endpoints
+        return request.url.path.startswith("/auth/")
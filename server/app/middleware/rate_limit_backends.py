@@ -0,0 +1,145 @@
+import math
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from app.config.logger import logger
+from app.config.settings import settings
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # epoch giây khi cửa sổ hiện tại kết thúc
+
+
+def _window(now: float, period: int):
+    """(chỉ số cửa sổ, trọng số còn lại của cửa sổ trước)."""
+    index = int(now // period)
+    previous_weight = 1.0 - (now - index * period) / period
+    return index, previous_weight
+
+
+def _result(allowed: bool, limit: int, estimate: float, index: int, period: int) -> RateLimitResult:
+    return RateLimitResult(allowed, limit, max(0, limit - math.ceil(estimate)), (index + 1) * period)
+
+
+class MemoryRateLimitBackend:
+    """
+    Sliding-window-counter trong process: mỗi key chỉ giữ 4 số
+    [chỉ số cửa sổ, đếm cửa sổ hiện tại, đếm cửa sổ trước, hết hạn lúc]
+    thay vì 1 timestamp cho mỗi request.
+
+    Ước lượng = đếm_trước * phần cửa sổ trước còn nằm trong period + đếm_hiện_tại.
+    Key chia vào các shard; mỗi `sweep_every` lượt gọi dọn 1 shard (key idle quá
+    2 period bị xóa) nên chi phí dọn dẹp được rải đều. Chỉ được gọi trên event loop
+    (middleware) nên không cần lock.
+    """
+
+    name = "memory"
+
+    def __init__(self, shards: int = 16, sweep_every: int = 256):
+        self._shards: List[Dict[str, list]] = [{} for _ in range(shards)]
+        self._sweep_every = sweep_every
+        self._sweep_cursor = 0
+        self._calls = 0
+
+    async def hit(self, key: str, limit: int, period: int, now: Optional[float] = None) -> RateLimitResult:
+        now = time.time() if now is None else now
+        index, previous_weight = _window(now, period)
+        shard = self._shards[hash(key) % len(self._shards)]
+
+        entry = shard.get(key)
+        if entry is None or index - entry[0] >= 2:
+            current, previous = 0, 0
+        elif index - entry[0] == 1:
+            current, previous = 0, entry[1]
+        else:
+            current, previous = entry[1], entry[2]
+
+        estimate = previous * previous_weight + current
+        allowed = estimate < limit
+        if allowed:
+            current += 1
+            estimate += 1
+        shard[key] = [index, current, previous, (index + 2) * period]
+
+        self._calls += 1
+        if self._calls % self._sweep_every == 0:
+            self._sweep(now)
+        return _result(allowed, limit, estimate, index, period)
+
+    def _sweep(self, now: float) -> None:
+        shard = self._shards[self._sweep_cursor]
+        self._sweep_cursor = (self._sweep_cursor + 1) % len(self._shards)
+        expired = [key for key, entry in shard.items() if entry[3] <= now]
+        for key in expired:
+            del shard[key]
+
+    def size(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+
+# Đọc đếm 2 cửa sổ và chỉ tăng khi còn quota - atomic trên Redis
+_REDIS_HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current >= tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {1, current, previous}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Sliding-window-counter trên Redis (2 key đếm / client, tự hết hạn sau 2 period),
+    dùng chung giữa các worker / node. Lỗi Redis -> cho request đi qua (fail open).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, password: Optional[str] = None, prefix: str = "movie_booking:ratelimit:"):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from e
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url, password=password)
+        self._script = self._client.register_script(_REDIS_HIT_SCRIPT)
+
+    async def hit(self, key: str, limit: int, period: int, now: Optional[float] = None) -> RateLimitResult:
+        now = time.time() if now is None else now
+        index, previous_weight = _window(now, period)
+        keys = [f"{self.prefix}{key}:{index}", f"{self.prefix}{key}:{index - 1}"]
+        try:
+            allowed, current, previous = await self._script(keys=keys, args=[limit, previous_weight, 2 * period])
+        except Exception as e:
+            logger.warning(f"[RateLimit] Redis backend failed, allowing request: {e}")
+            return RateLimitResult(True, limit, limit, (index + 1) * period)
+        return _result(bool(allowed), limit, int(previous) * previous_weight + int(current), index, period)
+
+    def size(self) -> Optional[int]:
+        return None
+
+    def clear(self) -> None:
+        # Key tự hết hạn trên Redis
+        pass
+
+
+def build_rate_limit_backend():
+    backend_name = settings.RATE_LIMIT_BACKEND.lower()
+    if backend_name == "redis" and settings.REDIS_URL:
+        return RedisRateLimitBackend(settings.REDIS_URL, password=settings.REDIS_PASSWORD)
+    if backend_name == "redis":
+        logger.warning("RATE_LIMIT_BACKEND=redis but REDIS_URL is not set. Limits are enforced per process.")
+    return MemoryRateLimitBackend()
+
+
+rate_limit_backend = build_rate_limit_backend()
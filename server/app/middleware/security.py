@@ -1,132 +1,148 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Security headers (tính sẵn 1 lần, chỉ ghi vào header của response)
+SECURITY_HEADERS = {
+    # Ngăn chặn clickjacking
+    "X-Frame-Options": "DENY",
+
+    # Ngăn chặn MIME type sniffing
+    "X-Content-Type-Options": "nosniff",
+
+    # XSS Protection
+    "X-XSS-Protection": "1; mode=block",
+
+    # Strict Transport Security (HTTPS only)
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+
+    # Content Security Policy
+    "Content-Security-Policy": (
+        "default-src 'self'; "
+        "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net https://unpkg.com; "
+        "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://unpkg.com; "
+        "img-src 'self' data: https:; "
+        "font-src 'self' data: https:; "
+        "connect-src 'self'; "
+        "frame-ancestors 'none';"
+    ),
+
+    # Referrer Policy
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+
+    # Permissions Policy
+    "Permissions-Policy": (
+        "geolocation=(), "
+        "microphone=(), "
+        "camera=(), "
+        "payment=(), "
+        "usb=(), "
+        "magnetometer=(), "
+        "gyroscope=(), "
+        "speaker=()"
+    ),
+
+}
+
+# Cache Control cho sensitive endpoints - chỉ set nếu route chưa tự khai báo
+# (vd. sơ đồ ghế dùng ETag + "no-cache" để client revalidate thay vì tải lại)
+CACHE_CONTROL_HEADERS = {
+    "Cache-Control": "no-store, no-cache, must-revalidate, proxy-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+}
+
+CORS_SECURITY_HEADERS = {
+    # Ngăn chặn preflight cache
+    "Access-Control-Max-Age": "86400",  # 24 hours
+
+    # Chỉ cho phép các headers cần thiết
+    "Access-Control-Allow-Headers": (
+        "Content-Type, Authorization, X-Requested-With, "
+        "Accept, Origin, X-CSRF-Token"
+    ),
+
+    # Chỉ cho phép các methods cần thiết
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
+
+    # Không expose sensitive headers
+    "Access-Control-Expose-Headers": (
+        "X-Process-Time, X-RateLimit-Limit, "
+        "X-RateLimit-Remaining, X-RateLimit-Reset"
+    ),
+}
+
+DEFAULT_ERROR_ORIGIN = "http://localhost:5173"
+
+
+class SecurityHeadersMiddleware:
+    """Middleware (ASGI thuần) để thêm các security headers"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                headers = MutableHeaders(scope=message)
+                for header, value in SECURITY_HEADERS.items():
+                    headers[header] = value
+                if "cache-control" not in headers:
+                    for header, value in CACHE_CONTROL_HEADERS.items():
+                        headers[header] = value
+            await send(message)
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware để thêm các security headers"""
-    
-    async def dispatch(self, request: Request, call_next):
         try:
-            response = await call_next(request)
-        except Exception as e:
+            await self.app(scope, receive, send_with_headers)
+        except Exception:
+            if response_started:
+                raise
             # Nếu có exception trong downstream, đảm bảo vẫn trả response
             # với header CORS/security cơ bản để browser không block preflight
-            origin = request.headers.get("origin")
-            if not origin:
-                allowed_origins = [
-                    "http://localhost:5173",
-                    "http://127.0.0.1:5173",
-                    "http://localhost:3000",
-                    "http://127.0.0.1:3000",
-                ]
-                origin = allowed_origins[0] if allowed_origins else "*"
-            
+            origin = Headers(scope=scope).get("origin") or DEFAULT_ERROR_ORIGIN
             cors_headers = {
                 "Access-Control-Allow-Origin": origin,
                 "Access-Control-Allow-Credentials": "true",
                 "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, PATCH, OPTIONS",
                 "Access-Control-Allow-Headers": "Authorization, Content-Type, X-Requested-With",
             }
-            response = Response(
-                content="Internal Server Error", 
-                status_code=500,
-                headers=cors_headers
-            )
-        
-        # Security headers
-        security_headers = {
-            # Ngăn chặn clickjacking
-            "X-Frame-Options": "DENY",
-            
-            # Ngăn chặn MIME type sniffing
-            "X-Content-Type-Options": "nosniff",
-            
-            # XSS Protection
-            "X-XSS-Protection": "1; mode=block",
-            
-            # Strict Transport Security (HTTPS only)
-            "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
-            
-            # Content Security Policy
-            "Content-Security-Policy": (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net https://unpkg.com; "
-                "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://unpkg.com; "
-                "img-src 'self' data: https:; "
-                "font-src 'self' data: https:; "
-                "connect-src 'self'; "
-                "frame-ancestors 'none';"
-            ),
-            
-            # Referrer Policy
-            "Referrer-Policy": "strict-origin-when-cross-origin",
-            
-            # Permissions Policy
-            "Permissions-Policy": (
-                "geolocation=(), "
-                "microphone=(), "
-                "camera=(), "
-                "payment=(), "
-                "usb=(), "
-                "magnetometer=(), "
-                "gyroscope=(), "
-                "speaker=()"
-            ),
-            
-            # Cache Control cho sensitive endpoints
-            "Cache-Control": "no-store, no-cache, must-revalidate, proxy-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0",
-        }
-        
-        # Thêm headers vào response
-        for header, value in security_headers.items():
-            response.headers[header] = value
-        
-        return response
-
-class CORSSecurityMiddleware(BaseHTTPMiddleware):
-    """Middleware để tăng cường bảo mật CORS"""
-    
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Thêm CORS security headers
-        cors_security_headers = {
-            # Ngăn chặn preflight cache
-            "Access-Control-Max-Age": "86400",  # 24 hours
-            
-            # Chỉ cho phép các headers cần thiết
-            "Access-Control-Allow-Headers": (
-                "Content-Type, Authorization, X-Requested-With, "
-                "Accept, Origin, X-CSRF-Token"
-            ),
-            
-            # Chỉ cho phép các methods cần thiết
-            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
-            
-            # Không expose sensitive headers
-            "Access-Control-Expose-Headers": (
-                "X-Process-Time, X-RateLimit-Limit, "
-                "X-RateLimit-Remaining, X-RateLimit-Reset"
-            ),
-        }
-        
-        # Thêm headers vào response
-        for header, value in cors_security_headers.items():
-            response.headers[header] = value
-
-        # Đảm bảo Access-Control-Allow-Origin được set (fallback) —
-        # một số trình duyệt/preflight có thể không nhận header nếu middleware khác
-        # vô tình loại bỏ nó, vì vậy thêm fallback bằng origin của request.
-        origin = request.headers.get("origin")
-        if origin:
-            response.headers.setdefault("Access-Control-Allow-Origin", origin)
-        else:
-            # Nếu không có origin, cho phép tất cả (development fallback)
-            response.headers.setdefault("Access-Control-Allow-Origin", "*")
-
-        # Cho phép credentials nếu client cần gửi cookie/token
-        response.headers.setdefault("Access-Control-Allow-Credentials", "true")
-        
-        return response
+            response = Response(content="Internal Server Error", status_code=500, headers=cors_headers)
+            await response(scope, receive, send_with_headers)
+
+
+class CORSSecurityMiddleware:
+    """Middleware (ASGI thuần) để tăng cường bảo mật CORS"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Nếu không có origin, cho phép tất cả (development fallback)
+        origin = Headers(scope=scope).get("origin") or "*"
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for header, value in CORS_SECURITY_HEADERS.items():
+                    headers[header] = value
+                # Đảm bảo Access-Control-Allow-Origin được set (fallback) —
+                # một số trình duyệt/preflight có thể không nhận header nếu middleware khác
+                # vô tình loại bỏ nó, vì vậy thêm fallback bằng origin của request.
+                headers.setdefault("Access-Control-Allow-Origin", origin)
+                # Cho phép credentials nếu client cần gửi cookie/token
+                headers.setdefault("Access-Control-Allow-Credentials", "true")
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,136 +1,212 @@
-import json
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-
-class RequestValidationMiddleware(BaseHTTPMiddleware):
-    """Middleware để validate request và ngăn chặn các attack cơ bản"""
-    
-    def __init__(self, app, max_content_length: int = 10 * 1024 * 1024):  # 10MB
-        super().__init__(app)
+import re
+from typing import Optional
+
+from fastapi import status
+from starlette.datastructures import Headers, URL
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+
+async def _reject(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str) -> None:
+    await JSONResponse(status_code=status_code, content={"detail": detail})(scope, receive, send)
+
+
+# Danh sách các patterns nguy hiểm
+DANGEROUS_PATTERNS = [
+    "<script",
+    "javascript:",
+    "vbscript:",
+    "onload=",
+    "onerror=",
+    "onclick=",
+    "eval(",
+    "expression(",
+    "url(",
+    "import ",
+    "exec(",
+    "system(",
+    "cmd",
+    "powershell",
+    "bash",
+    "sh ",
+    "&&",
+    "||",
+    "`",
+    "$(",
+    "<?php",
+    "<%",
+    "SELECT ",
+    "INSERT ",
+    "UPDATE ",
+    "DELETE ",
+    "DROP ",
+    "UNION ",
+    "OR 1=1",
+    "AND 1=1",
+]
+
+
+def _trie_regex(needles) -> bytes:
+    """Regex dạng trie (gộp tiền tố chung) cho tập chuỗi: mỗi vị trí chỉ thử 1 nhánh theo byte đầu."""
+    trie: dict = {}
+    for needle in needles:
+        node = trie
+        for byte in needle:
+            node = node.setdefault(byte, {})
+        node[None] = True
+
+    def build(node) -> bytes:
+        branches = [re.escape(bytes([byte])) + build(child)
+                    for byte, child in sorted((k, v) for k, v in node.items() if k is not None)]
+        if not branches:
+            return b""
+        # Một needle kết thúc ở đây -> phần còn lại là tùy chọn (đã đủ để coi là match)
+        if None in node:
+            return b""
+        return branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+
+    return build(trie)
+
+
+class PatternMatcher:
+    """
+    Gộp mọi pattern thành 1 regex trie biên dịch sẵn (trên bytes đã lowercase), nên
+    body chỉ được quét 1 lần, chi phí theo độ dài body chứ không theo số pattern.
+    """
+
+    def __init__(self, patterns):
+        needles = {pattern.lower().encode() for pattern in patterns}
+        self.regex = re.compile(_trie_regex(needles))
+        # Số byte cuối của chunk trước cần giữ lại để bắt pattern nằm vắt qua 2 chunk
+        self.overlap = max(len(needle) for needle in needles) - 1
+
+    def search(self, data: bytes) -> bool:
+        return self.regex.search(data.lower()) is not None
+
+    def scanner(self) -> "StreamScanner":
+        return StreamScanner(self)
+
+
+class StreamScanner:
+    """Quét body theo từng chunk khi đang stream, chỉ giữ `overlap` byte giữa các chunk."""
+
+    __slots__ = ("_matcher", "_tail")
+
+    def __init__(self, matcher: PatternMatcher):
+        self._matcher = matcher
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> bool:
+        """True nếu phần body đã đọc (tính cả chunk này) chứa pattern nguy hiểm."""
+        if not chunk:
+            return False
+        window = self._tail + chunk.lower()
+        if self._matcher.regex.search(window) is not None:
+            return True
+        self._tail = window[-self._matcher.overlap:] if self._matcher.overlap else b""
+        return False
+
+
+class RequestValidationMiddleware:
+    """Middleware (ASGI thuần) để validate request và ngăn chặn các attack cơ bản"""
+
+    def __init__(self, app: ASGIApp, max_content_length: int = 10 * 1024 * 1024,
+                 dangerous_patterns: Optional[list] = None):  # 10MB
+        self.app = app
         self.max_content_length = max_content_length
-        
-        # Danh sách các patterns nguy hiểm
-        self.dangerous_patterns = [
-            "<script",
-            "javascript:",
-            "vbscript:",
-            "onload=",
-            "onerror=",
-            "onclick=",
-            "eval(",
-            "expression(",
-            "url(",
-            "import ",
-            "exec(",
-            "system(",
-            "cmd",
-            "powershell",
-            "bash",
-            "sh ",
-            "&&",
-            "||",
-            "`",
-            "$(",
-            "<?php",
-            "<%",
-            "SELECT ",
-            "INSERT ",
-            "UPDATE ",
-            "DELETE ",
-            "DROP ",
-            "UNION ",
-            "OR 1=1",
-            "AND 1=1",
-        ]
-    
-    async def dispatch(self, request: Request, call_next):
+        self.dangerous_patterns = dangerous_patterns or DANGEROUS_PATTERNS
+        self.matcher = PatternMatcher(self.dangerous_patterns)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Kiểm tra Content-Length
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > self.max_content_length:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Request too large. Maximum size: {self.max_content_length} bytes"
-            )
-        
-        # Kiểm tra User-Agent
-        user_agent = request.headers.get("user-agent", "").lower()
-        if any(pattern in user_agent for pattern in ["bot", "crawler", "spider", "scraper"]):
-            # Có thể log hoặc block các bot không mong muốn
-            pass
-        
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_content_length:
+            await _reject(scope, receive, send, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                          f"Request too large. Maximum size: {self.max_content_length} bytes")
+            return
+
         # Kiểm tra URL parameters
-        if self._contains_dangerous_patterns(str(request.url)):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid request parameters"
-            )
-        
-        # Kiểm tra request body cho POST/PUT/PATCH
-        if request.method in ["POST", "PUT", "PATCH"]:
-            try:
-                # Đọc body để kiểm tra
-                body = await request.body()
-                
+        if self._contains_dangerous_patterns(str(URL(scope=scope))):
+            await _reject(scope, receive, send, status.HTTP_400_BAD_REQUEST, "Invalid request parameters")
+            return
+
+        if scope["method"] not in BODY_METHODS:
+            # Process request
+            await self.app(scope, receive, send)
+            return
+
+        # Kiểm tra request body cho POST/PUT/PATCH ngay khi app đọc từng chunk (không buffer cả body).
+        # Phát hiện vi phạm -> báo app là client đã ngắt kết nối, bỏ response của app
+        # và tự trả lỗi.
+        scanner = self.matcher.scanner()
+        received = 0
+        rejection = None
+        response_started = False
+
+        async def inspecting_receive() -> Message:
+            nonlocal received, rejection
+            if rejection is not None:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                received += len(chunk)
                 # Kiểm tra kích thước body
-                if len(body) > self.max_content_length:
-                    raise HTTPException(
-                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                        detail="Request body too large"
-                    )
-                
+                if received > self.max_content_length:
+                    rejection = (status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Request body too large")
                 # Kiểm tra nội dung body
-                if self._contains_dangerous_patterns(body.decode("utf-8", errors="ignore")):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Invalid request content"
-                    )
-                
-                # Tạo lại request với body đã đọc
-                async def receive():
-                    return {"type": "http.request", "body": body}
-                
-                request._receive = receive
-                
-            except UnicodeDecodeError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid request encoding"
-                )
-        
-        # Process request
-        response = await call_next(request)
-        
-        return response
-    
+                elif scanner.feed(chunk):
+                    rejection = (status.HTTP_400_BAD_REQUEST, "Invalid request content")
+                if rejection is not None:
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if rejection is not None:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, inspecting_receive, guarded_send)
+        except Exception:
+            if rejection is None:
+                raise
+        if rejection is not None and not response_started:
+            await _reject(scope, receive, send, *rejection)
+
     def _contains_dangerous_patterns(self, content: str) -> bool:
         """Kiểm tra xem content có chứa patterns nguy hiểm không"""
-        content_lower = content.lower()
-        return any(pattern.lower() in content_lower for pattern in self.dangerous_patterns)
-
-class IPWhitelistMiddleware(BaseHTTPMiddleware):
-    """Middleware để whitelist IP addresses"""
-    
-    def __init__(self, app, whitelist: list = None, blacklist: list = None):
-        super().__init__(app)
+        return self.matcher.search(content.encode("utf-8", errors="ignore"))
+
+
+class IPWhitelistMiddleware:
+    """Middleware (ASGI thuần) để whitelist IP addresses"""
+
+    def __init__(self, app: ASGIApp, whitelist: list = None, blacklist: list = None):
+        self.app = app
         self.whitelist = whitelist or []
         self.blacklist = blacklist or []
-    
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host if request.client else "unknown"
-        
-        # Kiểm tra blacklist
-        if self.blacklist and client_ip in self.blacklist:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
-        
-        # Kiểm tra whitelist (nếu có)
-        if self.whitelist and client_ip not in self.whitelist:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
-        
-        return await call_next(request)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+
+        # Kiểm tra blacklist / whitelist (nếu có)
+        if (self.blacklist and client_ip in self.blacklist) or (self.whitelist and client_ip not in self.whitelist):
+            await _reject(scope, receive, send, status.HTTP_403_FORBIDDEN, "Access denied")
+            return
+
+        await self.app(scope, receive, send)
@@ -4,6 +4,7 @@ from .favorites import favorites
 
 from .user import User
 from .movie import Movie
+from . import movie_search
 from .theater import Theater
 from .room import Room
 from .seat import Seat
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Optional
-from sqlalchemy import String, Integer, Float, ForeignKey, UniqueConstraint
+from datetime import datetime
+from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models import Base,TimestampMixin
 
@@ -11,15 +12,27 @@ class Booking(TimestampMixin, Base):
 
     # references
     payment_id: Mapped[Optional[int]] = mapped_column(ForeignKey("payments.id", ondelete="SET NULL"), index=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
-    showtime_id: Mapped[int] = mapped_column(ForeignKey("showtimes.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    showtime_id: Mapped[int] = mapped_column(ForeignKey("showtimes.id", ondelete="CASCADE"))
     seat_id: Mapped[int] = mapped_column(ForeignKey("seats.id", ondelete="CASCADE"), index=True)
 
     price: Mapped[float] = mapped_column(Float)
     status: Mapped[str] = mapped_column(String(20), default="pending")  # pending | confirmed | cancelled
+    # Hạn giữ ghế của booking pending, hết hạn sẽ tự chuyển sang cancelled
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
 
     __table_args__ = (
-        UniqueConstraint("showtime_id", "seat_id", name="uq_showtime_seat"),  # ngăn trùng ghế trong cùng suất
+        # Ngăn trùng ghế trong cùng suất; chỉ tính booking active nên booking đã hủy vẫn giữ lại làm lịch sử
+        Index(
+            "uq_bookings_showtime_seat_active", "showtime_id", "seat_id", unique=True,
+            sqlite_where=text("status IN ('pending', 'confirmed')"),
+            postgresql_where=text("status IN ('pending', 'confirmed')"),
+        ),
+        # Booking active của 1 suất chiếu (showtime_id = ? AND status IN (...))
+        Index("ix_bookings_showtime_id_status", "showtime_id", "status"),
+        # Lịch sử booking của user, mới nhất trước (user_id = ? ORDER BY id DESC)
+        Index("ix_bookings_user_id_id", "user_id", text("id DESC")),
+        # Postgres có thêm partial index ix_bookings_pending_expires_at (xem migration f2c7d9a4b1e3)
     )
 
     # relationships
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index
 from .base_model import Base
 
 favorites = Table(
@@ -6,5 +6,7 @@ favorites = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
     Column("movie_id", Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True),
+    # PK bắt đầu bằng user_id -> cần index riêng để đếm like theo phim
+    Index("ix_favorites_movie_id", "movie_id"),
 )
  
\ No newline at end of file
@@ -0,0 +1,42 @@
+from sqlalchemy import DDL, Integer, column, event, table
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from .movie import Movie
+
+# Chỉ mục full-text cho tìm kiếm phim (không phải ORM model, được MovieRepository đồng bộ):
+# - SQLite: bảng ảo FTS5 `movies_fts`, rowid = movies.id
+# - Postgres: bảng `movie_search` (movie_id, document tsvector) + GIN index
+# Tạo / xóa cùng bảng movies qua metadata.create_all / drop_all; DB có sẵn dùng Alembic.
+
+SQLITE_FTS_TABLE = "movies_fts"
+POSTGRES_SEARCH_TABLE = "movie_search"
+
+movies_fts = table(
+    SQLITE_FTS_TABLE,
+    column("rowid", Integer),
+    column("title"),
+    column("description"),
+    column("genre"),
+)
+
+movie_search = table(
+    POSTGRES_SEARCH_TABLE,
+    column("movie_id", Integer),
+    column("document", TSVECTOR),
+)
+
+_DDL = [
+    ("after_create", "sqlite",
+     "CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5("
+     "title, description, genre, tokenize='unicode61 remove_diacritics 2')"),
+    ("after_create", "postgresql",
+     "CREATE TABLE IF NOT EXISTS movie_search ("
+     "movie_id INTEGER PRIMARY KEY REFERENCES movies(id) ON DELETE CASCADE, "
+     "document tsvector NOT NULL)"),
+    ("after_create", "postgresql",
+     "CREATE INDEX IF NOT EXISTS ix_movie_search_document ON movie_search USING GIN (document)"),
+    ("before_drop", "sqlite", "DROP TABLE IF EXISTS movies_fts"),
+    ("before_drop", "postgresql", "DROP TABLE IF EXISTS movie_search"),
+]
+
+for _event, _dialect, _statement in _DDL:
+    event.listen(Movie.__table__, _event, DDL(_statement).execute_if(dialect=_dialect))
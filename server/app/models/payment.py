@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import List, Optional
-from sqlalchemy import String, Integer, Float, ForeignKey
+from sqlalchemy import String, Integer, Float, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models import Base, TimestampMixin
 
@@ -13,11 +13,16 @@ class Payment(TimestampMixin, Base):
     status: Mapped[str] = mapped_column(String(20), default="pending")  # pending | success | failed
 
     # Ai thực hiện thanh toán (user)
-    created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     creator: Mapped[Optional["User"]] = relationship(back_populates="payments_created")
 
     # 1 payment -> N bookings
     bookings: Mapped[List["Booking"]] = relationship(back_populates="payment")
 
+    __table_args__ = (
+        # Thanh toán của user theo trạng thái (created_by = ? [AND status = ?])
+        Index("ix_payments_created_by_status", "created_by", "status"),
+    )
+
     def __repr__(self) -> str:
         return f"<Payment id={self.id} amount={self.amount} status={self.status}>"
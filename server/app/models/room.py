@@ -14,6 +14,8 @@ class Room(TimestampMixin, Base):
     name: Mapped[str] = mapped_column(String(50))
     room_type: Mapped[str] = mapped_column(String(20))  # 2D | 3D | IMAX | etc.
     total_seats: Mapped[int] = mapped_column(Integer)
+    # Tăng mỗi khi ghế của phòng thay đổi (ETag của sơ đồ ghế)
+    seat_map_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     theater: Mapped["Theater"] = relationship(back_populates="rooms")
     seats: Mapped[List["Seat"]] = relationship(back_populates="room", cascade="all, delete-orphan")
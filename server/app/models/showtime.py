@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import List
 from datetime import datetime
-from sqlalchemy import String, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models import Base, TimestampMixin
 
@@ -9,13 +9,20 @@ class Showtime(TimestampMixin, Base):
     __tablename__ = "showtimes"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id", ondelete="CASCADE"), index=True)
-    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"), index=True)
+    movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id", ondelete="CASCADE"))
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"))
     start_time: Mapped[datetime] = mapped_column(DateTime, index=True)
     end_time: Mapped[datetime] = mapped_column(DateTime)
     base_price: Mapped[float] = mapped_column(Float)
     status: Mapped[str] = mapped_column(String(20), default="active")  # active | cancelled | completed | scheduled
 
+    __table_args__ = (
+        # Kiểm tra trùng giờ trong phòng (room_id = ? AND start_time < ? AND end_time > ?)
+        Index("ix_showtimes_room_id_start_end", "room_id", "start_time", "end_time"),
+        # Suất chiếu sắp tới của phim (movie_id = ? AND end_time >= now ORDER BY start_time)
+        Index("ix_showtimes_movie_id_end_start", "movie_id", "end_time", "start_time"),
+    )
+
     movie: Mapped["Movie"] = relationship(back_populates="showtimes")
     room: Mapped["Room"] = relationship(back_populates="showtimes")
     bookings: Mapped[List["Booking"]] = relationship(back_populates="showtime", cascade="all, delete-orphan")
@@ -1,8 +1,10 @@
-from typing import Generic, TypeVar, Type, List, Optional
+from typing import Any, Generic, TypeVar, Type, List, Optional, Sequence, Tuple
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.base_model import Base
 from pydantic import BaseModel
-from app.config import logger
+from app.config.logger import repository_logger as logger
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -14,7 +16,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model_name = model.__name__
 
     def get_by_id(self, db: Session, id: int) -> Optional[ModelType]:
-        logger.info(f"[{self.model_name}Repository] Get by ID={id}")
+        logger.info("[%sRepository] Get by ID=%s", self.model_name, id)
         return db.get(self.model, id)
 
     # Compatibility with services expecting `get`
@@ -22,7 +24,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return self.get_by_id(db, id)
 
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        logger.info(f"[{self.model_name}Repository] Get all records (skip={skip}, limit={limit})")
+        logger.info("[%sRepository] Get all records (skip=%s, limit=%s)", self.model_name, skip, limit)
         query = db.query(self.model)
         if skip:
             query = query.offset(skip)
@@ -31,11 +33,11 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return query.all()
 
     def create(self, db: Session, data: CreateSchemaType) -> ModelType:
-        logger.info(f"[{self.model_name}Repository] Creating record: {data}")
+        logger.info("[%sRepository] Creating record: %s", self.model_name, data)
         try:
             # Use model_dump(exclude_unset=False) to include all fields, even with defaults
             data_dict = data.model_dump(exclude_unset=False)
-            logger.debug(f"[{self.model_name}Repository] Data dict: {data_dict}")
+            logger.debug("[%sRepository] Data dict: %s", self.model_name, data_dict)
             
             # Remove fields that are not in the model (e.g., computed fields)
             model_columns = {c.name for c in self.model.__table__.columns}
@@ -45,33 +47,67 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.add(obj)
             db.commit()
             db.refresh(obj)
-            logger.info(f"[{self.model_name}Repository] Created record ID={obj.id}")
+            logger.info("[%sRepository] Created record ID=%s", self.model_name, obj.id)
             return obj
         except Exception as e:
             db.rollback()
-            logger.error(f"[{self.model_name}Repository] Error creating record: {e}", exc_info=True)
+            logger.error("[%sRepository] Error creating record: %s", self.model_name, e, exc_info=True)
             raise
 
     def update(self, db: Session, obj: ModelType, data: UpdateSchemaType) -> ModelType:
-        logger.info(f"[{self.model_name}Repository] Updating ID={obj.id}")
+        logger.info("[%sRepository] Updating ID=%s", self.model_name, obj.id)
         for field, value in data.model_dump(exclude_unset=True).items():
             setattr(obj, field, value)
         db.commit()
         db.refresh(obj)
-        logger.info(f"[{self.model_name}Repository] Updated record ID={obj.id}")
+        logger.info("[%sRepository] Updated record ID=%s", self.model_name, obj.id)
         return obj
 
     def delete(self, db: Session, id: int) -> Optional[ModelType]:
-        logger.info(f"[{self.model_name}Repository] Deleting ID={id}")
+        logger.info("[%sRepository] Deleting ID=%s", self.model_name, id)
         obj = db.get(self.model, id)
         if obj:
             db.delete(obj)
             db.commit()
-            logger.info(f"[{self.model_name}Repository] Deleted ID={id}")
+            logger.info("[%sRepository] Deleted ID=%s", self.model_name, id)
         else:
-            logger.warning(f"[{self.model_name}Repository] Not found ID={id}")
+            logger.warning("[%sRepository] Not found ID=%s", self.model_name, id)
         return obj
 
     def count(self, db: Session) -> int:
         """Count total records for this model."""
-        return db.query(self.model).count()
\ No newline at end of file
+        return db.query(self.model).count()
+
+    # -------------------- PAGINATION --------------------
+    def _paginate(self, query, keys: Sequence[Any], offset: int = 0, limit: int = 10,
+                  after: Optional[Tuple[Any, ...]] = None, descending: bool = False):
+        """
+        Sắp xếp theo `keys` (ghép lại phải duy nhất, vd (start_time, id)) rồi cắt trang.
+        Có `after` (khóa của item cuối trang trước) -> keyset: WHERE (keys) > after, không OFFSET,
+        nên trang sâu tốn như trang đầu. Dùng được cho cả Query lẫn select().
+        """
+        if after is not None:
+            bounds = [literal(value, type_=column.type) for column, value in zip(keys, after)]
+            key, bound = (keys[0], bounds[0]) if len(keys) == 1 else (tuple_(*keys), tuple_(*bounds))
+            query = query.filter(key < bound if descending else key > bound)
+        elif offset:
+            query = query.offset(offset)
+        order = [column.desc() for column in keys] if descending else list(keys)
+        return query.order_by(*order).limit(limit)
+
+    # -------------------- ASYNC READ --------------------
+    async def aget_by_id(self, db: AsyncSession, id: int) -> Optional[ModelType]:
+        logger.info("[%sRepository] Async get by ID=%s", self.model_name, id)
+        return await db.get(self.model, id)
+
+    async def aget_all(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        logger.info("[%sRepository] Async get all records (skip=%s, limit=%s)", self.model_name, skip, limit)
+        state = select(self.model)
+        if skip:
+            state = state.offset(skip)
+        if limit:
+            state = state.limit(limit)
+        return list((await db.scalars(state)).all())
+
+    async def acount(self, db: AsyncSession) -> int:
+        return await db.scalar(select(func.count()).select_from(self.model)) or 0
\ No newline at end of file
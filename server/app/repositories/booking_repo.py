@@ -1,11 +1,14 @@
 from sqlalchemy.orm import Session, selectinload
-from typing import Optional, List
+from sqlalchemy import select, insert, update, exists, func, or_, tuple_
+from typing import Any, Dict, Optional, List, Tuple
+from datetime import datetime
 from app.models.booking import Booking
 from app.models.showtime import Showtime
 from app.models.movie import Movie
 from app.models.room import Room
 from app.models.theater import Theater
 from app.models.seat import Seat
+from app.models.payment import Payment
 from app.repositories.base_repo import BaseRepository
 from app.schemas.booking_schema import BookingCreate, BookingBase
 
@@ -43,21 +46,88 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingBase]):
             .first()
         )
 
-    # -------------------- PHÂN TRANG --------------------
-    def get_paginated(self, db: Session, offset: int = 0, limit: int = 10) -> List[Booking]:
-        """Lấy danh sách booking phân trang"""
-        return db.query(Booking).order_by(Booking.id).offset(offset).limit(limit).all()
+    # -------------------- ĐẶT NHIỀU GHẾ --------------------
+    def get_by_seat_keys(self, db: Session, keys: List[Tuple[int, int]]) -> List[Tuple[int, int, int, str]]:
+        """
+        Lấy các booking active (pending / confirmed) đang chiếm khóa uq_bookings_showtime_seat_active
+        của danh sách (showtime_id, seat_id) trong 1 query. Trả về (id, showtime_id, seat_id, status).
+        """
+        if not keys:
+            return []
+        stmt = (
+            select(Booking.id, Booking.showtime_id, Booking.seat_id, Booking.status)
+            .where(
+                tuple_(Booking.showtime_id, Booking.seat_id).in_(keys),
+                Booking.status.in_(["pending", "confirmed"])
+            )
+            .with_for_update()
+        )
+        return [tuple(row) for row in db.execute(stmt).all()]
 
-    def get_paginated_by_user(self, db: Session, user_id: int, offset: int = 0, limit: int = 10) -> List[Booking]:
-        """Lấy danh sách booking của user phân trang"""
-        return (
-            db.query(Booking)
-            .filter(Booking.user_id == user_id)
+    def bulk_create(self, db: Session, bookings: List[BookingCreate], hold_until: Optional[datetime] = None) -> List[Booking]:
+        """INSERT ... RETURNING cho nhiều booking trong 1 statement (không commit).
+        Booking pending được giữ ghế tới `hold_until` (nếu có)."""
+        if not bookings:
+            return []
+        model_columns = {c.name for c in Booking.__table__.columns}
+        rows = []
+        for b in bookings:
+            row = {k: v for k, v in b.model_dump(exclude={"created_at", "updated_at"}).items() if k in model_columns}
+            row["expires_at"] = hold_until if row.get("status", "pending") == "pending" else None
+            rows.append(row)
+        return list(db.scalars(insert(Booking).returning(Booking), rows).all())
+
+    # -------------------- CẬP NHẬT HÀNG LOẠT --------------------
+    def update_returning(self, db: Session, conditions: list, values: Dict[str, Any]) -> List[Tuple[int, int, int, Optional[int]]]:
+        """UPDATE bookings SET values WHERE conditions RETURNING (id, showtime_id, seat_id, payment_id). Không commit."""
+        stmt = (
+            update(Booking)
+            .where(*conditions)
+            .values(**values)
+            .returning(Booking.id, Booking.showtime_id, Booking.seat_id, Booking.payment_id)
+            .execution_options(synchronize_session=False)
+        )
+        return [tuple(row) for row in db.execute(stmt).all()]
+
+    def get_payable(self, db: Session, conditions: list, now: datetime) -> List[Tuple[int, int, float]]:
+        """
+        Booking pending còn hạn giữ và chưa có payment thành công, khóa dòng đến hết transaction.
+        Trả về (id, user_id, price).
+        """
+        stmt = (
+            select(Booking.id, Booking.user_id, Booking.price)
+            .where(*conditions, *self.payable_conditions(now))
             .order_by(Booking.id)
-            .offset(offset)
-            .limit(limit)
-            .all()
+            .with_for_update()
+        )
+        return [tuple(row) for row in db.execute(stmt).all()]
+
+    def get_payable_total(self, db: Session, conditions: list, now: datetime) -> Tuple[int, float]:
+        """(số booking, tổng giá) của các booking thanh toán được, trong 1 query aggregate."""
+        stmt = select(func.count(Booking.id), func.coalesce(func.sum(Booking.price), 0.0)).where(
+            *conditions, *self.payable_conditions(now)
         )
+        count, total = db.execute(stmt).one()
+        return count, float(total)
+
+    @staticmethod
+    def payable_conditions(now: datetime) -> list:
+        """Booking pending, còn hạn giữ và chưa có payment thành công."""
+        return [
+            Booking.status == "pending",
+            or_(Booking.expires_at.is_(None), Booking.expires_at > now),
+            ~exists().where(Payment.id == Booking.payment_id, Payment.status == "success"),
+        ]
+
+    # -------------------- PHÂN TRANG --------------------
+    def get_paginated(self, db: Session, offset: int = 0, limit: int = 10, after: Optional[Tuple[int]] = None) -> List[Booking]:
+        """Lấy danh sách booking phân trang (theo id, `after` = cursor)"""
+        return self._paginate(db.query(Booking), (Booking.id,), offset, limit, after).all()
+
+    def get_paginated_by_user(self, db: Session, user_id: int, offset: int = 0, limit: int = 10, after: Optional[Tuple[int]] = None) -> List[Booking]:
+        """Lấy danh sách booking của user phân trang"""
+        query = db.query(Booking).filter(Booking.user_id == user_id)
+        return self._paginate(query, (Booking.id,), offset, limit, after).all()
 
     # -------------------- ĐẾM TỔNG SỐ --------------------
     def count_all(self, db: Session) -> int:
@@ -68,9 +138,9 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingBase]):
         """Đếm tổng số booking của 1 user"""
         return db.query(Booking).filter(Booking.user_id == user_id).count()
 
-    def get_paginated_by_user_with_details(self, db: Session, user_id: int, offset: int = 0, limit: int = 10) -> List[Booking]:
-        """Lấy danh sách booking của user phân trang với thông tin chi tiết (showtime, movie, theater, seat)"""
-        return (
+    def get_paginated_by_user_with_details(self, db: Session, user_id: int, offset: int = 0, limit: int = 10, after: Optional[Tuple[int]] = None) -> List[Booking]:
+        """Lấy danh sách booking của user phân trang với thông tin chi tiết (showtime, movie, theater, seat), mới nhất trước"""
+        query = (
             db.query(Booking)
             .options(
                 selectinload(Booking.showtime).selectinload(Showtime.movie),
@@ -78,8 +148,5 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingBase]):
                 selectinload(Booking.seat)
             )
             .filter(Booking.user_id == user_id)
-            .order_by(Booking.id.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
         )
+        return self._paginate(query, (Booking.id,), offset, limit, after, descending=True).all()
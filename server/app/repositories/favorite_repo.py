@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import insert, delete, select
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, delete, select, func
 from typing import List
 from app.models.favorites import favorites
 from app.models.movie import Movie
@@ -14,14 +14,27 @@ class FavoriteRepository:
         return db.execute(stmt).fetchall()
 
     def get_user_favorites(self, db: Session, user_id: int) -> List[Movie]:
-        """Lấy danh sách phim yêu thích của user với relationship loaded"""
+        """
+        Lấy danh sách phim yêu thích của user kèm liked_by_count trong 1 query:
+        subquery GROUP BY chỉ đếm like của các phim user đã thích rồi join với movies.
+        """
+        user_movie_ids = select(self.table.c.movie_id).where(self.table.c.user_id == user_id)
+        like_counts = (
+            select(self.table.c.movie_id, func.count().label("liked_by_count"))
+            .where(self.table.c.movie_id.in_(user_movie_ids))
+            .group_by(self.table.c.movie_id)
+            .subquery()
+        )
         stmt = (
-            select(Movie)
-            .join(self.table, self.table.c.movie_id == Movie.id)
-            .where(self.table.c.user_id == user_id)
-            .options(selectinload(Movie.liked_by))  # Eager load relationship để tính liked_by_count
+            select(Movie, like_counts.c.liked_by_count)
+            .join(like_counts, like_counts.c.movie_id == Movie.id)
+            .order_by(Movie.id)
         )
-        return db.execute(stmt).scalars().all()
+        movies = []
+        for movie, liked_by_count in db.execute(stmt).all():
+            movie.liked_by_count = liked_by_count
+            movies.append(movie)
+        return movies
 
     def add_favorite(self, db: Session, user_id: int, movie_id: int):
         stmt = insert(self.table).values(user_id=user_id, movie_id=movie_id)
@@ -1,9 +1,19 @@
-from typing import Optional, List, Tuple
+import re
+from typing import Dict, Optional, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.movie import Movie
+from app.models.favorites import favorites
+from app.models.movie_search import movies_fts, movie_search, SQLITE_FTS_TABLE
 from app.repositories.base_repo import BaseRepository
 from app.schemas.movie_schema import MovieCreate, MovieBase
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, or_, delete, insert, literal_column
+
+# bm25() của FTS5: trọng số cột title, description, genre
+SEARCH_WEIGHTS = (10.0, 1.0, 3.0)
+MAX_SEARCH_TERMS = 8
+# Viết literal để driver (asyncpg) không bind thành varchar thay vì regconfig
+PG_TS_CONFIG = literal_column("'simple'::regconfig")
 
 class MovieRepository(BaseRepository[Movie, MovieCreate, MovieBase]):
     def __init__(self):
@@ -13,10 +23,11 @@ class MovieRepository(BaseRepository[Movie, MovieCreate, MovieBase]):
         state = select(Movie).where(Movie.title == title)
         return db.scalar(state)
 
-    def get_paginated(self, db: Session ,skip: int =0, limit: int = 10) -> Tuple[List[Movie], int]:
-        # Lấy danh sách phim có phân trang và tổng số lượng phim 
-        total = db.scalar(select(func.count()).select_from(Movie))
-        state = select(Movie).offset(skip).limit(limit)
+    def get_paginated(self, db: Session ,skip: int =0, limit: int = 10,
+                      after: Optional[Tuple[int]] = None, with_total: bool = True) -> Tuple[List[Movie], Optional[int]]:
+        # Lấy danh sách phim có phân trang (theo id) và tổng số lượng phim (bỏ qua nếu with_total=False)
+        total = db.scalar(select(func.count()).select_from(Movie)) if with_total else None
+        state = self._paginate(select(Movie), (Movie.id,), skip, limit, after)
         movies = db.scalars(state).all()
         return movies, total 
 
@@ -26,47 +37,153 @@ class MovieRepository(BaseRepository[Movie, MovieCreate, MovieBase]):
         """
         state = select(Movie).offset(skip).limit(limit)
         movies = db.scalars(state).all()
+        counts = self.count_likes(db, [m.id for m in movies])
         for m in movies:
-            m.liked_by = len(m.liked_by) if hasattr(m, "liked_by") else 0
+            m.liked_by_count = counts.get(m.id, 0)
         return movies
 
+    # -------------------- LIKE COUNT --------------------
+    def count_likes(self, db: Session, movie_ids: List[int]) -> Dict[int, int]:
+        """
+        Đếm số like cho 1 trang phim bằng 1 câu GROUP BY (dùng index favorites.movie_id),
+        không load các User đã like.
+        """
+        if not movie_ids:
+            return {}
+        return {movie_id: count for movie_id, count in db.execute(self._like_counts_statement(movie_ids)).all()}
+
+    @staticmethod
+    def _like_counts_statement(movie_ids: List[int]):
+        return (
+            select(favorites.c.movie_id, func.count())
+            .where(favorites.c.movie_id.in_(movie_ids))
+            .group_by(favorites.c.movie_id)
+        )
+
     def count(self, db: Session) -> int:
         """
         Đếm tổng số movie trong database.
         """
         return db.query(Movie).count()
 
-    def search_movies(self, db: Session, query: str, skip: int = 0, limit: int = 10) -> Tuple[List[Movie], int]:
+    # -------------------- FULL-TEXT SEARCH --------------------
+    def search_movies(self, db: Session, query: str, skip: int = 0, limit: int = 10,
+                      with_total: bool = True) -> Tuple[List[Movie], Optional[int]]:
         """
-        Tìm kiếm phim theo title, description, hoặc genre.
+        Tìm kiếm phim theo title, description, hoặc genre qua chỉ mục full-text,
+        xếp theo độ liên quan. Từ cuối được hiểu là tiền tố (typeahead).
         """
-        search_term = f"%{query.lower()}%"
-        state = (
-            select(Movie)
-            .where(
-                or_(
-                    func.lower(Movie.title).like(search_term),
-                    func.lower(Movie.description).like(search_term),
-                    func.lower(Movie.genre).like(search_term)
-                )
+        statements = self._search_statements(db.get_bind().dialect.name, query)
+        if statements is None:
+            return [], 0 if with_total else None
+        rows_state, count_state = statements
+        movies = db.scalars(rows_state.offset(skip).limit(limit)).all()
+        total = (db.scalar(count_state) or 0) if with_total else None
+        return movies, total
+
+    def reindex_search(self, db: Session, movie_ids: Optional[List[int]] = None) -> None:
+        """
+        Ghi lại document tìm kiếm của các phim từ bảng movies (None = toàn bộ catalog).
+        Phim không còn tồn tại chỉ bị xóa khỏi chỉ mục. Không commit.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            index, key = movies_fts, movies_fts.c.rowid
+            source = select(
+                Movie.id,
+                func.coalesce(Movie.title, ""),
+                func.coalesce(Movie.description, ""),
+                func.coalesce(Movie.genre, ""),
             )
-            .offset(skip)
-            .limit(limit)
-        )
-        movies = db.scalars(state).all()
-        
-        # Count total matching movies
-        count_state = (
-            select(func.count())
-            .select_from(Movie)
-            .where(
-                or_(
-                    func.lower(Movie.title).like(search_term),
-                    func.lower(Movie.description).like(search_term),
-                    func.lower(Movie.genre).like(search_term)
-                )
+            columns = ["rowid", "title", "description", "genre"]
+        elif dialect == "postgresql":
+            index, key = movie_search, movie_search.c.movie_id
+            source = select(Movie.id, self._pg_document())
+            columns = ["movie_id", "document"]
+        else:
+            return
+
+        remove = delete(index)
+        if movie_ids is not None:
+            if not movie_ids:
+                return
+            remove = remove.where(key.in_(movie_ids))
+            source = source.where(Movie.id.in_(movie_ids))
+        db.execute(remove)
+        db.execute(insert(index).from_select(columns, source))
+
+    def remove_from_search(self, db: Session, movie_id: int) -> None:
+        """Xóa phim khỏi chỉ mục (Postgres tự xóa theo ON DELETE CASCADE). Không commit."""
+        if db.get_bind().dialect.name == "sqlite":
+            db.execute(delete(movies_fts).where(movies_fts.c.rowid == movie_id))
+
+    def _search_statements(self, dialect: str, query: str):
+        """(select phim đã xếp hạng, select count) theo dialect; None nếu query không có từ nào."""
+        terms = re.findall(r"\w+", query.lower())[:MAX_SEARCH_TERMS]
+        if not terms:
+            return None
+
+        if dialect == "sqlite":
+            # "term"* = prefix query; các term cách nhau bởi khoảng trắng = AND
+            fts = literal_column(SQLITE_FTS_TABLE)
+            condition = fts.op("MATCH")(" ".join(f'"{term}"*' for term in terms))
+            rows = (
+                select(Movie)
+                .join(movies_fts, movies_fts.c.rowid == Movie.id)
+                .where(condition)
+                .order_by(func.bm25(fts, *SEARCH_WEIGHTS), Movie.id)
+            )
+            count = select(func.count()).select_from(movies_fts).where(condition)
+        elif dialect == "postgresql":
+            tsquery = func.to_tsquery(PG_TS_CONFIG, " & ".join(f"{term}:*" for term in terms))
+            condition = movie_search.c.document.op("@@")(tsquery)
+            rows = (
+                select(Movie)
+                .join(movie_search, movie_search.c.movie_id == Movie.id)
+                .where(condition)
+                .order_by(func.ts_rank_cd(movie_search.c.document, tsquery).desc(), Movie.id)
             )
+            count = select(func.count()).select_from(movie_search).where(condition)
+        else:
+            # Dialect khác: LIKE trên 3 cột như cũ
+            condition = self._search_condition(query)
+            rows = select(Movie).where(condition).order_by(Movie.id)
+            count = select(func.count()).select_from(Movie).where(condition)
+        return rows, count
+
+    @staticmethod
+    def _pg_document():
+        # Trọng số: title (A) > genre (B) > description (C), cấu hình 'simple' không phụ thuộc ngôn ngữ
+        def weighted(column, weight):
+            return func.setweight(func.to_tsvector(PG_TS_CONFIG, func.coalesce(column, "")), literal_column(f"'{weight}'"))
+        return weighted(Movie.title, "A").op("||")(weighted(Movie.genre, "B")).op("||")(weighted(Movie.description, "C"))
+
+    @staticmethod
+    def _search_condition(query: str):
+        search_term = f"%{query.lower()}%"
+        return or_(
+            func.lower(Movie.title).like(search_term),
+            func.lower(Movie.description).like(search_term),
+            func.lower(Movie.genre).like(search_term)
         )
-        total = db.scalar(count_state) or 0
-        
-        return movies, total
\ No newline at end of file
+
+    # -------------------- ASYNC READ --------------------
+    async def aget_paginated(self, db: AsyncSession, skip: int = 0, limit: int = 10) -> Tuple[List[Movie], int]:
+        total = await db.scalar(select(func.count()).select_from(Movie))
+        movies = (await db.scalars(self._paginate(select(Movie), (Movie.id,), skip, limit))).all()
+        return list(movies), total or 0
+
+    async def asearch_movies(self, db: AsyncSession, query: str, skip: int = 0, limit: int = 10) -> Tuple[List[Movie], int]:
+        statements = self._search_statements(db.get_bind().dialect.name, query)
+        if statements is None:
+            return [], 0
+        rows_state, count_state = statements
+        movies = (await db.scalars(rows_state.offset(skip).limit(limit))).all()
+        total = await db.scalar(count_state)
+        return list(movies), total or 0
+
+    async def acount_likes(self, db: AsyncSession, movie_ids: List[int]) -> Dict[int, int]:
+        """Bản async của count_likes."""
+        if not movie_ids:
+            return {}
+        return {movie_id: count for movie_id, count in (await db.execute(self._like_counts_statement(movie_ids))).all()}
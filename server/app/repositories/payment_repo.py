@@ -1,5 +1,7 @@
-from typing import Optional, List
+from typing import Iterable, Optional, List
+from sqlalchemy import exists, insert, update
 from sqlalchemy.orm import Session
+from app.models.booking import Booking
 from app.models.payment import Payment
 from app.repositories.base_repo import BaseRepository
 from app.schemas.payment_schema import PaymentCreate, PaymentBase
@@ -16,3 +18,30 @@ class PaymentRepository(BaseRepository[Payment, PaymentCreate, PaymentBase]):
         """Lấy payments theo status"""
         return db.query(Payment).filter(Payment.status == status).all()
 
+    # -------------------- HÀNG LOẠT --------------------
+    def bulk_create(self, db: Session, payments: List[PaymentCreate]) -> List[int]:
+        """INSERT ... RETURNING id cho nhiều payment trong 1 statement, id theo thứ tự input (không commit)."""
+        if not payments:
+            return []
+        stmt = insert(Payment).returning(Payment.id, sort_by_parameter_order=True)
+        return list(db.scalars(stmt, [p.model_dump(exclude={"created_at", "updated_at"}) for p in payments]).all())
+
+    def cancel_unused(self, db: Session, payment_ids: Iterable[int]) -> int:
+        """
+        Hủy các payment (trong payment_ids) không còn booking pending / confirmed nào trỏ tới,
+        bằng 1 UPDATE ... WHERE NOT EXISTS (không commit). Trả về số payment bị hủy.
+        """
+        payment_ids = list(payment_ids)
+        if not payment_ids:
+            return 0
+        stmt = (
+            update(Payment)
+            .where(
+                Payment.id.in_(payment_ids),
+                Payment.status.not_in(("cancelled", "failed")),
+                ~exists().where(Booking.payment_id == Payment.id, Booking.status.in_(("pending", "confirmed"))),
+            )
+            .values(status="cancelled")
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).rowcount
@@ -1,6 +1,7 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from sqlalchemy import and_, func, select
+from typing import Any, List, Optional, Tuple
 from datetime import datetime, timezone
 from app.models.showtime import Showtime
 from app.repositories.base_repo import BaseRepository
@@ -31,20 +32,26 @@ class ShowtimeRepository(BaseRepository[Showtime, ShowtimeCreate, ShowtimeBase])
         return query.order_by(Showtime.start_time).all()
 
     # -------------------- PAGINATION --------------------
-    def get_paginated(self, db: Session, offset: int = 0, limit: int = 10, include_past: bool = False) -> List[Showtime]:
+    # Khóa keyset: start_time không duy nhất nên ghép thêm id
+    PAGE_KEYS = (Showtime.start_time, Showtime.id)
+
+    def get_paginated(self, db: Session, offset: int = 0, limit: int = 10, include_past: bool = False,
+                      after: Optional[Tuple[Any, int]] = None) -> List[Showtime]:
         query = db.query(Showtime)
         query = self._filter_future_only(query, include_past)
-        return query.order_by(Showtime.start_time).offset(offset).limit(limit).all()
+        return self._paginate(query, self.PAGE_KEYS, offset, limit, after).all()
 
-    def get_paginated_by_movie(self, db: Session, movie_id: int, offset: int = 0, limit: int = 10, include_past: bool = False) -> List[Showtime]:
+    def get_paginated_by_movie(self, db: Session, movie_id: int, offset: int = 0, limit: int = 10, include_past: bool = False,
+                               after: Optional[Tuple[Any, int]] = None) -> List[Showtime]:
         query = db.query(Showtime).filter(Showtime.movie_id == movie_id)
         query = self._filter_future_only(query, include_past)
-        return query.order_by(Showtime.start_time).offset(offset).limit(limit).all()
+        return self._paginate(query, self.PAGE_KEYS, offset, limit, after).all()
 
-    def get_paginated_by_room(self, db: Session, room_id: int, offset: int = 0, limit: int = 10, include_past: bool = False) -> List[Showtime]:
+    def get_paginated_by_room(self, db: Session, room_id: int, offset: int = 0, limit: int = 10, include_past: bool = False,
+                              after: Optional[Tuple[Any, int]] = None) -> List[Showtime]:
         query = db.query(Showtime).filter(Showtime.room_id == room_id)
         query = self._filter_future_only(query, include_past)
-        return query.order_by(Showtime.start_time).offset(offset).limit(limit).all()
+        return self._paginate(query, self.PAGE_KEYS, offset, limit, after).all()
 
     # -------------------- COUNT --------------------
     def count_all(self, db: Session, include_past: bool = False) -> int:
@@ -62,6 +69,30 @@ class ShowtimeRepository(BaseRepository[Showtime, ShowtimeCreate, ShowtimeBase])
         query = self._filter_future_only(query, include_past)
         return query.count()
 
+    # -------------------- ASYNC READ --------------------
+    async def aget_by_movie(self, db: AsyncSession, movie_id: int, include_past: bool = False) -> List[Showtime]:
+        state = self._filter_future_only(select(Showtime).where(Showtime.movie_id == movie_id), include_past)
+        return list((await db.scalars(state.order_by(Showtime.start_time))).all())
+
+    async def aget_paginated(self, db: AsyncSession, offset: int = 0, limit: int = 10, include_past: bool = False) -> List[Showtime]:
+        state = self._filter_future_only(select(Showtime), include_past)
+        state = self._paginate(state, self.PAGE_KEYS, offset, limit)
+        return list((await db.scalars(state)).all())
+
+    async def aget_paginated_by_movie(self, db: AsyncSession, movie_id: int, offset: int = 0, limit: int = 10, include_past: bool = False) -> List[Showtime]:
+        state = self._filter_future_only(select(Showtime).where(Showtime.movie_id == movie_id), include_past)
+        state = self._paginate(state, self.PAGE_KEYS, offset, limit)
+        return list((await db.scalars(state)).all())
+
+    async def acount_all(self, db: AsyncSession, include_past: bool = False) -> int:
+        state = self._filter_future_only(select(func.count()).select_from(Showtime), include_past)
+        return await db.scalar(state) or 0
+
+    async def acount_by_movie(self, db: AsyncSession, movie_id: int, include_past: bool = False) -> int:
+        state = select(func.count()).select_from(Showtime).where(Showtime.movie_id == movie_id)
+        state = self._filter_future_only(state, include_past)
+        return await db.scalar(state) or 0
+
     # -------------------- BULK DELETE --------------------
     def delete_many(self, db: Session, ids: List[int]) -> int:
         if not ids:
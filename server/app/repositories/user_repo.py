@@ -1,42 +1,43 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from app.models.user import User
 from app.repositories.base_repo import BaseRepository
 from app.schemas.user_schema import UserCreate, UserRead
-from app.config import logger
+from app.config.logger import repository_logger as logger
 
 class UserRepository(BaseRepository[User, UserCreate, UserRead]):
     def __init__(self):
         super().__init__(User)
         self.repo_name = self.__class__.__name__
 
-    def get_all_paginated(self, db: Session, skip: int, limit: int) -> tuple[List[User], int]:
-        """Lấy danh sách user có phân trang"""
-        logger.info(f"[UserRepository] Get all paginated (skip={skip}, limit={limit})")
-        total = db.query(User).count()
-        data = db.query(User).offset(skip).limit(limit).all()
+    def get_all_paginated(self, db: Session, skip: int, limit: int,
+                          after: Optional[Tuple[int]] = None, with_total: bool = True) -> tuple[List[User], Optional[int]]:
+        """Lấy danh sách user có phân trang (theo id, `after` = cursor)"""
+        logger.info("[UserRepository] Get all paginated (skip=%s, limit=%s, after=%s)", skip, limit, after)
+        total = db.query(User).count() if with_total else None
+        data = self._paginate(db.query(User), (User.id,), skip, limit, after).all()
         return data, total
 
     def get_by_email(self, db: Session, email: str) -> Optional[User]: 
         """Lấy user theo email"""
-        logger.info(f"[UserRepository] Get by email={email}")
+        logger.info("[UserRepository] Get by email=%s", email)
         state = select(User).where(User.email == email)
         return db.scalar(state)
 
     def get_by_clerk_id(self, db: Session, clerk_id: str) -> Optional[User]:
         """Lấy user theo clerk_id (auth id)"""
-        logger.info(f"[UserRepository] Get by clerk_id={clerk_id}")
+        logger.info("[UserRepository] Get by clerk_id=%s", clerk_id)
         state = select(User).where(User.clerk_id == clerk_id)
         return db.scalar(state)
 
     def delete(self, db: Session, user_id: int) -> Optional[User]:
         """Xóa user theo ID (hard delete - SQLite foreign keys đã được bật, CASCADE sẽ tự động xử lý)"""
-        logger.info(f"[UserRepository] Delete user_id={user_id}")
+        logger.info("[UserRepository] Delete user_id=%s", user_id)
         user = db.get(User, user_id)
         if not user:
-            logger.warning(f"[UserRepository] User id={user_id} not found")
+            logger.warning("[UserRepository] User id=%s not found", user_id)
             return None
 
         try:
@@ -56,14 +57,14 @@ class UserRepository(BaseRepository[User, UserCreate, UserRead]):
             try:
                 stmt = sql_delete(favorites).where(favorites.c.user_id == user_id)
                 result = db.execute(stmt)
-                logger.info(f"[UserRepository] Deleted {result.rowcount} favorites for user {user_id}")
+                logger.info("[UserRepository] Deleted %s favorites for user %s", result.rowcount, user_id)
             except Exception as fav_error:
-                logger.warning(f"[UserRepository] Error deleting favorites (will try raw SQL): {fav_error}")
+                logger.warning("[UserRepository] Error deleting favorites (will try raw SQL): %s", fav_error)
                 try:
                     db.execute(text("DELETE FROM favorites WHERE user_id = :user_id"), {"user_id": user_id})
-                    logger.info(f"[UserRepository] Deleted favorites using raw SQL")
+                    logger.info("[UserRepository] Deleted favorites using raw SQL")
                 except Exception as e2:
-                    logger.warning(f"[UserRepository] Failed to delete favorites, will rely on CASCADE: {e2}")
+                    logger.warning("[UserRepository] Failed to delete favorites, will rely on CASCADE: %s", e2)
             
             # 2. Xóa bookings (quan trọng - phải xóa trước)
             try:
@@ -72,15 +73,15 @@ class UserRepository(BaseRepository[User, UserCreate, UserRead]):
                 if booking_count > 0:
                     for booking in bookings:
                         db.delete(booking)
-                    logger.info(f"[UserRepository] Deleted {booking_count} bookings for user {user_id}")
+                    logger.info("[UserRepository] Deleted %s bookings for user %s", booking_count, user_id)
                 else:
-                    logger.info(f"[UserRepository] No bookings found for user {user_id}")
+                    logger.info("[UserRepository] No bookings found for user %s", user_id)
             except SQLAlchemyError as booking_error:
-                logger.error(f"[UserRepository] SQLAlchemy error deleting bookings: {booking_error}", exc_info=True)
+                logger.error("[UserRepository] SQLAlchemy error deleting bookings: %s", booking_error, exc_info=True)
                 db.rollback()
                 raise Exception(f"Database error while deleting bookings: {str(booking_error)}")
             except Exception as booking_error:
-                logger.error(f"[UserRepository] Unexpected error deleting bookings: {booking_error}", exc_info=True)
+                logger.error("[UserRepository] Unexpected error deleting bookings: %s", booking_error, exc_info=True)
                 db.rollback()
                 raise Exception(f"Failed to delete bookings for user {user_id}: {str(booking_error)}")
             
@@ -92,18 +93,18 @@ class UserRepository(BaseRepository[User, UserCreate, UserRead]):
                     synchronize_session=False
                 )
                 if payment_count > 0:
-                    logger.info(f"[UserRepository] Updated {payment_count} payments for user {user_id}")
+                    logger.info("[UserRepository] Updated %s payments for user %s", payment_count, user_id)
             except Exception as pay_error:
-                logger.warning(f"[UserRepository] Error updating payments (will rely on SET NULL): {pay_error}")
+                logger.warning("[UserRepository] Error updating payments (will rely on SET NULL): %s", pay_error)
             
             # 4. Cuối cùng xóa user
             try:
                 db.delete(user)
                 db.commit()
-                logger.info(f"[UserRepository] User id={user_id} deleted successfully")
+                logger.info("[UserRepository] User id=%s deleted successfully", user_id)
                 return user
             except SQLAlchemyError as delete_error:
-                logger.error(f"[UserRepository] SQLAlchemy error deleting user: {delete_error}", exc_info=True)
+                logger.error("[UserRepository] SQLAlchemy error deleting user: %s", delete_error, exc_info=True)
                 db.rollback()
                 raise Exception(f"Database error while deleting user: {str(delete_error)}")
             
@@ -113,6 +114,6 @@ class UserRepository(BaseRepository[User, UserCreate, UserRead]):
                 db.rollback()
             except Exception:
                 pass
-            logger.error(f"[UserRepository] Failed to delete user id={user_id}: {e}", exc_info=True)
+            logger.error("[UserRepository] Failed to delete user id=%s: %s", user_id, e, exc_info=True)
             # Raise với thông tin chi tiết để debug
             raise Exception(f"Failed to delete user {user_id}: {str(e)}")
\ No newline at end of file
@@ -1,4 +1,8 @@
-from typing import Generic, List, TypeVar, Optional
+import base64
+import binascii
+import json
+from typing import Any, Callable, Generic, List, TypeVar, Optional, Tuple
+from fastapi import HTTPException, status
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
@@ -14,10 +18,11 @@ T = TypeVar("T")
 # Schema phân trang
 class PaginatedResponse(BaseSchema, Generic[T]):
     data: List[T] = Field(..., description="Danh sách item")
-    total: int = Field(..., description="Tổng số item")
+    total: Optional[int] = Field(..., description="Tổng số item (null khi with_total=false)")
     page: int = Field(..., description="Số trang hiện tại")
     size: int = Field(..., description="Số item trên 1 trang")
-    pages: int = Field(..., description="Tổng số trang")
+    pages: Optional[int] = Field(..., description="Tổng số trang (null khi with_total=false)")
+    next_cursor: Optional[str] = Field(None, description="Cursor để lấy trang kế tiếp (null nếu đã hết)")
 
 # Schema cho pagination query params
 class PaginationParams(BaseModel):
@@ -26,12 +31,36 @@ class PaginationParams(BaseModel):
     
     page: int = Field(1, ge=1, description="Current page number")
     size: int = Field(10, ge=1, le=100, description="Number of items per page")
+    cursor: Optional[str] = Field(None, description="Opaque cursor from next_cursor; overrides page")
+    with_total: bool = Field(True, description="Count the total number of items")
+
+# -------------------- CURSOR (keyset pagination) --------------------
+def encode_cursor(*values: Any) -> str:
+    """Mã hóa giá trị khóa sắp xếp của item cuối trang thành token opaque (base64url JSON)."""
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    """Giải mã cursor thành tuple `size` giá trị. Cursor sai định dạng -> 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("wrong cursor size")
+        return tuple(
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in payload
+        )
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
 
 # Helper function để tạo PaginatedResponse từ data, total và pagination
 def create_paginated_response(
     data: List[T],
-    total: int,
-    pagination: PaginationParams
+    total: Optional[int],
+    pagination: PaginationParams,
+    cursor_key: Optional[Callable[[T], Tuple[Any, ...]]] = None,
 ) -> PaginatedResponse[T]:
     """
     Helper function để tạo PaginatedResponse, tự động tính pages và lấy page/size từ pagination.
@@ -47,12 +76,21 @@ def create_paginated_response(
             size=pagination.size,
             pages=(total + pagination.size - 1) // pagination.size
         )
+
+    `cursor_key` trả về khóa sắp xếp của 1 item (vd: (start_time, id)); khi trang
+    đầy, next_cursor được mã hóa từ item cuối để client lấy trang kế tiếp.
     """
-    pages = (total + pagination.size - 1) // pagination.size if pagination.size > 0 else 0
+    pages = None
+    if total is not None:
+        pages = (total + pagination.size - 1) // pagination.size if pagination.size > 0 else 0
+    next_cursor = None
+    if cursor_key is not None and data and len(data) >= pagination.size:
+        next_cursor = encode_cursor(*cursor_key(data[-1]))
     return PaginatedResponse[T](
         data=data,
         total=total,
         page=pagination.page,
         size=pagination.size,
-        pages=pages
-    )
\ No newline at end of file
+        pages=pages,
+        next_cursor=next_cursor,
+    )
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from pydantic import BaseModel, Field, validator
 from .base_schema import BaseSchema
 
 class BookingBase(BaseSchema):
@@ -16,6 +17,7 @@ class BookingRead(BookingBase):
     id: int
     user_id: int
     payment_id: Optional[int] = None
+    expires_at: Optional[datetime] = None
     created_at: datetime
 
 class BookingDetailRead(BookingRead):
@@ -38,4 +40,53 @@ class BookingDetailRead(BookingRead):
     seat_number: Optional[int] = None
 
 class BookingUpdate(BookingBase):
-    pass
\ No newline at end of file
+    pass
+
+class SeatOccupancyRead(BaseModel):
+    """Trạng thái ghế của 1 suất chiếu dạng bitmap (1 bit / ghế)"""
+    showtime_id: int
+    room_id: int
+    seat_count: int = Field(..., description="Số ghế của phòng")
+    booked_count: int = Field(..., description="Số ghế đã được đặt (pending hoặc confirmed)")
+    version: int = Field(..., description="Tăng mỗi khi bitmap thay đổi trong process hiện tại")
+    bitmap: str = Field(
+        ...,
+        description=(
+            "Base64 của bitmap: bit i % 8 (LSB trước) của byte i // 8 là ghế thứ i "
+            "theo thứ tự của GET /seats/room/{room_id}"
+        ),
+    )
+
+class BookingBatchRequest(BaseSchema):
+    """Chọn booking theo danh sách id hoặc cả 1 suất chiếu (đúng 1 trong 2)"""
+    booking_ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000, description="Bookings to update")
+    showtime_id: Optional[int] = Field(None, description="Update every matching booking of this showtime")
+
+    @validator('showtime_id', always=True)
+    def exactly_one_target(cls, v, values):
+        if (v is None) == (values.get('booking_ids') is None):
+            raise ValueError('provide either booking_ids or showtime_id')
+        return v
+
+class BookingBatchPayRequest(BookingBatchRequest):
+    payment_method: str = Field("bank_transfer", description="Payment method (bank_transfer, momo, zalopay, etc.)")
+
+class BookingBatchResult(BaseSchema):
+    action: str = Field(..., description="cancel | pay | expire")
+    updated: int
+    updated_ids: List[int]
+    skipped_ids: List[int] = Field(default_factory=list, description="Requested ids that were missing or not eligible")
+    payments_created: int = 0
+    payments_cancelled: int = 0
+
+class CheckoutRequest(BaseSchema):
+    """Giỏ hàng: các booking pending của user hiện tại, thanh toán bằng 1 payment"""
+    booking_ids: List[int] = Field(..., min_length=1, max_length=100, description="Pending bookings to pay for")
+    payment_method: str = Field("bank_transfer", description="Payment method (bank_transfer, momo, zalopay, etc.)")
+
+class CheckoutResult(BaseSchema):
+    payment_id: int
+    amount: float = Field(..., description="Sum of the booking prices")
+    method: str
+    status: str
+    booking_ids: List[int]
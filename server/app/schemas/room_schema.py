@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import Field, validator
 from .base_schema import BaseSchema
 
@@ -39,3 +39,12 @@ class RoomRead(RoomBase):
     id: int
     created_at: datetime
     
+
+class RoomSeatGeneration(BaseSchema):
+    room_id: int = Field(..., gt=0, description="Room ID must be positive")
+    seats_per_row: Optional[int] = Field(None, gt=0, description="Seats per row for grid layout (default 10)")
+    layout: Optional[List[dict]] = Field(None, description="Custom rows: [{row, seats: [{number, type, price_modifier}]}]")
+
+class BatchSeatGenerationRequest(BaseSchema):
+    rooms: List[RoomSeatGeneration] = Field(..., min_length=1, max_length=500, description="Rooms to generate seats for")
+    overwrite: bool = Field(False, description="Replace seats of rooms that already have seats")
@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from typing import List, Optional
 from pydantic import validator, Field
 from .base_schema import BaseSchema
 
@@ -41,3 +42,19 @@ class ShowtimeCreate(ShowtimeBase):
 class ShowtimeRead(ShowtimeBase):
     id: int
     created_at: datetime
+
+class ShowtimeImportRequest(BaseSchema):
+    showtimes: List[ShowtimeCreate] = Field(..., min_length=1, max_length=5000, description="Showtimes to create")
+    all_or_nothing: bool = Field(False, description="Create nothing if any row conflicts")
+
+class ShowtimeImportConflict(BaseSchema):
+    index: int = Field(..., description="Position of the rejected row in the request")
+    room_id: int
+    reason: str
+    conflicting_showtime_id: Optional[int] = Field(None, description="Existing showtime it overlaps")
+    conflicting_index: Optional[int] = Field(None, description="Accepted row of the same request it overlaps")
+
+class ShowtimeImportResult(BaseSchema):
+    created: int
+    created_ids: List[int]
+    conflicts: List[ShowtimeImportConflict]
@@ -1,4 +1,5 @@
 from typing import Generic, TypeVar, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.repositories.base_repo import BaseRepository
 from app.models.base_model import Base
@@ -21,13 +22,13 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             raise exc
 
         if isinstance(exc, SQLAlchemyError):
-            logger.error(f"[{self.service_name}] Database error: {exc}", exc_info=True)
+            logger.error("[%s] Database error: %s", self.service_name, exc, exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Database error occurred"
             )
 
-        logger.error(f"[{self.service_name}] Unexpected error: {exc}", exc_info=True)
+        logger.error("[%s] Unexpected error: %s", self.service_name, exc, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -35,21 +36,28 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     def get(self, db: Session, id: int) -> Optional[ModelType]:
         try:
-            logger.info(f"[{self.service_name}] get(id={id}) called")
+            logger.debug("[%s] get(id=%s) called", self.service_name, id)
             return self.repository.get(db, id)
         except Exception as e:
             self.handle_exception(e)
 
+    async def aget(self, db: AsyncSession, id: int) -> Optional[ModelType]:
+        try:
+            logger.debug("[%s] aget(id=%s) called", self.service_name, id)
+            return await self.repository.aget_by_id(db, id)
+        except Exception as e:
+            self.handle_exception(e)
+
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
         try:
-            logger.info(f"[{self.service_name}] get_all(skip={skip}, limit={limit}) called")
+            logger.debug("[%s] get_all(skip=%s, limit=%s) called", self.service_name, skip, limit)
             return self.repository.get_all(db, skip, limit)
         except Exception as e:
             self.handle_exception(e)
 
     def create(self, db: Session, obj_in: CreateSchemaType) -> ModelType:
         try:
-            logger.info(f"[{self.service_name}] create() called with data: {obj_in}")
+            logger.info("[%s] create() called with data: %s", self.service_name, obj_in)
             return self.repository.create(db, obj_in)
         except Exception as e:
             self.handle_exception(e)
@@ -59,14 +67,14 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db_obj = self.repository.get(db, id)
             if not db_obj:
                 raise HTTPException(status_code=404, detail="Item not found")
-            logger.info(f"[{self.service_name}] update(id={id}) called")
+            logger.info("[%s] update(id=%s) called", self.service_name, id)
             return self.repository.update(db, db_obj, obj_in)
         except Exception as e:
             self.handle_exception(e)
 
     def delete(self, db: Session, id: int) -> Optional[ModelType]:
         try:
-            logger.info(f"[{self.service_name}] delete(id={id}) called")
+            logger.info("[%s] delete(id=%s) called", self.service_name, id)
             return self.repository.delete(db, id)
         except Exception as e:
             self.handle_exception(e)
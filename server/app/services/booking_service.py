@@ -1,18 +1,27 @@
 # app/services/booking_service.py
+from sqlalchemy import case
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from datetime import datetime, timezone
 from app.services.base_service import BaseService
 from app.repositories.booking_repo import BookingRepository
+from app.repositories.payment_repo import PaymentRepository
 from app.models.booking import Booking
 from app.schemas.booking_schema import BookingCreate, BookingUpdate, BookingRead
+from app.schemas.payment_schema import PaymentCreate
+from app.schemas.base_schema import decode_cursor
+from app.services.occupancy_service import occupancy_service, ACTIVE_BOOKING_STATUSES
+from app.services.seat_hold_service import seat_hold_service
+from app.services.seat_stream_service import seat_stream_service
 from app.config.logger import logger
 
 
 class BookingService(BaseService[Booking, BookingCreate, BookingUpdate]):
     def __init__(self, repository: Optional[BookingRepository] = None):
         super().__init__(repository=repository or BookingRepository(), service_name="BookingService")
+        self.payment_repository = PaymentRepository()
 
     # -------------------- CUSTOM METHODS --------------------
 
@@ -20,22 +29,78 @@ class BookingService(BaseService[Booking, BookingCreate, BookingUpdate]):
         """Tạo booking mới với kiểm tra chỗ ngồi trùng và xử lý race condition"""
         logger.info(f"Creating booking for seat={booking_in.seat_id}, showtime={booking_in.showtime_id}")
         
-        # Kiểm tra trước để trả lỗi sớm
-        existing = self.repository.get_by_seat(db, booking_in.showtime_id, booking_in.seat_id)
-        if existing:
+        # Dùng chung luồng đặt nhóm để ghế của booking đã hủy / hết hạn giữ được đặt lại
+        try:
+            return self.create_group_booking(db, [booking_in])[0]
+        except HTTPException as e:
+            if e.status_code != status.HTTP_409_CONFLICT:
+                raise
             logger.warning(f"Seat {booking_in.seat_id} for showtime {booking_in.showtime_id} already booked")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This seat has already been booked.")
-        
-        try:
-            return self.repository.create(db, booking_in)
-        except IntegrityError as e:
-            db.rollback()
-            # Unique constraint violation - seat đã được đặt bởi request khác
-            logger.warning(f"IntegrityError creating booking: {e}")
+
+    def create_group_booking(self, db: Session, bookings_in: List[BookingCreate]) -> List[BookingRead]:
+        """
+        Đặt nhiều ghế theo kiểu all-or-nothing: 1 transaction, 1 query kiểm tra trùng
+        theo uq_bookings_showtime_seat_active, 1 INSERT ... RETURNING và 1 commit.
+        Nếu có ghế bị trùng thì không ghế nào được đặt và trả về 409 kèm toàn bộ ghế trùng.
+        """
+        keys = [(b.showtime_id, b.seat_id) for b in bookings_in]
+        if not keys:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No seats selected")
+        duplicates = sorted({key for key in keys if keys.count(key) > 1})
+        if duplicates:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This seat has already been booked. Please select another seat."
+                detail={
+                    "message": "The same seat was selected more than once",
+                    "conflicts": [{"showtime_id": sh, "seat_id": se} for sh, se in duplicates],
+                },
             )
+        logger.info(f"Creating group booking: {len(keys)} seats")
+
+        try:
+            # Unique index chỉ tính booking active -> ghế của booking đã hủy / hết hạn đặt lại được
+            # mà không phải xóa lịch sử
+            conflicts = [(sh, se) for _, sh, se, _ in self.repository.get_by_seat_keys(db, keys)]
+            if conflicts:
+                db.rollback()
+                raise self._seat_conflict(conflicts)
+
+            bookings = self.repository.bulk_create(db, bookings_in, hold_until=seat_hold_service.new_deadline())
+            # Serialize trước khi commit để không phải refresh từng dòng sau commit
+            result = [BookingRead.model_validate(b) for b in bookings]
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            # Request khác vừa chiếm ghế giữa lúc kiểm tra và insert
+            logger.warning(f"IntegrityError creating group booking: {e}")
+            conflicts = [(sh, se) for _, sh, se, _ in self.repository.get_by_seat_keys(db, keys)]
+            db.rollback()
+            if conflicts:
+                raise self._seat_conflict(conflicts)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid showtime or seat")
+
+        booked_by_showtime: Dict[int, List[int]] = {}
+        for booking in result:
+            if booking.status in ACTIVE_BOOKING_STATUSES:
+                occupancy_service.mark_booked(booking.showtime_id, booking.seat_id)
+                booked_by_showtime.setdefault(booking.showtime_id, []).append(booking.seat_id)
+            if booking.expires_at:
+                seat_hold_service.hold(booking.id, booking.expires_at)
+        for showtime_id, seat_ids in booked_by_showtime.items():
+            seat_stream_service.publish(showtime_id, booked=seat_ids)
+        logger.info(f"Group booking created: ids={[b.id for b in result]}")
+        return result
+
+    @staticmethod
+    def _seat_conflict(conflicts: List[Tuple[int, int]]) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Some seats have already been booked. Please select other seats.",
+                "conflicts": [{"showtime_id": sh, "seat_id": se} for sh, se in sorted(conflicts)],
+            },
+        )
 
     def get_booking_by_id(self, db: Session, booking_id: int) -> BookingRead:
         booking = self.repository.get_by_id(db, booking_id)
@@ -57,6 +122,7 @@ class BookingService(BaseService[Booking, BookingCreate, BookingUpdate]):
             )
         
         booking.status = "cancelled"
+        booking.expires_at = None
         
         # Update payment status to cancelled if payment exists
         if booking.payment_id:
@@ -72,28 +138,37 @@ class BookingService(BaseService[Booking, BookingCreate, BookingUpdate]):
         
         db.commit()
         db.refresh(booking)
+        occupancy_service.mark_released(booking.showtime_id, booking.seat_id)
+        seat_stream_service.publish(booking.showtime_id, released=[booking.seat_id])
+        seat_hold_service.release(booking_id)
         logger.info(f"Booking id={booking_id} cancelled successfully")
         return booking
 
-    def get_bookings_paginated(self, db: Session, page: int, size: int) -> Tuple[List[BookingRead], int]:
-        """Lấy danh sách booking có phân trang"""
+    def get_bookings_paginated(self, db: Session, page: int, size: int,
+                               cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[BookingRead], Optional[int]]:
+        """Lấy danh sách booking có phân trang (cursor -> keyset theo id)"""
         offset = (page - 1) * size
-        items = self.repository.get_paginated(db, offset=offset, limit=size)
-        total = self.repository.count_all(db)
+        after = decode_cursor(cursor, 1) if cursor else None
+        items = self.repository.get_paginated(db, offset=offset, limit=size, after=after)
+        total = self.repository.count_all(db) if with_total else None
         return items, total
 
-    def get_user_bookings_paginated(self, db: Session, user_id: int, page: int, size: int) -> Tuple[List[BookingRead], int]:
+    def get_user_bookings_paginated(self, db: Session, user_id: int, page: int, size: int,
+                                    cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[BookingRead], Optional[int]]:
         """Lấy danh sách booking của user có phân trang"""
         offset = (page - 1) * size
-        items = self.repository.get_paginated_by_user(db, user_id, offset=offset, limit=size)
-        total = self.repository.count_by_user(db, user_id)
+        after = decode_cursor(cursor, 1) if cursor else None
+        items = self.repository.get_paginated_by_user(db, user_id, offset=offset, limit=size, after=after)
+        total = self.repository.count_by_user(db, user_id) if with_total else None
         return items, total
 
-    def get_user_bookings_paginated_with_details(self, db: Session, user_id: int, page: int, size: int) -> Tuple[List, int]:
+    def get_user_bookings_paginated_with_details(self, db: Session, user_id: int, page: int, size: int,
+                                                 cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List, Optional[int]]:
         """Lấy danh sách booking của user có phân trang với thông tin chi tiết (showtime, movie, theater)"""
         offset = (page - 1) * size
-        bookings = self.repository.get_paginated_by_user_with_details(db, user_id, offset=offset, limit=size)
-        total = self.repository.count_by_user(db, user_id)
+        after = decode_cursor(cursor, 1) if cursor else None
+        bookings = self.repository.get_paginated_by_user_with_details(db, user_id, offset=offset, limit=size, after=after)
+        total = self.repository.count_by_user(db, user_id) if with_total else None
         
         # Transform to BookingDetailRead
         result = []
@@ -166,6 +241,9 @@ class BookingService(BaseService[Booking, BookingCreate, BookingUpdate]):
         
         if not deleted_booking:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
+        # Ghế đã được trả khi booking bị hủy; lúc này ghế có thể đã thuộc booking active khác
+        # nên không mark_released / publish lại
+        seat_hold_service.release(booking_id)
         logger.info(f"Booking id={booking_id} deleted successfully")
         return deleted_booking
 
@@ -173,6 +251,13 @@ class BookingService(BaseService[Booking, BookingCreate, BookingUpdate]):
         """Return all bookings for a given showtime (used to determine occupied seats)."""
         return self.repository.get_by_showtime(db, showtime_id)
 
+    def get_showtime_occupancy(self, db: Session, showtime_id: int) -> dict:
+        """Bitmap ghế đã đặt của suất chiếu (in-process, không query DB khi đã có trong cache)."""
+        occupancy = occupancy_service.snapshot(db, showtime_id)
+        if occupancy is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Showtime not found")
+        return occupancy
+
     def pay_booking(self, db: Session, booking_id: int, payment_method: str = "bank_transfer") -> BookingRead:
         """Thanh toán booking - tạo payment và link với booking"""
         booking = self.repository.get_by_id(db, booking_id)
@@ -186,6 +271,13 @@ class BookingService(BaseService[Booking, BookingCreate, BookingUpdate]):
                 detail="Cannot pay for a cancelled booking"
             )
         
+        # Hold đã hết hạn nhưng chưa được scheduler trả ghế
+        if booking.status == "pending" and self._hold_expired(booking):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Seat hold has expired. Please select your seats again."
+            )
+        
         # Kiểm tra booking đã có payment chưa
         if booking.payment_id:
             # Kiểm tra payment status
@@ -203,27 +295,214 @@ class BookingService(BaseService[Booking, BookingCreate, BookingUpdate]):
             except Exception as e:
                 logger.warning(f"Error checking payment status: {e}")
         
-        # Tạo payment mới
-        from app.schemas.payment_schema import PaymentCreate
-        payment_data = PaymentCreate(
-            method=payment_method,
-            amount=booking.price,
-            created_by=booking.user_id,
-            status="pending"  # Status sẽ được update thành "success" sau khi xác nhận thanh toán
-        )
-        
-        from app.services.payment_service import PaymentService
-        payment_service = PaymentService()
-        payment = payment_service.create_payment(db, payment_data)
-        
-        # Link payment với booking
-        booking.payment_id = payment.id
-        # Cập nhật booking status thành confirmed khi thanh toán
-        booking.status = "confirmed"
-        
-        db.commit()
+        # Tạo payment và xác nhận booking trong cùng 1 transaction. UPDATE lặp lại điều kiện payable:
+        # scheduler có thể vừa hủy hold (hoặc ghế đã được đặt lại) sau các kiểm tra ở trên
+        now = datetime.now(timezone.utc)
+        try:
+            payment_id = self.payment_repository.bulk_create(db, [
+                # Status sẽ được update thành "success" sau khi xác nhận thanh toán
+                PaymentCreate(method=payment_method, amount=booking.price, created_by=booking.user_id, status="pending")
+            ])[0]
+            # Cập nhật booking status thành confirmed khi thanh toán - hold trở thành booking chính thức
+            rows = self.repository.update_returning(
+                db,
+                [Booking.id == booking_id] + self.repository.payable_conditions(now),
+                {"status": "confirmed", "expires_at": None, "payment_id": payment_id},
+            )
+            if not rows:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Booking was cancelled or its seat hold expired while paying. Please select your seats again.",
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
         db.refresh(booking)
-        logger.info(f"Payment {payment.id} created and linked to booking {booking_id}")
+        seat_hold_service.release(booking_id)
+        logger.info(f"Payment {payment_id} created and linked to booking {booking_id}")
         return booking
 
+    def checkout(self, db: Session, user_id: int, booking_ids: List[int], payment_method: str = "bank_transfer",
+                 now: Optional[datetime] = None) -> dict:
+        """
+        Thanh toán cả giỏ hàng bằng 1 payment: 1 query aggregate tính tổng tiền, 1 INSERT payment,
+        1 UPDATE bookings ... WHERE id IN (...), 1 commit. All-or-nothing - nếu có booking không
+        thanh toán được (không tồn tại, của user khác, đã hủy / đã trả tiền / hết hạn giữ) thì trả 400.
+        """
+        now = now or datetime.now(timezone.utc)
+        booking_ids = sorted(set(booking_ids))
+        conditions = [Booking.id.in_(booking_ids), Booking.user_id == user_id]
+        try:
+            count, total = self.repository.get_payable_total(db, conditions, now)
+            if count != len(booking_ids):
+                raise self._checkout_rejected(db, conditions, booking_ids, now)
+            payment_id = self.payment_repository.bulk_create(db, [
+                PaymentCreate(method=payment_method, amount=total, created_by=user_id, status="pending")
+            ])[0]
+            rows = self.repository.update_returning(
+                db,
+                conditions + self.repository.payable_conditions(now),
+                {"status": "confirmed", "expires_at": None, "payment_id": payment_id},
+            )
+            # Booking vừa bị hủy / hết hạn giữa query tổng tiền và UPDATE -> không tính tiền sai
+            if len(rows) != count:
+                raise self._checkout_rejected(db, conditions, booking_ids, now)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for booking_id in booking_ids:
+            seat_hold_service.release(booking_id)
+        logger.info(f"Checkout: payment {payment_id} ({total}) for bookings {booking_ids}")
+        return {
+            "payment_id": payment_id,
+            "amount": total,
+            "method": payment_method,
+            "status": "pending",
+            "booking_ids": booking_ids,
+        }
+
+    def _checkout_rejected(self, db: Session, conditions: list, booking_ids: List[int], now: datetime) -> HTTPException:
+        payable = {booking_id for booking_id, _, _ in self.repository.get_payable(db, conditions, now)}
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Some bookings cannot be checked out (not found, not yours, cancelled, paid or expired)",
+                "booking_ids": [booking_id for booking_id in booking_ids if booking_id not in payable],
+            },
+        )
+
+    # -------------------- BATCH TRANSITIONS --------------------
+    # Chọn booking theo danh sách id hoặc cả suất chiếu; mỗi thao tác là vài câu UPDATE
+    # set-based trong 1 transaction, 1 commit, và trả về bản tóm tắt thay vì từng booking.
+
+    def batch_cancel(self, db: Session, booking_ids: Optional[List[int]] = None, showtime_id: Optional[int] = None,
+                     user_id: Optional[int] = None) -> dict:
+        """
+        Hủy hàng loạt (vd. cả suất chiếu khi máy chiếu hỏng): 1 UPDATE bookings ... RETURNING,
+        1 UPDATE payments cho các payment không còn booking active, 1 commit.
+        `user_id` -> chỉ hủy booking của user đó, phần còn lại nằm trong skipped_ids.
+        """
+        conditions = self._batch_conditions(booking_ids, showtime_id, user_id) + [Booking.status != "cancelled"]
+        return self._release_many(db, "cancel", conditions, booking_ids)
+
+    def batch_expire(self, db: Session, booking_ids: Optional[List[int]] = None, showtime_id: Optional[int] = None,
+                     now: Optional[datetime] = None) -> dict:
+        """Trả ghế của các booking pending đã quá hạn giữ (không chờ scheduler của SeatHoldService)."""
+        now = now or datetime.now(timezone.utc)
+        conditions = self._batch_conditions(booking_ids, showtime_id) + [
+            Booking.status == "pending",
+            Booking.expires_at <= now,
+        ]
+        return self._release_many(db, "expire", conditions, booking_ids)
+
+    def batch_pay(self, db: Session, booking_ids: Optional[List[int]] = None, showtime_id: Optional[int] = None,
+                  user_id: Optional[int] = None, payment_method: str = "bank_transfer",
+                  now: Optional[datetime] = None) -> dict:
+        """
+        Thanh toán hàng loạt các booking pending còn hạn giữ: 1 SELECT ... FOR UPDATE,
+        1 INSERT payments (1 payment / user, amount = tổng giá) ... RETURNING,
+        1 UPDATE bookings (payment_id theo CASE user_id, lặp lại điều kiện payable), 1 commit.
+        UPDATE không khớp đủ số booking đã SELECT -> rollback, 409.
+        """
+        now = now or datetime.now(timezone.utc)
+        conditions = self._batch_conditions(booking_ids, showtime_id, user_id)
+        try:
+            payable = self.repository.get_payable(db, conditions, now)
+            totals: Dict[int, float] = {}
+            for _, owner_id, price in payable:
+                totals[owner_id] = totals.get(owner_id, 0.0) + price
+            owners = sorted(totals)
+            payment_ids = self.payment_repository.bulk_create(db, [
+                PaymentCreate(method=payment_method, amount=totals[owner_id], created_by=owner_id, status="pending")
+                for owner_id in owners
+            ])
+            rows = []
+            if payable:
+                rows = self.repository.update_returning(
+                    db,
+                    [Booking.id.in_([booking_id for booking_id, _, _ in payable])]
+                    + self.repository.payable_conditions(now),
+                    {
+                        "status": "confirmed",
+                        "expires_at": None,
+                        "payment_id": case(dict(zip(owners, payment_ids)), value=Booking.user_id),
+                    },
+                )
+            # Booking vừa bị hủy / hết hạn giữa SELECT và UPDATE (FOR UPDATE không khóa gì trên SQLite)
+            # -> tổng tiền của payment đã sai, hủy cả lô
+            if len(rows) != len(payable):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Some bookings changed while paying. Please retry.",
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for booking_id, *_ in rows:
+            seat_hold_service.release(booking_id)
+        logger.info(f"Batch pay: {len(rows)} bookings confirmed, {len(payment_ids)} payments created")
+        return self._batch_summary("pay", rows, booking_ids, payments_created=len(payment_ids))
+
+    def _release_many(self, db: Session, action: str, conditions: list, booking_ids: Optional[List[int]]) -> dict:
+        try:
+            rows = self.repository.update_returning(db, conditions, {"status": "cancelled", "expires_at": None})
+            payments_cancelled = self.payment_repository.cancel_unused(
+                db, {payment_id for *_, payment_id in rows if payment_id}
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        released: Dict[int, List[int]] = {}
+        for booking_id, showtime_id, seat_id, _ in rows:
+            occupancy_service.mark_released(showtime_id, seat_id)
+            seat_hold_service.release(booking_id)
+            released.setdefault(showtime_id, []).append(seat_id)
+        for showtime_id, seat_ids in released.items():
+            seat_stream_service.publish(showtime_id, released=seat_ids)
+        logger.info(f"Batch {action}: {len(rows)} bookings cancelled, {payments_cancelled} payments cancelled")
+        return self._batch_summary(action, rows, booking_ids, payments_cancelled=payments_cancelled)
+
+    @staticmethod
+    def _batch_conditions(booking_ids: Optional[List[int]], showtime_id: Optional[int],
+                          user_id: Optional[int] = None) -> list:
+        if booking_ids is None and showtime_id is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide booking_ids or showtime_id")
+        conditions = []
+        if booking_ids is not None:
+            conditions.append(Booking.id.in_(booking_ids))
+        if showtime_id is not None:
+            conditions.append(Booking.showtime_id == showtime_id)
+        if user_id is not None:
+            conditions.append(Booking.user_id == user_id)
+        return conditions
+
+    @staticmethod
+    def _batch_summary(action: str, rows: list, booking_ids: Optional[List[int]], **payments) -> dict:
+        updated_ids = sorted(row[0] for row in rows)
+        skipped_ids = sorted(set(booking_ids) - set(updated_ids)) if booking_ids is not None else []
+        return {
+            "action": action,
+            "updated": len(updated_ids),
+            "updated_ids": updated_ids,
+            "skipped_ids": skipped_ids,
+            "payments_created": 0,
+            "payments_cancelled": 0,
+            **payments,
+        }
 
+    @staticmethod
+    def _hold_expired(booking: Booking) -> bool:
+        if booking.expires_at is None:
+            return False
+        expires_at = booking.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return expires_at <= datetime.now(timezone.utc)
@@ -1,10 +1,14 @@
 from typing import List, Tuple, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.services.base_service import BaseService
 from app.repositories.movie_repo import MovieRepository
 from app.models.movie import Movie
 from app.schemas.movie_schema import MovieCreate, MovieBase, MovieRead
+from app.schemas.base_schema import decode_cursor
+from app.config.logger import logger
+from app.cache import response_cache
 
 class MovieService(BaseService[Movie, MovieCreate, MovieBase]):
     def __init__(self, repo: Optional[MovieRepository] = None):
@@ -14,11 +18,12 @@ class MovieService(BaseService[Movie, MovieCreate, MovieBase]):
     #     return self.repo.get_with_likes(db)
 
     # get movie phân trang 
-    def get_movies_paginated(self, db: Session, page: int = 1, size: int = 10) -> Tuple[List[MovieRead], int]:
+    def get_movies_paginated(self, db: Session, page: int = 1, size: int = 10,
+                             cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[MovieRead], Optional[int]]:
         skip = (page - 1) * size 
-        movies, total = self.repository.get_paginated(db, skip=skip, limit=size)
-        for movie in movies: 
-            movie.liked_by_count = len(movie.liked_by) if hasattr(movie, "liked_by") else 0
+        after = decode_cursor(cursor, 1) if cursor else None
+        movies, total = self.repository.get_paginated(db, skip=skip, limit=size, after=after, with_total=with_total)
+        self._attach_like_counts(db, movies)
         return movies, total
 
     # get movie by id 
@@ -26,33 +31,85 @@ class MovieService(BaseService[Movie, MovieCreate, MovieBase]):
         movie = self.repository.get_by_id(db, movie_id)
         if not movie:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
-        movie.liked_by_count = len(movie.liked_by) if hasattr(movie, "liked_by") else 0
+        self._attach_like_counts(db, [movie])
         return movie
 
     def create_movie(self, db: Session, data: MovieCreate):
         existing = self.repository.get_by_title(db, data.title)
         if existing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Movie already exists")
-        return self.repository.create(db, data)
+        movie = self.repository.create(db, data)
+        self._reindex_search(db, movie.id)
+        response_cache.invalidate("movies")
+        return movie
 
     def update_movie(self, db: Session, movie_id: int, data: MovieBase):
         movie = self.repository.get_by_id(db, movie_id)
         if not movie:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
-        return self.repository.update(db, movie, data)
+        movie = self.repository.update(db, movie, data)
+        self._reindex_search(db, movie.id)
+        response_cache.invalidate("movies", f"movie:{movie_id}")
+        return movie
 
     def delete_movie(self, db: Session, movie_id: int):
+        # Xóa khỏi chỉ mục tìm kiếm trong cùng transaction với DELETE movie
+        self.repository.remove_from_search(db, movie_id)
         movie = self.repository.delete(db, movie_id)
         if not movie:
+            db.rollback()
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
+        # Showtime của phim bị xóa theo cascade
+        response_cache.invalidate("movies", f"movie:{movie_id}", "showtimes")
         return movie
 
-    def search_movies(self, db: Session, query: str, page: int = 1, size: int = 10) -> Tuple[List[MovieRead], int]:
+    def _attach_like_counts(self, db: Session, movies: List[Movie]) -> None:
+        """Gán liked_by_count cho cả trang bằng 1 query GROUP BY (không lazy-load movie.liked_by)."""
+        counts = self.repository.count_likes(db, [movie.id for movie in movies])
+        for movie in movies:
+            movie.liked_by_count = counts.get(movie.id, 0)
+
+    def _reindex_search(self, db: Session, movie_id: int) -> None:
+        """Đồng bộ chỉ mục full-text sau khi phim được lưu. Lỗi chỉ ghi log - chạy lại
+        scripts/command/rebuild_search_index.py để dựng lại toàn bộ chỉ mục."""
+        try:
+            self.repository.reindex_search(db, [movie_id])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[MovieService] Failed to index movie id={movie_id} for search: {e}", exc_info=True)
+
+    def search_movies(self, db: Session, query: str, page: int = 1, size: int = 10,
+                      with_total: bool = True) -> Tuple[List[MovieRead], Optional[int]]:
         """
-        Tìm kiếm phim theo query string.
+        Tìm kiếm phim theo query string, xếp theo độ liên quan (phân trang bằng page/size).
         """
         skip = (page - 1) * size
-        movies, total = self.repository.search_movies(db, query, skip=skip, limit=size)
+        movies, total = self.repository.search_movies(db, query, skip=skip, limit=size, with_total=with_total)
+        self._attach_like_counts(db, movies)
+        return movies, total
+
+    # -------------------- ASYNC READ --------------------
+    async def aget_movies_paginated(self, db: AsyncSession, page: int = 1, size: int = 10) -> Tuple[List[MovieRead], int]:
+        skip = (page - 1) * size
+        movies, total = await self.repository.aget_paginated(db, skip=skip, limit=size)
+        await self._aattach_like_counts(db, movies)
+        return movies, total
+
+    async def aget_movie_by_id(self, db: AsyncSession, movie_id: int):
+        movie = await self.repository.aget_by_id(db, movie_id)
+        if not movie:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Movie not found")
+        await self._aattach_like_counts(db, [movie])
+        return movie
+
+    async def asearch_movies(self, db: AsyncSession, query: str, page: int = 1, size: int = 10) -> Tuple[List[MovieRead], int]:
+        skip = (page - 1) * size
+        movies, total = await self.repository.asearch_movies(db, query, skip=skip, limit=size)
+        await self._aattach_like_counts(db, movies)
+        return movies, total
+
+    async def _aattach_like_counts(self, db: AsyncSession, movies: List[Movie]) -> None:
+        counts = await self.repository.acount_likes(db, [movie.id for movie in movies])
         for movie in movies:
-            movie.liked_by_count = len(movie.liked_by) if hasattr(movie, "liked_by") else 0
-        return movies, total
\ No newline at end of file
+            movie.liked_by_count = counts.get(movie.id, 0)
@@ -0,0 +1,190 @@
+import base64
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking
+from app.models.seat import Seat
+from app.models.showtime import Showtime
+from app.config.logger import logger
+
+ACTIVE_BOOKING_STATUSES = ("pending", "confirmed")
+
+
+class ShowtimeOccupancy:
+    """
+    Bitmap ghế đã đặt của 1 suất chiếu.
+
+    Bit thứ i (byte i // 8, bit i % 8 tính từ LSB) ứng với ghế thứ i của phòng
+    theo thứ tự (row, number) - cùng thứ tự với GET /seats/room/{room_id}.
+    """
+
+    __slots__ = ("showtime_id", "room_id", "seat_ids", "positions", "bits", "booked_count", "version")
+
+    def __init__(self, showtime_id: int, room_id: int, seat_ids: List[int]):
+        self.showtime_id = showtime_id
+        self.room_id = room_id
+        self.seat_ids = tuple(seat_ids)
+        self.positions: Dict[int, int] = {seat_id: pos for pos, seat_id in enumerate(seat_ids)}
+        self.bits = bytearray((len(seat_ids) + 7) // 8)
+        self.booked_count = 0
+        self.version = 0
+
+    def set(self, seat_id: int, booked: bool) -> bool:
+        """Đánh dấu ghế đã đặt / trống. Trả về True nếu bitmap thay đổi."""
+        pos = self.positions.get(seat_id)
+        if pos is None:
+            return False
+        byte, mask = pos >> 3, 1 << (pos & 7)
+        if bool(self.bits[byte] & mask) == booked:
+            return False
+        if booked:
+            self.bits[byte] |= mask
+            self.booked_count += 1
+        else:
+            self.bits[byte] &= ~mask
+            self.booked_count -= 1
+        self.version += 1
+        return True
+
+    def is_booked(self, seat_id: int) -> bool:
+        pos = self.positions.get(seat_id)
+        if pos is None:
+            return False
+        return bool(self.bits[pos >> 3] & (1 << (pos & 7)))
+
+    def snapshot(self) -> dict:
+        return {
+            "showtime_id": self.showtime_id,
+            "room_id": self.room_id,
+            "seat_count": len(self.seat_ids),
+            "booked_count": self.booked_count,
+            "version": self.version,
+            "bitmap": base64.b64encode(bytes(self.bits)).decode("ascii"),
+        }
+
+
+class SeatOccupancyService:
+    """
+    Cache in-process trạng thái ghế theo suất chiếu.
+
+    Lần đọc đầu tiên của 1 suất chiếu tốn 1 query; sau đó BookingService cập nhật
+    bitmap trực tiếp khi tạo / hủy / xóa booking nên đọc sơ đồ ghế không chạm DB.
+    Mỗi process giữ bản riêng - các thay đổi đi qua process khác chỉ được thấy
+    sau khi entry bị invalidate hoặc bị đẩy khỏi LRU.
+    """
+
+    def __init__(self, max_showtimes: int = 2048):
+        self.max_showtimes = max_showtimes
+        self._entries: "OrderedDict[int, ShowtimeOccupancy]" = OrderedDict()
+        # Các thay đổi xảy ra trong lúc một suất chiếu đang được load từ DB
+        self._loading: Dict[int, List[Tuple[int, bool]]] = {}
+        self._lock = threading.Lock()
+
+    # -------------------- READ --------------------
+    def get(self, db: Session, showtime_id: int) -> Optional[ShowtimeOccupancy]:
+        """Lấy bitmap của suất chiếu, load từ DB nếu chưa có. Trả về None nếu suất chiếu không tồn tại."""
+        with self._lock:
+            entry = self._entries.get(showtime_id)
+            if entry is not None:
+                self._entries.move_to_end(showtime_id)
+                return entry
+            self._loading.setdefault(showtime_id, [])
+
+        try:
+            entry = self._load(db, showtime_id)
+        except Exception:
+            with self._lock:
+                self._loading.pop(showtime_id, None)
+            raise
+
+        with self._lock:
+            pending = self._loading.pop(showtime_id, [])
+            if entry is None:
+                return None
+            # Một request khác đã load xong trước -> dùng bản đang được cập nhật
+            existing = self._entries.get(showtime_id)
+            if existing is not None:
+                return existing
+            for seat_id, booked in pending:
+                entry.set(seat_id, booked)
+            self._entries[showtime_id] = entry
+            self._entries.move_to_end(showtime_id)
+            while len(self._entries) > self.max_showtimes:
+                self._entries.popitem(last=False)
+        return entry
+
+    def snapshot(self, db: Session, showtime_id: int) -> Optional[dict]:
+        """Bản chụp nhất quán (bitmap + version) để trả về cho client."""
+        entry = self.get(db, showtime_id)
+        if entry is None:
+            return None
+        with self._lock:
+            return entry.snapshot()
+
+    def _load(self, db: Session, showtime_id: int) -> Optional[ShowtimeOccupancy]:
+        logger.info(f"[SeatOccupancyService] Loading occupancy for showtime={showtime_id}")
+        stmt = (
+            select(Showtime.room_id, Seat.id, Booking.id)
+            .join(Seat, Seat.room_id == Showtime.room_id)
+            .outerjoin(
+                Booking,
+                and_(
+                    Booking.showtime_id == Showtime.id,
+                    Booking.seat_id == Seat.id,
+                    Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                ),
+            )
+            .where(Showtime.id == showtime_id)
+            .order_by(Seat.row, Seat.number, Seat.id)
+        )
+        rows = db.execute(stmt).all()
+        if not rows:
+            showtime = db.get(Showtime, showtime_id)
+            if showtime is None:
+                return None
+            return ShowtimeOccupancy(showtime_id, showtime.room_id, [])
+
+        # Mỗi ghế có tối đa 1 booking active (uq_bookings_showtime_seat_active) nên không bị trùng dòng
+        entry = ShowtimeOccupancy(showtime_id, rows[0][0], [seat_id for _, seat_id, _ in rows])
+        for _, seat_id, booking_id in rows:
+            if booking_id is not None:
+                entry.set(seat_id, True)
+        return entry
+
+    # -------------------- WRITE --------------------
+    def mark_booked(self, showtime_id: int, seat_id: int) -> None:
+        self._apply(showtime_id, seat_id, True)
+
+    def mark_released(self, showtime_id: int, seat_id: int) -> None:
+        self._apply(showtime_id, seat_id, False)
+
+    def _apply(self, showtime_id: int, seat_id: int, booked: bool) -> None:
+        with self._lock:
+            entry = self._entries.get(showtime_id)
+            if entry is not None:
+                entry.set(seat_id, booked)
+            if showtime_id in self._loading:
+                self._loading[showtime_id].append((seat_id, booked))
+
+    # -------------------- INVALIDATION --------------------
+    def invalidate_showtime(self, showtime_id: int) -> None:
+        with self._lock:
+            self._entries.pop(showtime_id, None)
+
+    def invalidate_room(self, room_id: int) -> None:
+        """Sơ đồ ghế của phòng thay đổi -> bỏ bitmap của mọi suất chiếu trong phòng."""
+        with self._lock:
+            stale = [sid for sid, entry in self._entries.items() if entry.room_id == room_id]
+            for sid in stale:
+                del self._entries[sid]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+occupancy_service = SeatOccupancyService()
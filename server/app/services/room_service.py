@@ -1,12 +1,18 @@
+from datetime import datetime, timezone
+from sqlalchemy import delete, exists, func, insert, select
 from sqlalchemy.orm import Session
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from fastapi import HTTPException
 from app.services.base_service import BaseService
 from app.repositories.room_repo import RoomRepository
 from app.models.room import Room
-from app.schemas.room_schema import RoomCreate, RoomRead, RoomUpdate, RoomBase
+from app.schemas.room_schema import RoomCreate, RoomRead, RoomUpdate, RoomBase, RoomSeatGeneration
 from app.config.logger import logger
+from app.models.booking import Booking
 from app.models.seat import Seat
+from app.services.occupancy_service import occupancy_service, ACTIVE_BOOKING_STATUSES
+from app.services.seat_map_service import seat_map_service
+from app.cache import response_cache
 import math
 
 class RoomService(BaseService[Room, RoomCreate, RoomBase]):
@@ -74,6 +80,10 @@ class RoomService(BaseService[Room, RoomCreate, RoomBase]):
         if not deleted:
             logger.warning(f"Room id={room_id} not found for deletion")
             raise HTTPException(status_code=404, detail="Room not found")
+        occupancy_service.invalidate_room(room_id)
+        seat_map_service.invalidate(room_id)
+        # Ghế và suất chiếu của phòng bị xóa theo cascade
+        response_cache.invalidate(f"room:{room_id}", "showtimes")
         logger.info(f"Room id={room_id} deleted successfully")
         return {"message": "Room deleted successfully"}
 
@@ -90,72 +100,146 @@ class RoomService(BaseService[Room, RoomCreate, RoomBase]):
         if not room:
             raise HTTPException(status_code=404, detail="Room not found")
 
-        # If overwrite, delete existing seats
-        existing = db.query(Seat).filter(Seat.room_id == room_id).all()
-        if existing and not overwrite:
-            return {"message": "Seats already exist for this room", "existing": len(existing)}
-        if existing and overwrite:
-            for s in existing:
-                db.delete(s)
-            db.commit()
-
         total = room.total_seats or 0
         if total <= 0:
             raise HTTPException(status_code=400, detail="Room total_seats must be > 0")
 
-        if layout:
-            created = self._generate_from_layout(db, room_id, layout, total)
-        else:
-            per_row = seats_per_row or 10
-            created = self._generate_grid(db, room_id, total, per_row)
+        existing = self._count_seats(db, [room_id]).get(room_id, 0)
+        if existing and not overwrite:
+            return {"message": "Seats already exist for this room", "existing": existing}
+
+        # 1 câu DELETE theo room_id + 1 INSERT executemany (không tạo / flush từng ORM object)
+        if existing:
+            self._ensure_no_active_bookings(db, [room_id])
+            db.execute(delete(Seat).where(Seat.room_id == room_id))
+        rows = self._seat_rows(room_id, total, seats_per_row, layout)
+        if rows:
+            db.execute(insert(Seat), rows)
+        seat_map_service.bump(db, [room_id])
 
         db.commit()
-        return {"created": created}
+        occupancy_service.invalidate_room(room_id)
+        seat_map_service.invalidate(room_id)
+        response_cache.invalidate(f"room:{room_id}")
+        return {"created": len(rows)}
+
+    def generate_seats_batch(self, db: Session, specs: List[RoomSeatGeneration], overwrite: bool = False) -> dict:
+        """
+        Sinh ghế cho nhiều phòng trong 1 transaction: 1 query lấy phòng, 1 query đếm ghế (GROUP BY),
+        1 DELETE ... WHERE room_id IN (...) và 1 INSERT executemany cho toàn bộ ghế.
+        Phòng đã có ghế mà không overwrite thì bỏ qua (ghi trong "skipped"); overwrite phòng
+        có ghế đang được đặt (pending / confirmed) bị từ chối với 409.
+        """
+        specs_by_room = {spec.room_id: spec for spec in specs}
+        room_ids = list(specs_by_room)
+        rooms = {room.id: room for room in db.scalars(select(Room).where(Room.id.in_(room_ids)))}
+        missing = [room_id for room_id in room_ids if room_id not in rooms]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Rooms not found: {missing}")
+        invalid = [room_id for room_id in room_ids if (rooms[room_id].total_seats or 0) <= 0]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Room total_seats must be > 0: {invalid}")
+
+        existing = self._count_seats(db, room_ids)
+        skipped = [room_id for room_id in room_ids if existing.get(room_id) and not overwrite]
+        targets = [room_id for room_id in room_ids if room_id not in skipped]
+
+        overwritten = [room_id for room_id in targets if existing.get(room_id)]
+        if overwritten:
+            self._ensure_no_active_bookings(db, overwritten)
+            db.execute(delete(Seat).where(Seat.room_id.in_(overwritten)))
+
+        created = {}
+        rows: List[dict] = []
+        for room_id in targets:
+            spec = specs_by_room[room_id]
+            room_rows = self._seat_rows(room_id, rooms[room_id].total_seats, spec.seats_per_row, spec.layout)
+            created[room_id] = len(room_rows)
+            rows.extend(room_rows)
+        if rows:
+            db.execute(insert(Seat), rows)
+        seat_map_service.bump(db, targets)
+        db.commit()
 
-    def _generate_grid(self, db: Session, room_id: int, total: int, seats_per_row: int) -> int:
+        for room_id in targets:
+            occupancy_service.invalidate_room(room_id)
+        seat_map_service.invalidate(*targets)
+        if targets:
+            response_cache.invalidate(*(f"room:{room_id}" for room_id in targets))
+        logger.info("Generated %d seats for %d rooms (%d skipped)", len(rows), len(targets), len(skipped))
+        return {
+            "created": created,
+            "skipped": skipped,
+            "total_created": len(rows),
+        }
+
+    def _ensure_no_active_bookings(self, db: Session, room_ids: List[int]) -> None:
+        """
+        DELETE ghế cascade sang bookings (ON DELETE CASCADE) -> không cho xóa ghế còn booking
+        pending / confirmed. 1 query EXISTS cho mọi phòng.
+        """
+        stmt = (
+            select(Seat.room_id)
+            .where(
+                Seat.room_id.in_(room_ids),
+                exists().where(Booking.seat_id == Seat.id, Booking.status.in_(ACTIVE_BOOKING_STATUSES)),
+            )
+            .distinct()
+        )
+        booked = sorted(db.scalars(stmt).all())
+        if booked:
+            logger.warning(f"Refusing to overwrite seats of rooms {booked}: active bookings exist")
+            raise HTTPException(status_code=409, detail=f"Rooms have seats with active bookings: {booked}")
+
+    def _count_seats(self, db: Session, room_ids: List[int]) -> Dict[int, int]:
+        stmt = select(Seat.room_id, func.count(Seat.id)).where(Seat.room_id.in_(room_ids)).group_by(Seat.room_id)
+        return dict(db.execute(stmt).all())
+
+    def _seat_rows(self, room_id: int, total: int, seats_per_row: Optional[int] = None,
+                   layout: Optional[List[dict]] = None) -> List[dict]:
+        if layout:
+            rows = self._generate_from_layout(room_id, layout, total)
+        else:
+            rows = self._generate_grid(room_id, total, seats_per_row or 10)
+        # Cùng 1 timestamp cho cả lô thay vì gọi default của TimestampMixin cho từng dòng
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            row["created_at"] = row["updated_at"] = now
+        return rows
+
+    def _generate_grid(self, room_id: int, total: int, seats_per_row: int) -> List[dict]:
         rows_count = int(math.ceil(total / seats_per_row))
-        created = 0
-        current = 0
-
-        for i in range(rows_count):
-            row_label = self._row_label(i)
-            for num in range(1, seats_per_row + 1):
-                if current >= total:
-                    break
-                seat = Seat(
-                    room_id=room_id,
-                    row=row_label,
-                    number=num,
-                    seat_type='standard',
-                    price_modifier=1.0,
-                    is_active=True,
-                )
-                db.add(seat)
-                created += 1
-                current += 1
-        return created
-
-    def _generate_from_layout(self, db: Session, room_id: int, layout: List[dict], total: int) -> int:
-        created = 0
+        labels = [self._row_label(i) for i in range(rows_count)]
+        return [
+            {
+                "room_id": room_id,
+                "row": labels[index // seats_per_row],
+                "number": index % seats_per_row + 1,
+                "seat_type": "standard",
+                "price_modifier": 1.0,
+                "is_active": True,
+            }
+            for index in range(total)
+        ]
+
+    def _generate_from_layout(self, room_id: int, layout: List[dict], total: int) -> List[dict]:
+        seats: List[dict] = []
         for row in layout:
-            row_label = row.get("row") or self._row_label(row.get("index", created))
-            seats = row.get("seats", [])
-            for seat_cfg in seats:
-                if created >= total:
+            row_label = row.get("row") or self._row_label(row.get("index", len(seats)))
+            for seat_cfg in row.get("seats", []):
+                if len(seats) >= total:
                     break
-                seat = Seat(
-                    room_id=room_id,
-                    row=row_label,
-                    number=seat_cfg.get("number"),
-                    seat_type=seat_cfg.get("type", "standard"),
-                    price_modifier=seat_cfg.get("price_modifier", 1.0),
-                    is_active=seat_cfg.get("is_active", True),
-                )
-                db.add(seat)
-                created += 1
-            if created >= total:
+                seats.append({
+                    "room_id": room_id,
+                    "row": row_label,
+                    "number": seat_cfg.get("number"),
+                    "seat_type": seat_cfg.get("type", "standard"),
+                    "price_modifier": seat_cfg.get("price_modifier", 1.0),
+                    "is_active": seat_cfg.get("is_active", True),
+                })
+            if len(seats) >= total:
                 break
-        return created
+        return seats
 
     def _row_label(self, index: int) -> str:
         letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
@@ -0,0 +1,191 @@
+import heapq
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config.database import SessionLocal
+from app.config.logger import logger
+from app.config.settings import settings
+from app.models.booking import Booking
+from app.services.occupancy_service import occupancy_service
+from app.services.seat_stream_service import seat_stream_service
+
+
+class SeatHoldService:
+    """
+    Giữ ghế có thời hạn cho booking 'pending' (giỏ hàng chưa thanh toán).
+
+    Hạn giữ được đưa vào min-heap (expires_at, booking_id) trong process:
+    - hold(): O(log n) push
+    - release(): O(1), entry trong heap bị bỏ qua khi tới hạn (lazy deletion)
+    - expire_due(): pop các hold đã hết hạn và trả ghế bằng 1 câu UPDATE theo id,
+      không bao giờ quét cả bảng bookings.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = settings.SEAT_HOLD_TTL_SECONDS,
+        batch_size: int = settings.SEAT_HOLD_RELEASE_BATCH_SIZE,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._heap: List[Tuple[float, int]] = []
+        self._deadlines: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def new_deadline(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Thời điểm hết hạn cho hold tạo lúc `now` (None nếu tắt tính năng giữ ghế)."""
+        if not self.enabled:
+            return None
+        return (now or datetime.now(timezone.utc)) + timedelta(seconds=self.ttl_seconds)
+
+    # -------------------- HOLD / RELEASE --------------------
+    def hold(self, booking_id: int, expires_at: datetime) -> None:
+        deadline = _timestamp(expires_at)
+        with self._lock:
+            self._deadlines[booking_id] = deadline
+            heapq.heappush(self._heap, (deadline, booking_id))
+            is_earliest = self._heap[0][1] == booking_id
+        if is_earliest:
+            self._wakeup.set()
+
+    def release(self, booking_id: int) -> None:
+        """Bỏ theo dõi hold (đã thanh toán / đã hủy)."""
+        with self._lock:
+            self._deadlines.pop(booking_id, None)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._deadlines)
+
+    def _pop_due(self, now: float) -> List[int]:
+        due: List[int] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+                deadline, booking_id = heapq.heappop(self._heap)
+                # Entry cũ của hold đã release hoặc đã được gia hạn -> bỏ qua
+                if self._deadlines.get(booking_id) == deadline:
+                    del self._deadlines[booking_id]
+                    due.append(booking_id)
+        return due
+
+    def _next_deadline(self) -> Optional[float]:
+        with self._lock:
+            while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    # -------------------- EXPIRY --------------------
+    def expire_due(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Trả các ghế đã hết hạn giữ. Mỗi batch là 1 câu UPDATE ... WHERE id IN (...)."""
+        now = now or datetime.now(timezone.utc)
+        released = 0
+        while True:
+            ids = self._pop_due(_timestamp(now))
+            if not ids:
+                return released
+            stmt = (
+                update(Booking)
+                .where(
+                    Booking.id.in_(ids),
+                    Booking.status == "pending",
+                    Booking.expires_at <= now,
+                )
+                .values(status="cancelled", expires_at=None)
+                .returning(Booking.showtime_id, Booking.seat_id)
+                .execution_options(synchronize_session=False)
+            )
+            try:
+                seats = db.execute(stmt).all()
+                db.commit()
+            except Exception:
+                db.rollback()
+                # Đưa lại vào heap để lần quét sau thử lại
+                retry_at = now + timedelta(seconds=5)
+                for booking_id in ids:
+                    self.hold(booking_id, retry_at)
+                raise
+            released_by_showtime: Dict[int, List[int]] = {}
+            for showtime_id, seat_id in seats:
+                occupancy_service.mark_released(showtime_id, seat_id)
+                released_by_showtime.setdefault(showtime_id, []).append(seat_id)
+            for showtime_id, seat_ids in released_by_showtime.items():
+                seat_stream_service.publish(showtime_id, released=seat_ids)
+            released += len(seats)
+            logger.info(f"[SeatHoldService] Released {len(seats)} expired seat holds")
+
+    def recover(self, db: Session) -> int:
+        """Nạp lại các hold còn hiệu lực từ DB khi khởi động (dùng index trên expires_at)."""
+        rows = db.execute(
+            select(Booking.id, Booking.expires_at).where(
+                Booking.expires_at.is_not(None),
+                Booking.status == "pending",
+            )
+        ).all()
+        for booking_id, expires_at in rows:
+            self.hold(booking_id, expires_at)
+        return len(rows)
+
+    # -------------------- BACKGROUND SCHEDULER --------------------
+    def start(self) -> None:
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="seat-hold-expiry", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        try:
+            with self.session_factory() as db:
+                count = self.recover(db)
+            logger.info(f"[SeatHoldService] Recovered {count} active seat holds")
+        except Exception as e:
+            logger.warning(f"[SeatHoldService] Failed to recover seat holds: {e}")
+
+        while not self._stopping.is_set():
+            deadline = self._next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - _timestamp(datetime.now(timezone.utc)))
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                with self.session_factory() as db:
+                    self.expire_due(db)
+            except Exception as e:
+                logger.error(f"[SeatHoldService] Failed to release expired holds: {e}", exc_info=True)
+                self._stopping.wait(1.0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
+            self._deadlines.clear()
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite trả về datetime naive -> coi như UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+seat_hold_service = SeatHoldService()
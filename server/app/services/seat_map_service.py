@@ -0,0 +1,136 @@
+import base64
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.room import Room
+from app.models.seat import Seat
+from app.config.logger import logger
+
+
+class SeatMap:
+    """
+    Sơ đồ ghế đã biên dịch của 1 phòng, dạng cột (mỗi thuộc tính là 1 mảng theo thứ tự
+    (row, number) - cùng thứ tự bit với bitmap occupancy của suất chiếu).
+    Body JSON và ETag được tính sẵn 1 lần cho mỗi version.
+    """
+
+    __slots__ = ("room_id", "version", "document", "body", "etag")
+
+    def __init__(self, room_id: int, version: int, seats: List[tuple]):
+        self.room_id = room_id
+        self.version = version
+        self.document = self._compile(room_id, version, seats)
+        self.body = json.dumps(self.document, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"seatmap-{room_id}-v{version}"'
+
+    @staticmethod
+    def _compile(room_id: int, version: int, seats: List[tuple]) -> dict:
+        rows: Dict[str, int] = {}
+        types: Dict[str, int] = {}
+        active = bytearray((len(seats) + 7) // 8)
+        ids, row_index, numbers, type_index, price_modifiers = [], [], [], [], []
+        for pos, (seat_id, row, number, seat_type, price_modifier, is_active) in enumerate(seats):
+            ids.append(seat_id)
+            row_index.append(rows.setdefault(row, len(rows)))
+            numbers.append(number)
+            type_index.append(types.setdefault(seat_type, len(types)))
+            price_modifiers.append(price_modifier)
+            if is_active:
+                active[pos >> 3] |= 1 << (pos & 7)
+        return {
+            "room_id": room_id,
+            "version": version,
+            "seat_count": len(seats),
+            "rows": list(rows),
+            "types": list(types),
+            "ids": ids,
+            "row_index": row_index,
+            "numbers": numbers,
+            "type_index": type_index,
+            "price_modifiers": price_modifiers,
+            # Bit i (byte i // 8, bit i % 8 tính từ LSB) = ghế thứ i đang hoạt động
+            "active": base64.b64encode(bytes(active)).decode("ascii"),
+        }
+
+
+class SeatMapService:
+    """
+    Cache in-process sơ đồ ghế theo phòng, gắn với Room.seat_map_version.
+
+    generate_seats và CRUD ghế tăng version trong cùng transaction (bump) rồi xóa entry
+    sau khi commit (invalidate). Request có If-None-Match khớp ETag của entry đang cache
+    được trả 304 mà không chạm DB. Mỗi process giữ bản riêng như SeatOccupancyService.
+    """
+
+    def __init__(self, max_rooms: int = 1024):
+        self.max_rooms = max_rooms
+        self._entries: "OrderedDict[int, SeatMap]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # -------------------- READ --------------------
+    def cached(self, room_id: int) -> Optional[SeatMap]:
+        with self._lock:
+            entry = self._entries.get(room_id)
+            if entry is not None:
+                self._entries.move_to_end(room_id)
+            return entry
+
+    def get(self, db: Session, room_id: int) -> Optional[SeatMap]:
+        """Lấy sơ đồ ghế (load + biên dịch nếu chưa có). Trả về None nếu phòng không tồn tại."""
+        entry = self.cached(room_id)
+        if entry is not None:
+            return entry
+
+        # Version và ghế trong cùng 1 câu SELECT (1 snapshot) -> không ghép ghế mới với version cũ
+        rows = db.execute(
+            select(Room.seat_map_version, Seat.id, Seat.row, Seat.number, Seat.seat_type, Seat.price_modifier, Seat.is_active)
+            .select_from(Room)
+            .outerjoin(Seat, Seat.room_id == Room.id)
+            .where(Room.id == room_id)
+            .order_by(Seat.row, Seat.number, Seat.id)
+        ).all()
+        if not rows:
+            return None
+        version = rows[0][0]
+        seats = [tuple(row[1:]) for row in rows if row[1] is not None]
+        entry = SeatMap(room_id, version, seats)
+        logger.debug("[SeatMapService] Compiled seat map room=%s version=%s seats=%s", room_id, version, len(seats))
+
+        with self._lock:
+            existing = self._entries.get(room_id)
+            if existing is not None and existing.version >= entry.version:
+                return existing
+            self._entries[room_id] = entry
+            self._entries.move_to_end(room_id)
+            while len(self._entries) > self.max_rooms:
+                self._entries.popitem(last=False)
+        return entry
+
+    # -------------------- WRITE --------------------
+    def bump(self, db: Session, room_ids: Iterable[int]) -> None:
+        """Tăng seat_map_version của các phòng (chưa commit - chạy trong transaction của caller)."""
+        room_ids = list(room_ids)
+        if room_ids:
+            db.execute(
+                update(Room)
+                .where(Room.id.in_(room_ids))
+                .values(seat_map_version=Room.seat_map_version + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+    def invalidate(self, *room_ids: int) -> None:
+        with self._lock:
+            for room_id in room_ids:
+                self._entries.pop(room_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+seat_map_service = SeatMapService()
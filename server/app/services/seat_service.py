@@ -6,6 +6,9 @@ from app.services.base_service import BaseService
 from app.repositories.seat_repo import SeatRepository
 from app.models.seat import Seat
 from app.schemas.seat_schema import SeatCreate, SeatRead, SeatBase
+from app.services.occupancy_service import occupancy_service
+from app.services.seat_map_service import seat_map_service
+from app.cache import response_cache
 from app.config.logger import logger
 
 
@@ -46,15 +49,56 @@ class SeatService(BaseService[Seat, SeatCreate, SeatBase]):
         logger.info(f"[SeatService] Returning {len(seats)} seats in room_id={room_id} (page={page}/{(total // size) + 1})")
         return seats, total
 
+    def _commit_seat_change(self, db: Session, *room_ids: int) -> None:
+        """
+        Flush thay đổi ghế, tăng version sơ đồ ghế của các phòng bị ảnh hưởng rồi commit 1 lần:
+        reader không thể thấy ghế mới đi kèm version (ETag) cũ. Cache chỉ xóa sau khi commit.
+        """
+        room_ids = tuple(dict.fromkeys(room_ids))
+        try:
+            db.flush()
+            seat_map_service.bump(db, room_ids)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self.handle_exception(e)
+        seat_map_service.invalidate(*room_ids)
+        for room_id in room_ids:
+            occupancy_service.invalidate_room(room_id)
+        response_cache.invalidate(*(f"room:{room_id}" for room_id in room_ids))
+
+    # -------------------- CREATE / UPDATE OVERRIDE --------------------
+    # Không gọi BaseRepository.create / update / delete vì chúng tự commit trước khi bump version
+    def create(self, db: Session, obj_in: SeatCreate) -> Seat:
+        model_columns = {c.name for c in Seat.__table__.columns}
+        seat = Seat(**{k: v for k, v in obj_in.model_dump().items() if k in model_columns})
+        db.add(seat)
+        self._commit_seat_change(db, seat.room_id)
+        db.refresh(seat)
+        return seat
+
+    def update(self, db: Session, id: int, obj_in: SeatBase) -> Optional[Seat]:
+        seat = self.repository.get_by_id(db, id)
+        if not seat:
+            raise HTTPException(status_code=404, detail="Item not found")
+        old_room_id = seat.room_id
+        for field, value in obj_in.model_dump(exclude_unset=True).items():
+            setattr(seat, field, value)
+        self._commit_seat_change(db, old_room_id, seat.room_id)
+        db.refresh(seat)
+        return seat
+
     # -------------------- DELETE OVERRIDE --------------------
     def delete_seat(self, db: Session, seat_id: int):
         """
         Xóa ghế theo ID (override để thêm log + xử lý lỗi rõ ràng hơn).
         """
-        deleted = self.repository.delete(db, seat_id)
-        if not deleted:
+        seat = self.repository.get_by_id(db, seat_id)
+        if not seat:
             logger.warning(f"[SeatService] Cannot delete — Seat id={seat_id} not found")
             raise HTTPException(status_code=404, detail="Seat not found")
+        db.delete(seat)
+        self._commit_seat_change(db, seat.room_id)
         logger.info(f"[SeatService] Seat id={seat_id} deleted successfully")
         return {"message": "Seat deleted successfully"}
 
@@ -0,0 +1,259 @@
+import asyncio
+import json
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional, Set
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config.database import SessionLocal
+from app.config.logger import logger
+from app.config.settings import settings
+from app.services.occupancy_service import occupancy_service
+
+# Marker trong queue: client bị tụt lại, cần gửi lại snapshot thay cho các delta đã bỏ
+RESYNC = object()
+
+
+def format_event(name: str, data: dict) -> str:
+    """1 event Server-Sent Events."""
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class SeatSubscription:
+    """
+    Hàng đợi bounded của 1 client stream, gắn với event loop của request đó.
+
+    Queue đầy -> bỏ toàn bộ delta đang chờ và chỉ giữ 1 marker RESYNC (client nhận lại
+    snapshot), nên client chậm không làm phình bộ nhớ mà cũng không bị lệch trạng thái.
+    """
+
+    __slots__ = ("showtime_id", "loop", "queue", "lagging")
+
+    def __init__(self, showtime_id: int, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.showtime_id = showtime_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.lagging = False
+
+    def put(self, event) -> bool:
+        """Chạy trên loop của subscription. Trả về False nếu event bị bỏ vì queue đầy."""
+        if self.lagging:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.lagging = True
+            return False
+
+    async def get(self, timeout: float):
+        """Event tiếp theo, None nếu hết `timeout` giây mà không có gì."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is RESYNC:
+            self.lagging = False
+        return event
+
+
+class RedisSeatEventBus:
+    """
+    Chuyển delta qua Redis pub/sub (1 channel chung) để client nối vào worker / node khác
+    cũng nhận được. Mỗi process chỉ giao event cho subscriber của chính nó.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, deliver: Callable[[dict], None], password: Optional[str] = None,
+                 channel: str = "movie_booking:seats"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SEAT_STREAM_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        self.client = redis.Redis.from_url(url, password=password)
+        self.channel = channel
+        self._deliver = deliver
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def publish(self, event: dict) -> bool:
+        """False nếu Redis lỗi (caller giao trực tiếp cho subscriber trong process)."""
+        try:
+            self.client.publish(self.channel, json.dumps(event))
+            return True
+        except Exception as e:
+            logger.warning(f"[SeatStream] Redis publish failed, delivering locally only: {e}")
+            return False
+
+    def start(self) -> None:
+        """Listener chạy nền, khởi động ở lần subscribe đầu tiên."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._listen, name="seat-stream-redis", daemon=True)
+            self._thread.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._deliver(json.loads(message["data"]))
+            except Exception as e:
+                logger.warning(f"[SeatStream] Redis subscription failed, retrying: {e}")
+                time.sleep(1.0)
+
+
+class SeatStreamService:
+    """
+    Đẩy trạng thái ghế của suất chiếu tới client (SSE) thay cho việc poll.
+
+    Client nhận snapshot (bitmap của SeatOccupancyService) rồi các delta nhỏ
+    {"booked": [...], "released": [...]} (seat id) do BookingService / SeatHoldService
+    publish sau khi commit. Delta idempotent (đặt / xóa bit) nên nhận trùng không sao.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = settings.SEAT_STREAM_QUEUE_SIZE,
+        keepalive_seconds: float = settings.SEAT_STREAM_KEEPALIVE_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.max_queue = max_queue
+        self.keepalive_seconds = keepalive_seconds
+        self.session_factory = session_factory
+        self.bus: Optional[RedisSeatEventBus] = None
+        self._subscribers: Dict[int, Set[SeatSubscription]] = {}
+        self._lock = threading.Lock()
+        self._published = 0
+        self._dropped = 0
+
+    # -------------------- PUB/SUB --------------------
+    def subscribe(self, showtime_id: int) -> SeatSubscription:
+        """Gọi trên event loop của request."""
+        subscription = SeatSubscription(showtime_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(showtime_id, set()).add(subscription)
+        if self.bus is not None:
+            self.bus.start()
+        return subscription
+
+    def unsubscribe(self, subscription: SeatSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.showtime_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.showtime_id]
+
+    def publish(self, showtime_id: int, booked: Iterable[int] = (), released: Iterable[int] = ()) -> None:
+        """Gửi delta cho mọi client của suất chiếu. Gọi được từ bất kỳ thread nào, sau khi commit."""
+        booked, released = sorted(set(booked)), sorted(set(released))
+        if not booked and not released:
+            return
+        event = {"showtime_id": showtime_id, "booked": booked, "released": released}
+        if self.bus is not None and self.bus.publish(event):
+            return
+        self.deliver(event)
+
+    def deliver(self, event: dict) -> None:
+        """
+        Giao delta cho subscriber của process này. Delta có thể đến từ worker khác (Redis) nên
+        áp vào bitmap occupancy trước, để snapshot / RESYNC sau đó không đảo ngược delta client
+        đã nhận. Đặt / xóa bit là idempotent nên delta của chính process này áp lại cũng không sao.
+        """
+        showtime_id = event["showtime_id"]
+        for seat_id in event["booked"]:
+            occupancy_service.mark_booked(showtime_id, seat_id)
+        for seat_id in event["released"]:
+            occupancy_service.mark_released(showtime_id, seat_id)
+        with self._lock:
+            subscribers = tuple(self._subscribers.get(event["showtime_id"], ()))
+            self._published += 1
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._put, subscription, event)
+            except RuntimeError:
+                # Event loop của client đã đóng
+                self.unsubscribe(subscription)
+
+    def _put(self, subscription: SeatSubscription, event: dict) -> None:
+        if not subscription.put(event):
+            with self._lock:
+                self._dropped += 1
+
+    # -------------------- STREAM --------------------
+    def snapshot(self, showtime_id: int) -> Optional[dict]:
+        """Bitmap hiện tại của suất chiếu (None nếu không tồn tại); session mở rồi đóng ngay."""
+        with self.session_factory() as db:
+            return occupancy_service.snapshot(db, showtime_id)
+
+    async def open(self, showtime_id: int) -> Optional[AsyncIterator[str]]:
+        """
+        Mở stream SSE của suất chiếu, None nếu suất chiếu không tồn tại.
+        Subscribe trước khi chụp snapshot để không lỡ delta nào xảy ra ở giữa.
+        """
+        subscription = self.subscribe(showtime_id)
+        try:
+            snapshot = await run_in_threadpool(self.snapshot, showtime_id)
+        except Exception:
+            self.unsubscribe(subscription)
+            raise
+        if snapshot is None:
+            self.unsubscribe(subscription)
+            return None
+        return self._events(subscription, snapshot)
+
+    async def _events(self, subscription: SeatSubscription, snapshot: dict) -> AsyncIterator[str]:
+        try:
+            yield format_event("snapshot", snapshot)
+            while True:
+                event = await subscription.get(self.keepalive_seconds)
+                if event is None:
+                    # Comment SSE giữ kết nối qua proxy / load balancer
+                    yield ": keepalive\n\n"
+                elif event is RESYNC:
+                    snapshot = await run_in_threadpool(self.snapshot, subscription.showtime_id)
+                    if snapshot is None:
+                        return
+                    yield format_event("snapshot", snapshot)
+                else:
+                    yield format_event("delta", event)
+        finally:
+            self.unsubscribe(subscription)
+
+    # -------------------- STATS --------------------
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "showtimes": len(self._subscribers),
+                "published": self._published,
+                "dropped": self._dropped,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._subscribers.clear()
+            self._published = self._dropped = 0
+
+
+def build_seat_stream_service() -> SeatStreamService:
+    service = SeatStreamService()
+    backend_name = settings.SEAT_STREAM_BACKEND.lower()
+    if backend_name == "redis" and settings.REDIS_URL:
+        service.bus = RedisSeatEventBus(settings.REDIS_URL, service.deliver, password=settings.REDIS_PASSWORD)
+    elif backend_name == "redis":
+        logger.warning("SEAT_STREAM_BACKEND=redis but REDIS_URL is not set. Seat updates reach only this process.")
+    return service
+
+
+seat_stream_service = build_seat_stream_service()
@@ -1,14 +1,66 @@
+from bisect import bisect_left
+from collections import defaultdict
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timezone
 from fastapi import HTTPException, status
 from app.services.base_service import BaseService
+from app.models.movie import Movie
+from app.models.room import Room
 from app.models.showtime import Showtime
 from app.repositories.showtime_repo import ShowtimeRepository
-from app.schemas.showtime_schema import ShowtimeCreate, ShowtimeBase
+from app.schemas.showtime_schema import ShowtimeCreate, ShowtimeBase, ShowtimeImportConflict, ShowtimeImportResult
+from app.services.occupancy_service import occupancy_service
+from app.schemas.base_schema import decode_cursor
+from app.cache import response_cache
 from app.config.logger import logger
 
 
+def _to_naive_utc(dt: datetime) -> datetime:
+    """Chuẩn hóa về naive UTC-like lưu trong DB: có tz thì chuyển sang UTC và bỏ tz, không có tz thì giữ nguyên."""
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def find_schedule_conflicts(existing: List[Tuple[int, datetime, datetime]],
+                            proposals: List[Tuple[int, datetime, datetime]]) -> Dict[int, Tuple[str, int]]:
+    """
+    Tìm các suất chiếu đề xuất bị trùng giờ trong CÙNG 1 phòng, không query DB.
+
+    existing / proposals: (id hoặc index, start, end). Trả về {index: ("showtime", id) | ("row", index)}.
+    - So với suất chiếu đã có: sắp xếp theo start + max(end) cộng dồn, mỗi đề xuất
+      chỉ cần 1 lần bisect (các suất bắt đầu trước end của đề xuất, có end lớn nhất > start?).
+    - Giữa các đề xuất: sweep theo start, các suất đã nhận không chồng nhau nên chỉ cần
+      so với suất nhận gần nhất; suất đến sau bị từ chối.
+    """
+    existing = sorted(existing, key=lambda item: item[1])
+    starts = [start for _, start, _ in existing]
+    prefix_max: List[Tuple[datetime, int]] = []
+    for showtime_id, _, end in existing:
+        if not prefix_max or end > prefix_max[-1][0]:
+            prefix_max.append((end, showtime_id))
+        else:
+            prefix_max.append(prefix_max[-1])
+
+    conflicts: Dict[int, Tuple[str, int]] = {}
+    candidates = []
+    for index, start, end in proposals:
+        k = bisect_left(starts, end)
+        if k and prefix_max[k - 1][0] > start:
+            conflicts[index] = ("showtime", prefix_max[k - 1][1])
+        else:
+            candidates.append((start, end, index))
+
+    last: Optional[Tuple[datetime, datetime, int]] = None
+    for start, end, index in sorted(candidates):
+        if last is not None and last[1] > start:
+            conflicts[index] = ("row", last[2])
+        else:
+            last = (start, end, index)
+    return conflicts
+
+
 class ShowtimeService(BaseService[Showtime, ShowtimeCreate, ShowtimeBase]):
     def __init__(self, showtime_repo: Optional[ShowtimeRepository] = None):
         super().__init__(showtime_repo or ShowtimeRepository(), service_name="ShowtimeService")
@@ -20,19 +72,37 @@ class ShowtimeService(BaseService[Showtime, ShowtimeCreate, ShowtimeBase]):
     def get_by_room(self, db: Session, room_id: int, include_past: bool = False) -> List[Showtime]:
         return self.repository.get_by_room(db, room_id, include_past)
 
-    def get_paginated(self, db: Session, page: int = 1, size: int = 10, include_past: bool = False) -> Tuple[List[Showtime], int]:
-        total = self.repository.count_all(db, include_past)
-        showtimes = self.repository.get_paginated(db, offset=(page - 1) * size, limit=size, include_past=include_past)
+    # Cursor của showtime mã hóa (start_time, id) của item cuối trang
+    def get_paginated(self, db: Session, page: int = 1, size: int = 10, include_past: bool = False,
+                      cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[Showtime], Optional[int]]:
+        total = self.repository.count_all(db, include_past) if with_total else None
+        after = decode_cursor(cursor, 2) if cursor else None
+        showtimes = self.repository.get_paginated(db, offset=(page - 1) * size, limit=size, include_past=include_past, after=after)
+        return showtimes, total
+
+    def get_paginated_by_movie(self, db: Session, movie_id: int, page: int = 1, size: int = 10, include_past: bool = False,
+                               cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[Showtime], Optional[int]]:
+        total = self.repository.count_by_movie(db, movie_id, include_past) if with_total else None
+        after = decode_cursor(cursor, 2) if cursor else None
+        showtimes = self.repository.get_paginated_by_movie(db, movie_id, offset=(page - 1) * size, limit=size, include_past=include_past, after=after)
+        return showtimes, total
+
+    def get_paginated_by_room(self, db: Session, room_id: int, page: int = 1, size: int = 10, include_past: bool = False,
+                              cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[Showtime], Optional[int]]:
+        total = self.repository.count_by_room(db, room_id, include_past) if with_total else None
+        after = decode_cursor(cursor, 2) if cursor else None
+        showtimes = self.repository.get_paginated_by_room(db, room_id, offset=(page - 1) * size, limit=size, include_past=include_past, after=after)
         return showtimes, total
 
-    def get_paginated_by_movie(self, db: Session, movie_id: int, page: int = 1, size: int = 10, include_past: bool = False) -> Tuple[List[Showtime], int]:
-        total = self.repository.count_by_movie(db, movie_id, include_past)
-        showtimes = self.repository.get_paginated_by_movie(db, movie_id, offset=(page - 1) * size, limit=size, include_past=include_past)
+    # -------------------- ASYNC READ --------------------
+    async def aget_paginated(self, db: AsyncSession, page: int = 1, size: int = 10, include_past: bool = False) -> Tuple[List[Showtime], int]:
+        total = await self.repository.acount_all(db, include_past)
+        showtimes = await self.repository.aget_paginated(db, offset=(page - 1) * size, limit=size, include_past=include_past)
         return showtimes, total
 
-    def get_paginated_by_room(self, db: Session, room_id: int, page: int = 1, size: int = 10, include_past: bool = False) -> Tuple[List[Showtime], int]:
-        total = self.repository.count_by_room(db, room_id, include_past)
-        showtimes = self.repository.get_paginated_by_room(db, room_id, offset=(page - 1) * size, limit=size, include_past=include_past)
+    async def aget_paginated_by_movie(self, db: AsyncSession, movie_id: int, page: int = 1, size: int = 10, include_past: bool = False) -> Tuple[List[Showtime], int]:
+        total = await self.repository.acount_by_movie(db, movie_id, include_past)
+        showtimes = await self.repository.aget_paginated_by_movie(db, movie_id, offset=(page - 1) * size, limit=size, include_past=include_past)
         return showtimes, total
 
     # -------------------- AUTO UPDATE STATUS --------------------
@@ -53,20 +123,15 @@ class ShowtimeService(BaseService[Showtime, ShowtimeCreate, ShowtimeBase]):
             count += 1
         if count > 0:
             db.commit()
+            response_cache.invalidate("showtimes")
             logger.info(f"Updated {count} expired showtimes to 'completed' status")
         return count
 
     # -------------------- VALIDATION --------------------
     def validate_conflict(self, db: Session, room_id: int, start_time, end_time):
         """Kiểm tra xem có trùng giờ chiếu trong cùng phòng không (so sánh trực tiếp theo DB)."""
-        # Chuẩn hóa về naive UTC-like lưu trong DB: nếu có tz thì chuyển sang UTC và bỏ tz; nếu không có tz thì giữ nguyên
-        def to_naive_utc(dt):
-            if dt.tzinfo is None:
-                return dt
-            return dt.astimezone(timezone.utc).replace(tzinfo=None)
-
-        s_start = to_naive_utc(start_time)
-        s_end = to_naive_utc(end_time)
+        s_start = _to_naive_utc(start_time)
+        s_end = _to_naive_utc(end_time)
 
         conflict = (
             db.query(Showtime)
@@ -89,11 +154,13 @@ class ShowtimeService(BaseService[Showtime, ShowtimeCreate, ShowtimeBase]):
     # -------------------- CREATE OVERRIDE --------------------
     def create(self, db: Session, obj_in: ShowtimeCreate) -> Showtime:
         # Normalize to naive for conflict check and storage
-        start_naive_utc = (obj_in.start_time.astimezone(timezone.utc) if obj_in.start_time.tzinfo else obj_in.start_time).replace(tzinfo=None)
-        end_naive_utc = (obj_in.end_time.astimezone(timezone.utc) if obj_in.end_time.tzinfo else obj_in.end_time).replace(tzinfo=None)
+        start_naive_utc = _to_naive_utc(obj_in.start_time)
+        end_naive_utc = _to_naive_utc(obj_in.end_time)
         self.validate_conflict(db, obj_in.room_id, start_naive_utc, end_naive_utc)
         obj_in = obj_in.model_copy(update={"start_time": start_naive_utc, "end_time": end_naive_utc})
-        return super().create(db, obj_in)
+        showtime = super().create(db, obj_in)
+        response_cache.invalidate("showtimes")
+        return showtime
 
     # -------------------- UPDATE OVERRIDE --------------------
     def update(self, db: Session, obj_id: int, obj_in: ShowtimeBase) -> Showtime:
@@ -105,8 +172,8 @@ class ShowtimeService(BaseService[Showtime, ShowtimeCreate, ShowtimeBase]):
         new_start = obj_in.start_time if hasattr(obj_in, 'start_time') and obj_in.start_time is not None else db_obj.start_time
         new_end = obj_in.end_time if hasattr(obj_in, 'end_time') and obj_in.end_time is not None else db_obj.end_time
         # Normalize to naive and validate conflict excluding itself
-        start_naive = (new_start.astimezone(timezone.utc) if getattr(new_start, 'tzinfo', None) else new_start).replace(tzinfo=None)
-        end_naive = (new_end.astimezone(timezone.utc) if getattr(new_end, 'tzinfo', None) else new_end).replace(tzinfo=None)
+        start_naive = _to_naive_utc(new_start)
+        end_naive = _to_naive_utc(new_end)
         conflict = (
             db.query(Showtime)
             .filter(
@@ -129,8 +196,84 @@ class ShowtimeService(BaseService[Showtime, ShowtimeCreate, ShowtimeBase]):
             setattr(db_obj, k, v)
         db.commit()
         db.refresh(db_obj)
+        occupancy_service.invalidate_showtime(obj_id)
+        response_cache.invalidate("showtimes")
         return db_obj
 
+    # -------------------- DELETE OVERRIDE --------------------
+    def delete(self, db: Session, id: int) -> Optional[Showtime]:
+        deleted = super().delete(db, id)
+        occupancy_service.invalidate_showtime(id)
+        response_cache.invalidate("showtimes")
+        return deleted
+
+    # -------------------- BULK IMPORT --------------------
+    def import_schedule(self, db: Session, showtimes: List[ShowtimeCreate], all_or_nothing: bool = False) -> ShowtimeImportResult:
+        """
+        Tạo hàng loạt suất chiếu: 1 query lấy các suất chiếu đã có trong khoảng thời gian của
+        các phòng liên quan, kiểm tra trùng giờ trong bộ nhớ (find_schedule_conflicts), rồi
+        INSERT tất cả dòng hợp lệ trong 1 transaction. Dòng lỗi được trả về kèm lý do.
+        """
+        rows = [
+            (index, item, _to_naive_utc(item.start_time), _to_naive_utc(item.end_time))
+            for index, item in enumerate(showtimes)
+        ]
+        room_ids = {item.room_id for _, item, _, _ in rows}
+        movie_ids = {item.movie_id for _, item, _, _ in rows}
+        known_rooms = set(db.scalars(select(Room.id).where(Room.id.in_(room_ids))))
+        known_movies = set(db.scalars(select(Movie.id).where(Movie.id.in_(movie_ids))))
+
+        conflicts: List[ShowtimeImportConflict] = []
+        by_room: Dict[int, List[Tuple[int, datetime, datetime]]] = defaultdict(list)
+        for index, item, start, end in rows:
+            if item.room_id not in known_rooms:
+                conflicts.append(ShowtimeImportConflict(index=index, room_id=item.room_id, reason="Room not found"))
+            elif item.movie_id not in known_movies:
+                conflicts.append(ShowtimeImportConflict(index=index, room_id=item.room_id, reason="Movie not found"))
+            else:
+                by_room[item.room_id].append((index, start, end))
+
+        existing: Dict[int, List[Tuple[int, datetime, datetime]]] = defaultdict(list)
+        if by_room:
+            window_start = min(start for _, _, start, _ in rows)
+            window_end = max(end for _, _, _, end in rows)
+            stmt = select(Showtime.room_id, Showtime.id, Showtime.start_time, Showtime.end_time).where(
+                Showtime.room_id.in_(list(by_room)),
+                Showtime.start_time < window_end,
+                Showtime.end_time > window_start,
+            )
+            for room_id, showtime_id, start, end in db.execute(stmt):
+                existing[room_id].append((showtime_id, start, end))
+
+        rejected = {conflict.index for conflict in conflicts}
+        for room_id, proposals in by_room.items():
+            for index, (kind, other) in find_schedule_conflicts(existing[room_id], proposals).items():
+                rejected.add(index)
+                conflicts.append(ShowtimeImportConflict(
+                    index=index,
+                    room_id=room_id,
+                    reason="Overlaps an existing showtime" if kind == "showtime" else "Overlaps another row in this import",
+                    conflicting_showtime_id=other if kind == "showtime" else None,
+                    conflicting_index=other if kind == "row" else None,
+                ))
+        conflicts.sort(key=lambda conflict: conflict.index)
+
+        accepted = [] if (all_or_nothing and conflicts) else [
+            {**item.model_dump(exclude={"created_at", "updated_at"}), "start_time": start, "end_time": end}
+            for index, item, start, end in rows if index not in rejected
+        ]
+        created_ids: List[int] = []
+        if accepted:
+            created_ids = list(db.scalars(insert(Showtime).returning(Showtime.id, sort_by_parameter_order=True), accepted))
+            db.commit()
+            response_cache.invalidate("showtimes")
+        logger.info("Imported %d showtimes (%d conflicts)", len(created_ids), len(conflicts))
+        return ShowtimeImportResult(created=len(created_ids), created_ids=created_ids, conflicts=conflicts)
+
     # -------------------- BULK DELETE --------------------
     def delete_many(self, db: Session, ids: List[int]) -> int:
-        return self.repository.delete_many(db, ids)
\ No newline at end of file
+        deleted = self.repository.delete_many(db, ids)
+        for showtime_id in ids:
+            occupancy_service.invalidate_showtime(showtime_id)
+        response_cache.invalidate("showtimes")
+        return deleted
\ No newline at end of file
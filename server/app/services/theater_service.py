@@ -1,9 +1,28 @@
 from typing import Optional
+from sqlalchemy.orm import Session
 from app.services.base_service import BaseService
 from app.repositories.theater_repo import TheaterRepository
 from app.models.theater import Theater
 from app.schemas.theater_schema import TheaterCreate, TheaterBase
+from app.cache import response_cache
 
 class TheaterService(BaseService[Theater, TheaterCreate, TheaterBase]):
     def __init__(self, repository: Optional[TheaterRepository] = None):
         super().__init__(repository or TheaterRepository(), service_name="TheaterService")
+
+    # -------------------- CACHE INVALIDATION --------------------
+    def create(self, db: Session, obj_in: TheaterCreate) -> Theater:
+        theater = super().create(db, obj_in)
+        response_cache.invalidate("theaters")
+        return theater
+
+    def update(self, db: Session, id: int, obj_in: TheaterBase) -> Optional[Theater]:
+        theater = super().update(db, id, obj_in)
+        response_cache.invalidate("theaters")
+        return theater
+
+    def delete(self, db: Session, id: int) -> Optional[Theater]:
+        theater = super().delete(db, id)
+        # Phòng, ghế và suất chiếu của rạp bị xóa theo cascade
+        response_cache.invalidate("theaters", "seats", "showtimes")
+        return theater
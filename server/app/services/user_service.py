@@ -8,16 +8,21 @@ from app.services.base_service import BaseService
 from app.repositories.user_repo import UserRepository
 from app.schemas.user_schema import UserCreate, UserRead, UserUpdate
 from app.config.logger import logger
+from app.services.occupancy_service import occupancy_service
 from app.auth.jwt_auth import get_password_hash
+from app.auth.token_cache import token_cache
+from app.schemas.base_schema import decode_cursor
 
 class UserService(BaseService[User, UserCreate, UserUpdate]):
     def __init__(self, repo: Optional[UserRepository] = None):
         super().__init__(repository=repo or UserRepository(), service_name="UserService")
 
-    def get_all_paginated(self, db: Session, skip: int, limit: int) -> tuple[List[User], int]:
-        """Lấy danh sách user có phân trang"""
+    def get_all_paginated(self, db: Session, skip: int, limit: int,
+                          cursor: Optional[str] = None, with_total: bool = True) -> tuple[List[User], Optional[int]]:
+        """Lấy danh sách user có phân trang (cursor -> keyset theo id)"""
         logger.info(f"[UserService] Get all paginated (skip={skip}, limit={limit})")
-        return self.repository.get_all_paginated(db, skip, limit)
+        after = decode_cursor(cursor, 1) if cursor else None
+        return self.repository.get_all_paginated(db, skip, limit, after=after, with_total=with_total)
 
     def get_by_email(self, db: Session, email: str) -> Optional[User]: 
         """Lấy user theo email"""
@@ -93,10 +98,17 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         user.updated_at = datetime.now(timezone.utc)
         db.commit()
         db.refresh(user)
+        # Role / trạng thái / mật khẩu có thể đã đổi -> token đã cache phải xác thực lại
+        token_cache.invalidate_user(user_id)
         return user
 
 
     def delete(self, db: Session, user_id: int) -> Optional[User]:
         """Xóa user theo ID"""
         logger.info(f"[UserService] Delete user_id={user_id}")
-        return self.repository.delete(db, user_id)
\ No newline at end of file
+        deleted = self.repository.delete(db, user_id)
+        token_cache.invalidate_user(user_id)
+        if deleted:
+            # Booking của user bị xóa theo -> bitmap ghế của các suất chiếu liên quan không còn đúng
+            occupancy_service.clear()
+        return deleted
\ No newline at end of file
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark route đọc sync (threadpool) và async (AsyncSession) trên cùng dữ liệu
+Chạy: python scripts/benchmark/async_vs_sync.py (từ thư mục server/)
+
+Mặc định chạy in-process qua httpx.ASGITransport với 1 file SQLite tạm:
+route sync đi qua threadpool của anyio (mặc định 40 worker), route async chạy
+thẳng trên event loop. Dùng --base-url để đo 1 server thật (uvicorn chạy với
+ASYNC_DB_ENABLED=true).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+# Thêm path để import app (từ scripts/benchmark/ lên server/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, server_dir)
+
+# (sync path, async path) - cùng query, cùng response schema
+ROUTE_PAIRS = {
+    "movies": ("/movies/?page=1&size=20", "/async/movies/?page=1&size=20"),
+    "movie": ("/movies/{movie_id}", "/async/movies/{movie_id}"),
+    "showtimes_by_movie": ("/showtimes/movie/{movie_id}?page=1&size=20", "/async/showtimes/movie/{movie_id}?page=1&size=20"),
+}
+
+
+def build_local_app(db_path: str, movies: int, showtimes_per_movie: int):
+    """Tạo app với async engine bật, trỏ vào file SQLite tạm đã seed sẵn."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ASYNC_DB_ENABLED"] = "true"
+    os.environ.setdefault("ENVIRONMENT", "development")
+
+    from datetime import datetime, timedelta
+    from app.config.database import SessionLocal, engine
+    from app.models import Base, Movie, Room, Showtime, Theater
+    from app.main import app
+
+    logging.getLogger("movie_booking").setLevel(logging.WARNING)
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        room = Room(name="Bench Room", room_type="2D", total_seats=100,
+                    theater=Theater(name="Bench Theater", city="HCM", address="1 Bench Street"))
+        db.add(room)
+        db.add_all(Movie(title=f"Bench Movie {i}", genre="Drama", duration=120) for i in range(movies))
+        db.commit()
+        start = datetime.utcnow() + timedelta(days=1)
+        movie_ids = [m.id for m in db.query(Movie.id)]
+        for movie_id in movie_ids:
+            for n in range(showtimes_per_movie):
+                begin = start + timedelta(hours=3 * (movie_id * showtimes_per_movie + n))
+                db.add(Showtime(movie_id=movie_id, room_id=room.id, start_time=begin,
+                                end_time=begin + timedelta(hours=2), base_price=90000.0))
+        db.commit()
+    return app, movie_ids[0]
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int, requests: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(args) -> None:
+    tmp_dir: Optional[tempfile.TemporaryDirectory] = None
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+        movie_id = args.movie_id
+    else:
+        if args.threadpool_size:
+            import anyio.to_thread
+            anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool_size
+        tmp_dir = tempfile.TemporaryDirectory()
+        app, movie_id = build_local_app(os.path.join(tmp_dir.name, "bench.db"), args.movies, args.showtimes)
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=60) as client:
+        print(f"{'route':<20}{'mode':<7}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        for name in args.routes:
+            sync_path, async_path = (p.format(movie_id=movie_id) for p in ROUTE_PAIRS[name])
+            for concurrency in args.concurrency:
+                for mode, path in (("sync", sync_path), ("async", async_path)):
+                    await run_level(client, path, concurrency, min(args.requests, 50))  # warm-up
+                    r = await run_level(client, path, concurrency, args.requests)
+                    print(f"{name:<20}{mode:<7}{concurrency:>6}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['errors']:>8}")
+
+    if tmp_dir:
+        from app.config.database import async_engine
+        await async_engine.dispose()
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sync vs async read routes under rising concurrency")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of an in-process app")
+    parser.add_argument("--movie-id", type=int, default=1, help="Movie id used with --base-url")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 40, 100, 200])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per (route, mode, concurrency)")
+    parser.add_argument("--routes", nargs="+", choices=list(ROUTE_PAIRS), default=list(ROUTE_PAIRS))
+    parser.add_argument("--movies", type=int, default=200, help="Movies to seed (in-process mode)")
+    parser.add_argument("--showtimes", type=int, default=5, help="Showtimes per movie to seed (in-process mode)")
+    parser.add_argument("--threadpool-size", type=int, help="Override anyio threadpool size (in-process mode)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Load test các đường nóng của hệ thống đặt vé (asyncio + httpx)
+Chạy: python scripts/benchmark/load_test.py (từ thư mục server/)
+
+Kịch bản (--scenarios):
+- catalog:   duyệt danh sách phim / chi tiết phim / suất chiếu theo phim
+- seat_map:  sơ đồ ghế của phòng + bitmap ghế đã đặt của suất chiếu
+- login:     POST /auth/login (bcrypt)
+- booking:   nhiều user cùng đặt nhóm 2-4 ghế của 1 suất chiếu đến khi hết ghế
+             (201 = thành công, 409 = trùng ghế -> tính là conflict, không phải lỗi)
+
+Mặc định chạy in-process qua httpx.ASGITransport với 1 file SQLite tạm đã seed sẵn;
+--database-url dùng DB có sẵn (vd. dữ liệu từ generator), --base-url đo 1 server thật.
+Kết quả (req/s, p50/p95/p99, tỉ lệ lỗi / conflict) được in ra và lưu JSON;
+--compare <file.json> in chênh lệch so với 1 lần chạy trước (vd. của commit khác).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# Thêm path để import app (từ scripts/benchmark/ lên server/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, server_dir)
+
+# Khớp với user do scripts/seed/generate_dataset.py sinh ra (--database-url trỏ vào bộ dữ liệu đó)
+PASSWORD = "LoadTestPassw0rd!"
+EMAIL_PATTERN = "loadtest{n}@example.com"
+RESULTS_DIR = os.path.join(script_dir, "results")
+
+
+@dataclass
+class Fixture:
+    """Id của dữ liệu dùng trong các kịch bản."""
+    movie_ids: List[int]
+    room_ids: List[int]
+    showtime_ids: List[int]
+    hot_showtime_id: int
+    hot_seat_ids: List[int]
+    users: List[dict] = field(default_factory=list)  # {"id", "email", "token"}
+
+
+# -------------------- SETUP --------------------
+def seed_local_database(database_url: str, users: int, movies: int, rooms: int, seats_per_room: int) -> None:
+    """Seed DB nhỏ cho load test: mọi user dùng chung 1 hash mật khẩu (chỉ tính bcrypt 1 lần)."""
+    from sqlalchemy import insert
+    from app.auth.jwt_auth import get_password_hash
+    from app.config.database import SessionLocal, engine
+    from app.models import Base, Movie, Room, Seat, Showtime, Theater, User
+
+    Base.metadata.create_all(bind=engine)
+    hashed = get_password_hash(PASSWORD)
+    now = datetime.now(timezone.utc)
+    start = now.replace(tzinfo=None, microsecond=0) + timedelta(days=1)
+    with SessionLocal() as db:
+        db.execute(insert(User), [
+            {"email": EMAIL_PATTERN.format(n=n), "username": f"loadtest{n}", "hashed_password": hashed,
+             "role": "customer", "created_at": now, "updated_at": now}
+            for n in range(users)
+        ])
+        theater = Theater(name="Load Test Theater", city="HCM", address="1 Load Street")
+        db.add(theater)
+        db.flush()
+        room_ids = db.scalars(insert(Room).returning(Room.id, sort_by_parameter_order=True), [
+            {"theater_id": theater.id, "name": f"Room {r}", "room_type": "2D", "total_seats": seats_per_room,
+             "created_at": now, "updated_at": now}
+            for r in range(rooms)
+        ]).all()
+        db.execute(insert(Seat), [
+            {"room_id": room_id, "row": chr(65 + i // 20 % 26), "number": i % 20 + 1, "seat_type": "standard",
+             "price_modifier": 1.0, "is_active": True, "created_at": now, "updated_at": now}
+            for room_id in room_ids for i in range(seats_per_room)
+        ])
+        movie_ids = db.scalars(insert(Movie).returning(Movie.id, sort_by_parameter_order=True), [
+            {"title": f"Load Movie {m}", "genre": "Drama", "duration": 120, "created_at": now, "updated_at": now}
+            for m in range(movies)
+        ]).all()
+        db.execute(insert(Showtime), [
+            {"movie_id": movie_id, "room_id": room_ids[(m + s) % len(room_ids)],
+             "start_time": start + timedelta(hours=3 * (m * 2 + s)), "end_time": start + timedelta(hours=3 * (m * 2 + s) + 2),
+             "base_price": 90000.0, "status": "active", "created_at": now, "updated_at": now}
+            for m, movie_id in enumerate(movie_ids) for s in range(2)
+        ])
+        db.commit()
+
+
+def build_local_app(database_url: str):
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("ENVIRONMENT", "development")
+
+    from app.config.settings import settings
+    from app.main import app
+
+    # Không để rate limit chặn giữa chừng load test (mọi request đến từ cùng 1 client)
+    settings.RATE_LIMIT_CALLS = settings.AUTH_RATE_LIMIT_CALLS = 10 ** 9
+    # Conflict khi đặt ghế là kết quả mong đợi của kịch bản booking, không log WARNING cho từng cái
+    logging.getLogger("movie_booking").setLevel(logging.ERROR)
+    return app
+
+
+def local_fixture(users: int) -> Fixture:
+    """Đọc id trực tiếp từ DB và tạo token không qua login (không tốn bcrypt cho mỗi user)."""
+    from sqlalchemy import exists, select
+    from app.auth.jwt_auth import create_access_token
+    from app.config.database import SessionLocal
+    from app.models import Movie, Room, Seat, Showtime, User
+
+    with SessionLocal() as db:
+        movie_ids = db.scalars(select(Movie.id).order_by(Movie.id).limit(500)).all()
+        room_ids = db.scalars(select(Room.id).order_by(Room.id).limit(500)).all()
+        showtime_ids = db.scalars(select(Showtime.id).order_by(Showtime.id).limit(500)).all()
+        # Suất chiếu "nóng": suất active đầu tiên có ghế (EXISTS để không quét hết bảng với dữ liệu lớn)
+        hot_showtime_id, hot_room_id = db.execute(
+            select(Showtime.id, Showtime.room_id)
+            .where(Showtime.status == "active", exists().where(Seat.room_id == Showtime.room_id))
+            .order_by(Showtime.id).limit(1)
+        ).one()
+        hot_seat_ids = db.scalars(select(Seat.id).where(Seat.room_id == hot_room_id).order_by(Seat.id)).all()
+        user_rows = db.execute(
+            select(User.id, User.email).where(User.email.like(EMAIL_PATTERN.format(n="%"))).order_by(User.id).limit(users)
+        ).all()
+    return Fixture(
+        movie_ids=movie_ids, room_ids=room_ids, showtime_ids=showtime_ids,
+        hot_showtime_id=hot_showtime_id, hot_seat_ids=hot_seat_ids,
+        users=[{"id": uid, "email": email, "token": create_access_token(data={"sub": str(uid)})} for uid, email in user_rows],
+    )
+
+
+async def remote_fixture(client: httpx.AsyncClient, users: int) -> Fixture:
+    """Lấy id qua API của server thật; user phải có sẵn (email theo EMAIL_PATTERN, mật khẩu PASSWORD)."""
+    movies = (await client.get("/movies/?page=1&size=100")).json()["data"]
+    showtimes = (await client.get("/showtimes/?page=1&size=100")).json()["data"]
+    hot = showtimes[0]
+    seat_map = (await client.get(f"/seats/room/{hot['room_id']}/map")).json()
+    logged_in = []
+    for n in range(users):
+        response = await client.post("/auth/login", json={"email": EMAIL_PATTERN.format(n=n), "password": PASSWORD})
+        if response.status_code == 200:
+            body = response.json()
+            logged_in.append({"id": body["user"]["id"], "email": body["user"]["email"], "token": body["access_token"]})
+    return Fixture(
+        movie_ids=[m["id"] for m in movies], room_ids=sorted({s["room_id"] for s in showtimes}),
+        showtime_ids=[s["id"] for s in showtimes], hot_showtime_id=hot["id"], hot_seat_ids=seat_map["ids"],
+        users=logged_in,
+    )
+
+
+# -------------------- SCENARIOS --------------------
+# Mỗi kịch bản gửi 1 request và trả về status code
+Scenario = Callable[[httpx.AsyncClient, Fixture, random.Random], Awaitable[int]]
+
+
+async def catalog(client: httpx.AsyncClient, fx: Fixture, rng: random.Random) -> int:
+    choice = rng.random()
+    if choice < 0.4:
+        response = await client.get(f"/movies/?page={rng.randint(1, 5)}&size=20")
+    elif choice < 0.7:
+        response = await client.get(f"/movies/{rng.choice(fx.movie_ids)}")
+    else:
+        response = await client.get(f"/showtimes/movie/{rng.choice(fx.movie_ids)}?page=1&size=20")
+    return response.status_code
+
+
+async def seat_map(client: httpx.AsyncClient, fx: Fixture, rng: random.Random) -> int:
+    if rng.random() < 0.5:
+        response = await client.get(f"/seats/room/{rng.choice(fx.room_ids)}/map")
+    else:
+        response = await client.get(f"/bookings/showtime/{rng.choice(fx.showtime_ids)}/occupancy")
+    return response.status_code
+
+
+async def login(client: httpx.AsyncClient, fx: Fixture, rng: random.Random) -> int:
+    user = rng.choice(fx.users)
+    response = await client.post("/auth/login", json={"email": user["email"], "password": PASSWORD})
+    return response.status_code
+
+
+async def booking(client: httpx.AsyncClient, fx: Fixture, rng: random.Random) -> int:
+    user = rng.choice(fx.users)
+    seats = rng.sample(fx.hot_seat_ids, min(rng.randint(2, 4), len(fx.hot_seat_ids)))
+    payload = [
+        {"showtime_id": fx.hot_showtime_id, "seat_id": seat_id, "price": 90000.0, "user_id": user["id"]}
+        for seat_id in seats
+    ]
+    response = await client.post("/bookings/group", json=payload, headers={"Authorization": f"Bearer {user['token']}"})
+    return response.status_code
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "catalog": catalog,
+    "seat_map": seat_map,
+    "login": login,
+    "booking": booking,
+}
+
+# Status được coi là kết quả hợp lệ (không phải lỗi) của từng kịch bản
+CONFLICT_STATUSES = {"booking": {409}}
+
+
+# -------------------- RUNNER --------------------
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentile kiểu nearest-rank trên list đã sort."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(math.ceil(p * len(sorted_values)) - 1, 0)]
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, fx: Fixture, concurrency: int,
+                       requests: int, seed: int) -> dict:
+    scenario = SCENARIOS[name]
+    conflict_statuses = CONFLICT_STATUSES.get(name, set())
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = requests
+
+    async def worker(worker_id: int):
+        nonlocal remaining
+        rng = random.Random(seed * 1000 + worker_id)
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                status = await scenario(client, fx, rng)
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+    conflicts = sum(statuses[s] for s in conflict_statuses)
+    errors = sum(n for s, n in statuses.items() if (s == 0 or s >= 400) and s not in conflict_statuses)
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "conflict_rate": round(conflicts / total, 4) if total else 0.0,
+        "status_counts": {str(s): n for s, n in sorted(statuses.items())},
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=server_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> None:
+    header = f"{'scenario':<10}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}{'conflicts':>11}"
+    print(header + ("   vs baseline (req/s, p95)" if baseline else ""))
+    for name, r in results.items():
+        line = (f"{name:<10}{r['concurrency']:>6}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+                f"{r['p99_ms']:>10.2f}{r['error_rate']:>9.2%}{r['conflict_rate']:>11.2%}")
+        base = (baseline or {}).get(name)
+        if base and base.get("rps") and base.get("p95_ms"):
+            line += f"   {(r['rps'] / base['rps'] - 1):+.1%}, {(r['p95_ms'] / base['p95_ms'] - 1):+.1%}"
+        print(line)
+
+
+async def main(args) -> None:
+    tmp_dir: Optional[tempfile.TemporaryDirectory] = None
+    password_hasher = None
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        database_url = args.database_url
+        if not database_url:
+            tmp_dir = tempfile.TemporaryDirectory()
+            database_url = f"sqlite:///{os.path.join(tmp_dir.name, 'load_test.db')}"
+        app = build_local_app(database_url)
+        if not args.database_url:
+            seed_local_database(database_url, args.users, args.movies, args.rooms, args.seats)
+        from app.auth.password_hasher import password_hasher as hasher
+        password_hasher = hasher
+        password_hasher.start()
+        transport, base_url = httpx.ASGITransport(app=app), "http://loadtest"
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=120) as client:
+        fx = await remote_fixture(client, args.users) if args.base_url else local_fixture(args.users)
+        if not fx.users and {"login", "booking"} & set(args.scenarios):
+            raise SystemExit(f"No load-test users found (expected emails like {EMAIL_PATTERN.format(n=0)})")
+
+        results: Dict[str, dict] = {}
+        for name in args.scenarios:
+            if name != "booking":  # booking không warm-up để suất chiếu bắt đầu còn trống
+                await run_scenario(client, name, fx, args.concurrency, min(args.requests, 50), args.seed)
+            requests = args.login_requests if name == "login" else args.requests
+            results[name] = await run_scenario(client, name, fx, args.concurrency, requests, args.seed)
+
+    if password_hasher is not None:
+        password_hasher.shutdown()
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "target": args.base_url or "in-process",
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(RESULTS_DIR, f"load_test-{stamp}-{report['meta']['commit'] or 'nogit'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results saved to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load test of catalog, seat map, login and booking paths")
+    parser.add_argument("--base-url", help="Load-test a running server instead of an in-process app")
+    parser.add_argument("--database-url", help="Run in-process against an existing database (no seeding)")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=100, help="Requests for the login scenario (bcrypt bound)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for request mix / seat choice")
+    parser.add_argument("--users", type=int, default=200, help="Users to seed / log in")
+    parser.add_argument("--movies", type=int, default=200, help="Movies to seed (in-process mode)")
+    parser.add_argument("--rooms", type=int, default=20, help="Rooms to seed (in-process mode)")
+    parser.add_argument("--seats", type=int, default=200, help="Seats per room to seed (in-process mode)")
+    parser.add_argument("--output", help="JSON result path (default: scripts/benchmark/results/)")
+    parser.add_argument("--compare", help="Previous JSON result to diff against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark throughput của POST /auth/login theo số worker bcrypt
+Chạy: python scripts/benchmark/login_throughput.py (từ thư mục server/)
+
+Mỗi lần login tốn 1 lần bcrypt verify (~100-250 ms CPU). Với 0 worker, bcrypt
+chạy trong threadpool của chính process API nên throughput gần như không tăng
+theo số core; với process pool, throughput tăng theo số worker tới khi hết core.
+Mặc định chạy in-process qua httpx.ASGITransport với 1 file SQLite tạm.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+# Thêm path để import app (từ scripts/benchmark/ lên server/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, server_dir)
+
+EMAIL = "bench@example.com"
+PASSWORD = "BenchPassw0rd!"
+
+
+def build_local_app(db_path: str):
+    """Tạo app trỏ vào file SQLite tạm có sẵn 1 user để login."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("ENVIRONMENT", "development")
+
+    from app.auth.jwt_auth import get_password_hash
+    from app.config.database import SessionLocal, engine
+    from app.models import Base, User
+    from app.main import app
+
+    logging.getLogger("movie_booking").setLevel(logging.WARNING)
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add(User(email=EMAIL, username="bench", hashed_password=get_password_hash(PASSWORD), role="customer"))
+        db.commit()
+    return app
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, requests: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    rejected = errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, rejected, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code == 503:
+                rejected += 1
+            elif response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": (len(latencies) - rejected - errors) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000,
+        "rejected": rejected,
+        "errors": errors,
+    }
+
+
+async def main(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = build_local_app(os.path.join(tmp_dir, "bench.db"))
+        from app.auth.password_hasher import password_hasher
+
+        transport = httpx.ASGITransport(app=app)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        print(f"cpu cores: {os.cpu_count()}")
+        print(f"{'workers':>8}{'conc':>6}{'login/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'503':>6}{'errors':>8}")
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, timeout=120) as client:
+            for workers in args.workers:
+                password_hasher.configure(workers, max_pending=args.max_pending)
+                password_hasher.start()
+                await run_level(client, args.concurrency, min(args.requests, workers or 1))  # warm-up
+                r = await run_level(client, args.concurrency, args.requests)
+                print(f"{workers:>8}{args.concurrency:>6}{r['rps']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+                      f"{r['rejected']:>6}{r['errors']:>8}")
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    default_workers = sorted({0, 1, *(n for n in (2, 4, 8, 16) if n <= cores), cores})
+    parser = argparse.ArgumentParser(description="Measure login throughput against bcrypt worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers,
+                        help="Bcrypt process-pool sizes to try (0 = hash inline in the request thread)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="Logins per worker count")
+    parser.add_argument("--max-pending", type=int, default=1000,
+                        help="Hash queue limit; lower it to see 503 backpressure instead of queueing")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark chi phí middleware stack cho mỗi request
+Chạy: python scripts/benchmark/middleware_overhead.py (từ thư mục server/)
+
+Gọi thẳng ASGI app (không qua socket / httpx) với 1 route GET trivial, so sánh:
+- none:      không middleware
+- asgi:      stack của setup_middleware (ASGI thuần, chỉ sửa header trong scope/send)
+- basehttp:  cùng stack nhưng mỗi layer bọc thêm 1 BaseHTTPMiddleware pass-through,
+             tức phần overhead (task + memory stream + bọc lại response) mà stack
+             BaseHTTPMiddleware cũ phải trả cho mỗi layer
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+# Thêm path để import app (từ scripts/benchmark/ lên server/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, server_dir)
+
+
+def build_app(mode: str):
+    from fastapi import FastAPI
+    from starlette.middleware.base import BaseHTTPMiddleware
+    from app.config.settings import settings
+    from app.middleware import setup_middleware
+
+    class PassThroughMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            return await call_next(request)
+
+    # Không để rate limit chặn giữa chừng benchmark
+    settings.RATE_LIMIT_CALLS = settings.AUTH_RATE_LIMIT_CALLS = 10 ** 9
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    if mode != "none":
+        setup_middleware(app)
+    if mode == "basehttp":
+        for _ in range(len(app.user_middleware)):
+            app.add_middleware(PassThroughMiddleware)
+    return app
+
+
+async def call(app, scope: dict) -> int:
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(dict(scope), receive, send)
+    return status
+
+
+async def measure(app, requests: int) -> Dict[str, float]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ping", "raw_path": b"/ping", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench"), (b"origin", b"http://localhost:5173")],
+        "client": ("10.0.0.1", 50000), "server": ("bench", 80),
+    }
+    for _ in range(min(requests, 200)):  # warm-up
+        await call(app, scope)
+
+    latencies: List[float] = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        status = await call(app, scope)
+        latencies.append(time.perf_counter() - started)
+        assert status == 200, status
+    latencies.sort()
+    return {
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+async def main(args) -> None:
+    apps = {mode: build_app(mode) for mode in ("none", "asgi", "basehttp")}
+    # LoggingMiddleware vẫn format message; chỉ không ghi ra handler
+    logging.getLogger("movie_booking").setLevel(logging.WARNING)
+    results = {mode: await measure(app, args.requests) for mode, app in apps.items()}
+    baseline = results["none"]["mean_us"]
+    print(f"{'stack':<10}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'overhead us':>13}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['mean_us']:>10.1f}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}{r['mean_us'] - baseline:>13.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-request overhead of the middleware stack")
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
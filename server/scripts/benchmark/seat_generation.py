@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark sinh ghế (rooms/giây) của RoomService
+Chạy: python scripts/benchmark/seat_generation.py (từ thư mục server/)
+
+So sánh trên 1 file SQLite tạm, mỗi phòng đã có sẵn ghế và được sinh lại (overwrite):
+- orm:    cách cũ - load từng Seat rồi db.delete(), db.add() từng ORM object
+- single: RoomService.generate_seats cho từng phòng (1 DELETE + 1 INSERT executemany / phòng)
+- batch:  RoomService.generate_seats_batch cho cả lô (1 DELETE + 1 INSERT cho mọi phòng)
+"""
+
+import argparse
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+
+# Thêm path để import app (từ scripts/benchmark/ lên server/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, server_dir)
+
+
+def build_database(db_path: str, rooms: int, seats: int):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("ENVIRONMENT", "development")
+
+    from app.config.database import SessionLocal, engine
+    from app.models import Base, Room, Theater
+
+    logging.getLogger("movie_booking").setLevel(logging.WARNING)
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        theater = Theater(name="Bench", city="Bench", address="Bench")
+        db.add(theater)
+        db.flush()
+        db.add_all(Room(name=f"Room {i}", room_type="IMAX", total_seats=seats, theater_id=theater.id)
+                   for i in range(rooms))
+        db.commit()
+    return SessionLocal
+
+
+def legacy_generate(db, room, seats_per_row: int = 10) -> int:
+    """Cách cũ: xóa / thêm từng ORM object."""
+    from app.models import Seat
+
+    for seat in db.query(Seat).filter(Seat.room_id == room.id).all():
+        db.delete(seat)
+    db.commit()
+    created = 0
+    for i in range(int(math.ceil(room.total_seats / seats_per_row))):
+        for num in range(1, seats_per_row + 1):
+            if created >= room.total_seats:
+                break
+            db.add(Seat(room_id=room.id, row=chr(65 + i % 26), number=num, seat_type="standard",
+                        price_modifier=1.0, is_active=True))
+            created += 1
+    db.commit()
+    return created
+
+
+def run(mode: str, session_factory, room_ids) -> float:
+    from app.models import Room
+    from app.schemas.room_schema import RoomSeatGeneration
+    from app.services.room_service import RoomService
+
+    service = RoomService()
+    with session_factory() as db:
+        started = time.perf_counter()
+        if mode == "orm":
+            for room_id in room_ids:
+                legacy_generate(db, db.get(Room, room_id))
+        elif mode == "single":
+            for room_id in room_ids:
+                service.generate_seats(db, room_id, overwrite=True)
+        else:
+            service.generate_seats_batch(db, [RoomSeatGeneration(room_id=room_id) for room_id in room_ids],
+                                         overwrite=True)
+        return time.perf_counter() - started
+
+
+def main(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        session_factory = build_database(os.path.join(tmp_dir, "bench.db"), args.rooms, args.seats)
+        from app.models import Room
+
+        with session_factory() as db:
+            room_ids = list(db.scalars(Room.__table__.select().with_only_columns(Room.id)))
+        run("batch", session_factory, room_ids)  # sinh ghế ban đầu để mọi mode đều phải overwrite
+
+        print(f"rooms: {args.rooms}, seats/room: {args.seats}")
+        print(f"{'mode':<8}{'seconds':>10}{'rooms/s':>10}{'seats/s':>12}")
+        for mode in ("orm", "single", "batch"):
+            elapsed = run(mode, session_factory, room_ids)
+            print(f"{mode:<8}{elapsed:>10.3f}{args.rooms / elapsed:>10.1f}{args.rooms * args.seats / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure seat generation throughput (rooms per second)")
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--seats", type=int, default=500, help="Seats per room (500 = large IMAX room)")
+    main(parser.parse_args())
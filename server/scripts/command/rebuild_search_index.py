@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Dựng lại toàn bộ chỉ mục full-text của phim (FTS5 trên SQLite, tsvector trên Postgres)
+Chạy: python scripts/command/rebuild_search_index.py (từ thư mục server/)
+
+Dùng sau khi import phim trực tiếp vào DB (không qua MovieService) hoặc khi
+đồng bộ chỉ mục bị lỗi.
+"""
+
+import os
+import sys
+import time
+
+# Thêm path để import app (từ scripts/command/ lên server/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, server_dir)
+
+from app.config.database import SessionLocal
+from app.models import Movie
+from app.repositories.movie_repo import MovieRepository
+
+
+def rebuild_search_index():
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        MovieRepository().reindex_search(db)
+        db.commit()
+        count = db.query(Movie).count()
+    print(f"✓ Đã dựng lại chỉ mục tìm kiếm cho {count} phim trong {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    rebuild_search_index()
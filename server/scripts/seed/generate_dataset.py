@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Sinh bộ dữ liệu lớn (tổng hợp, tất định) cho performance test
+Chạy: python scripts/seed/generate_dataset.py [--scale 1] (từ thư mục server/)
+
+--scale 1 tương ứng ~1M users, 50k phim, 2k rạp, 20k phòng, 10M ghế, 5M suất chiếu, 50M booking
+(mặc định --scale 0.01). Khác với seed_data.py (vài bản ghi demo qua ORM):
+- Mọi user dùng chung 1 hash bcrypt tính trước (email loadtest{n}@example.com, mật khẩu
+  LOADTEST_PASSWORD, khớp với scripts/benchmark/load_test.py)
+- Id gán tường minh theo thứ tự sinh, mỗi bảng 1 random.Random(f"{seed}:{bảng}") riêng:
+  cùng --seed / --start-date / số lượng -> cùng dữ liệu
+- Sinh dạng stream: mỗi bảng chỉ giữ tối đa --batch-size dòng trong bộ nhớ, ghi bằng
+  Core insert executemany (hoặc COPY trên Postgres với psycopg2 / psycopg 3), commit mỗi batch
+- Khung giờ chiếu cố định 3 tiếng / suất nên không phòng nào bị trùng lịch; nửa lịch chiếu
+  nằm trước --start-date (suất đã chiếu, booking lịch sử), nửa sau là suất sắp chiếu
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Thêm path để import app (từ scripts/seed/ lên server/)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+server_dir = os.path.dirname(os.path.dirname(script_dir))
+sys.path.insert(0, server_dir)
+
+LOADTEST_PASSWORD = "LoadTestPassw0rd!"
+EMAIL_PATTERN = "loadtest{n}@example.com"
+
+# Kích thước ứng với --scale 1
+FULL_SCALE = {
+    "users": 1_000_000,
+    "movies": 50_000,
+    "theaters": 2_000,
+    "rooms": 20_000,
+    "seats": 10_000_000,
+    "showtimes": 5_000_000,
+    "bookings": 50_000_000,
+}
+
+SEATS_PER_ROW = 20
+SLOT_HOURS = (9, 12, 15, 18, 21)  # mỗi suất chiếm 3 tiếng, phim dài tối đa 170 phút
+CITIES = ["Ho Chi Minh City", "Ha Noi", "Da Nang", "Can Tho", "Hai Phong", "Nha Trang", "Hue", "Vung Tau"]
+BRANDS = ["CGV", "Lotte Cinema", "Galaxy Cinema", "BHD Star", "Beta Cinemas", "Cinestar"]
+ROOM_TYPES = ["2D", "2D", "2D", "3D", "IMAX"]
+GENRES = ["Action", "Adventure", "Animation", "Comedy", "Drama", "Fantasy", "Horror", "Romance", "Sci-Fi", "Thriller"]
+LANGUAGES = ["English", "Vietnamese", "Korean", "Japanese", "French"]
+WORDS = ["Silent", "Last", "Broken", "Golden", "Hidden", "Crimson", "Eternal", "Frozen", "Wild", "Lost",
+         "Empire", "Horizon", "Shadow", "River", "Kingdom", "Storm", "Garden", "Signal", "Voyage", "Echo"]
+BASE_PRICES = [75000.0, 90000.0, 110000.0, 150000.0]
+PAYMENT_METHODS = ["momo", "zalopay", "visa", "cash"]
+
+Row = Dict[str, object]
+
+
+@dataclass
+class Plan:
+    """Số lượng mỗi bảng; phòng / ghế / suất chiếu / booking chia đều để id suy ra được từ vị trí."""
+    users: int
+    movies: int
+    theaters: int
+    rooms_per_theater: int
+    seats_per_room: int
+    showtimes_per_room: int
+    bookings_per_showtime: int
+
+    @classmethod
+    def from_targets(cls, targets: Dict[str, int]) -> "Plan":
+        users, movies, theaters = (max(1, targets[key]) for key in ("users", "movies", "theaters"))
+        rooms_per_theater = max(1, targets["rooms"] // theaters)
+        rooms = theaters * rooms_per_theater
+        seats_per_room = max(1, targets["seats"] // rooms)
+        showtimes_per_room = max(1, targets["showtimes"] // rooms)
+        bookings_per_showtime = min(seats_per_room, targets["bookings"] // (rooms * showtimes_per_room))
+        return cls(users, movies, theaters, rooms_per_theater, seats_per_room, showtimes_per_room, bookings_per_showtime)
+
+    @property
+    def rooms(self) -> int:
+        return self.theaters * self.rooms_per_theater
+
+    @property
+    def seats(self) -> int:
+        return self.rooms * self.seats_per_room
+
+    @property
+    def showtimes(self) -> int:
+        return self.rooms * self.showtimes_per_room
+
+    @property
+    def bookings(self) -> int:
+        return self.showtimes * self.bookings_per_showtime
+
+
+def row_label(index: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA, ..."""
+    label = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(65 + remainder) + label
+    return label
+
+
+def seat_layout(index: int, seats_per_room: int) -> Tuple[str, int, str, float]:
+    """(row, number, seat_type, price_modifier) của ghế thứ index trong phòng; 1/3 số hàng cuối là VIP."""
+    row_index, number = divmod(index, SEATS_PER_ROW)
+    rows = -(-seats_per_room // SEATS_PER_ROW)
+    vip = row_index >= rows - rows // 3
+    return row_label(row_index), number + 1, "vip" if vip else "standard", 1.5 if vip else 1.0
+
+
+# -------------------- ROW GENERATORS --------------------
+class DatasetGenerator:
+    def __init__(self, plan: Plan, seed: int, start_date: date, hashed_password: str):
+        self.plan = plan
+        self.seed = seed
+        self.hashed_password = hashed_password
+        self.now = datetime.combine(start_date, dt_time(), tzinfo=timezone.utc)
+        # Lịch chiếu bắt đầu trước start_date nửa số ngày cần để xếp hết suất chiếu của 1 phòng
+        days = -(-plan.showtimes_per_room // len(SLOT_HOURS))
+        self.schedule_start = datetime.combine(start_date - timedelta(days=days // 2), dt_time())
+        durations_rng = self._rng("durations")
+        self.movie_durations = [durations_rng.randint(80, 170) for _ in range(plan.movies)]
+
+    def _rng(self, name: str) -> random.Random:
+        return random.Random(f"{self.seed}:{name}")
+
+    def _timestamps(self) -> Row:
+        return {"created_at": self.now, "updated_at": self.now}
+
+    def users(self) -> Iterator[Row]:
+        for n in range(self.plan.users):
+            yield {
+                "id": n + 1, "email": EMAIL_PATTERN.format(n=n), "username": f"loadtest{n}",
+                "full_name": f"Load Test User {n}", "avatar_url": None, "role": "customer",
+                "is_active": True, "is_verified": True, "hashed_password": self.hashed_password,
+                "last_login": None, **self._timestamps(),
+            }
+
+    def movies(self) -> Iterator[Row]:
+        rng = self._rng("movies")
+        for n, duration in enumerate(self.movie_durations):
+            title = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {n + 1}"
+            yield {
+                "id": n + 1, "title": title, "description": f"Synthetic movie {title} for performance testing",
+                "genre": ", ".join(rng.sample(GENRES, rng.randint(1, 3))), "duration": duration,
+                "language": rng.choice(LANGUAGES), "release_date": self.now.date() - timedelta(days=rng.randint(0, 3650)),
+                "poster_url": None, "trailer_url": None, **self._timestamps(),
+            }
+
+    def theaters(self) -> Iterator[Row]:
+        rng = self._rng("theaters")
+        for n in range(self.plan.theaters):
+            city = rng.choice(CITIES)
+            yield {
+                "id": n + 1, "name": f"{rng.choice(BRANDS)} {city} {n + 1}", "city": city,
+                "address": f"{rng.randint(1, 999)} Street {rng.randint(1, 200)}, {city}", **self._timestamps(),
+            }
+
+    def rooms(self) -> Iterator[Row]:
+        plan = self.plan
+        for n in range(plan.rooms):
+            yield {
+                "id": n + 1, "theater_id": n // plan.rooms_per_theater + 1,
+                "name": f"Room {n % plan.rooms_per_theater + 1}", "room_type": ROOM_TYPES[n % len(ROOM_TYPES)],
+                "total_seats": plan.seats_per_room, "seat_map_version": 0, **self._timestamps(),
+            }
+
+    def seats(self) -> Iterator[Row]:
+        per_room = self.plan.seats_per_room
+        layout = [seat_layout(index, per_room) for index in range(per_room)]
+        for room in range(self.plan.rooms):
+            for index, (row, number, seat_type, modifier) in enumerate(layout):
+                yield {
+                    "id": room * per_room + index + 1, "room_id": room + 1, "row": row, "number": number,
+                    "seat_type": seat_type, "price_modifier": modifier, "is_active": True, **self._timestamps(),
+                }
+
+    def _showtime_slots(self) -> Iterator[Tuple[int, int, int, datetime, datetime, float]]:
+        """(showtime_id, room_id, movie_id, start, end, base_price) theo thứ tự id; dùng chung cho showtimes và bookings."""
+        rng = self._rng("showtimes")
+        per_room = self.plan.showtimes_per_room
+        for room in range(self.plan.rooms):
+            for k in range(per_room):
+                day, slot = divmod(k, len(SLOT_HOURS))
+                movie = rng.randrange(self.plan.movies)
+                start = self.schedule_start + timedelta(days=day, hours=SLOT_HOURS[slot])
+                end = start + timedelta(minutes=self.movie_durations[movie])
+                yield room * per_room + k + 1, room + 1, movie + 1, start, end, rng.choice(BASE_PRICES)
+
+    def showtimes(self) -> Iterator[Row]:
+        current = self.now.replace(tzinfo=None)
+        for showtime_id, room_id, movie_id, start, end, base_price in self._showtime_slots():
+            yield {
+                "id": showtime_id, "movie_id": movie_id, "room_id": room_id, "start_time": start, "end_time": end,
+                "base_price": base_price, "status": "completed" if end <= current else "active", **self._timestamps(),
+            }
+
+    def bookings(self) -> Iterator[Tuple[str, Row]]:
+        """
+        ("payments" | "bookings", row): ghế của mỗi suất chia thành nhóm 1-4 ghế của cùng 1 user;
+        nhóm confirmed có 1 payment (được yield trước các booking trỏ tới nó).
+        """
+        plan = self.plan
+        rng = self._rng("bookings")
+        seat_ids = range(plan.seats_per_room)
+        modifiers = [seat_layout(index, plan.seats_per_room)[3] for index in seat_ids]
+        current = self.now.replace(tzinfo=None)
+        hold_expires = self.now + timedelta(minutes=8)
+        booking_id = payment_id = 0
+        for showtime_id, room_id, _, start, _, base_price in self._showtime_slots():
+            picked = rng.sample(seat_ids, plan.bookings_per_showtime)
+            first_seat = (room_id - 1) * plan.seats_per_room + 1
+            while picked:
+                group_size = min(rng.randint(1, 4), len(picked))
+                group, picked = picked[:group_size], picked[group_size:]
+                user_id = rng.randrange(plan.users) + 1
+                roll = rng.random()
+                if start <= current:
+                    status = "confirmed" if roll < 0.85 else "cancelled"
+                else:
+                    status = "confirmed" if roll < 0.7 else "pending" if roll < 0.8 else "cancelled"
+                prices = [base_price * modifiers[index] for index in group]
+                group_payment = None
+                if status == "confirmed":
+                    payment_id += 1
+                    group_payment = payment_id
+                    yield "payments", {
+                        "id": payment_id, "method": rng.choice(PAYMENT_METHODS), "amount": sum(prices),
+                        "status": "success", "created_by": user_id, **self._timestamps(),
+                    }
+                for index, price in zip(group, prices):
+                    booking_id += 1
+                    yield "bookings", {
+                        "id": booking_id, "payment_id": group_payment, "user_id": user_id, "showtime_id": showtime_id,
+                        "seat_id": first_seat + index, "price": price, "status": status,
+                        "expires_at": hold_expires if status == "pending" else None, **self._timestamps(),
+                    }
+
+
+# -------------------- WRITER --------------------
+class BulkWriter:
+    """
+    Ghi các dòng (bảng, row) theo batch trên 1 connection, commit sau mỗi lần flush.
+    Các bảng flush theo thứ tự khai báo (bảng cha trước) nên FK luôn hợp lệ.
+    """
+
+    def __init__(self, conn, batch_size: int, use_copy: bool = True):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.copy_cursor = self._copy_cursor() if use_copy and conn.dialect.name == "postgresql" else None
+
+    def _copy_cursor(self):
+        cursor = self.conn.connection.dbapi_connection.cursor()
+        # psycopg2: copy_expert, psycopg 3: copy; driver khác (pg8000, ...) -> Core insert
+        return cursor if hasattr(cursor, "copy_expert") or hasattr(cursor, "copy") else None
+
+    def load(self, tables: List, rows: Iterable[Tuple[str, Row]]) -> Dict[str, int]:
+        by_name = {table.name: table for table in tables}
+        buffers: Dict[str, List[Row]] = {table.name: [] for table in tables}
+        counts = dict.fromkeys(buffers, 0)
+        for name, row in rows:
+            buffer = buffers[name]
+            buffer.append(row)
+            if len(buffer) >= self.batch_size:
+                self._flush(by_name, buffers, counts)
+        self._flush(by_name, buffers, counts)
+        return counts
+
+    def _flush(self, by_name: Dict, buffers: Dict[str, List[Row]], counts: Dict[str, int]) -> None:
+        for name, buffer in buffers.items():
+            if buffer:
+                self._write(by_name[name], buffer)
+                counts[name] += len(buffer)
+                buffer.clear()
+        self.conn.commit()
+
+    def _write(self, table, rows: List[Row]) -> None:
+        if self.copy_cursor is None:
+            from sqlalchemy import insert
+            self.conn.execute(insert(table), rows)
+            return
+        columns = list(rows[0])
+        data = io.StringIO()
+        writer = csv.writer(data)
+        for row in rows:
+            # CSV của COPY: ô trống không quote = NULL
+            writer.writerow(["" if row[column] is None else row[column] for column in columns])
+        statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        if hasattr(self.copy_cursor, "copy_expert"):
+            data.seek(0)
+            self.copy_cursor.copy_expert(statement, data)
+        else:
+            with self.copy_cursor.copy(statement) as copy:
+                copy.write(data.getvalue())
+
+    def reset_sequences(self, tables: List) -> None:
+        """Id gán tường minh nên sequence của Postgres phải đẩy lên max(id) để insert sau này không trùng."""
+        if self.conn.dialect.name != "postgresql":
+            return
+        from sqlalchemy import text
+        for table in tables:
+            self.conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), COALESCE(MAX(id), 1)) FROM {table.name}"
+            ))
+        self.conn.commit()
+
+
+# -------------------- MAIN --------------------
+def build_plan(args) -> Plan:
+    targets = {key: round(value * args.scale) for key, value in FULL_SCALE.items()}
+    for key in FULL_SCALE:
+        if getattr(args, key) is not None:
+            targets[key] = getattr(args, key)
+    return Plan.from_targets(targets)
+
+
+def prepare_schema(engine, reset: bool) -> None:
+    from sqlalchemy import func, select
+    from app.models import Base, User
+
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(User)).scalar():
+            raise SystemExit("Database already has users; rerun with --reset to drop and recreate all tables")
+
+
+def generate(args) -> None:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from sqlalchemy.orm import Session
+    from app.auth.jwt_auth import get_password_hash
+    from app.config.database import engine
+    from app.models import Booking, Movie, Payment, Room, Seat, Showtime, Theater, User
+    from app.repositories.movie_repo import MovieRepository
+
+    plan = build_plan(args)
+    print(f"plan: {plan.users:,} users, {plan.movies:,} movies, {plan.theaters:,} theaters, {plan.rooms:,} rooms, "
+          f"{plan.seats:,} seats, {plan.showtimes:,} showtimes, {plan.bookings:,} bookings")
+    prepare_schema(engine, args.reset)
+
+    # bcrypt chỉ chạy 1 lần cho cả bộ dữ liệu
+    generator = DatasetGenerator(plan, args.seed, args.start_date, get_password_hash(LOADTEST_PASSWORD))
+    steps: List[Tuple[List, Callable[[], Iterable[Tuple[str, Row]]]]] = [
+        ([User.__table__], lambda: (("users", row) for row in generator.users())),
+        ([Movie.__table__], lambda: (("movies", row) for row in generator.movies())),
+        ([Theater.__table__], lambda: (("theaters", row) for row in generator.theaters())),
+        ([Room.__table__], lambda: (("rooms", row) for row in generator.rooms())),
+        ([Seat.__table__], lambda: (("seats", row) for row in generator.seats())),
+        ([Showtime.__table__], lambda: (("showtimes", row) for row in generator.showtimes())),
+        ([Payment.__table__, Booking.__table__], generator.bookings),
+    ]
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            # Dữ liệu sinh lại được -> không cần fsync mỗi commit
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        writer = BulkWriter(conn, args.batch_size, use_copy=not args.no_copy)
+        for tables, rows in steps:
+            step_started = time.perf_counter()
+            counts = writer.load(tables, rows())
+            elapsed = time.perf_counter() - step_started
+            for name, count in counts.items():
+                print(f"{name:<10}{count:>14,} rows{elapsed:>9.1f}s{count / elapsed if elapsed else 0:>12,.0f} rows/s")
+        writer.reset_sequences([table for tables, _ in steps for table in tables])
+
+        # Chỉ mục tìm kiếm phim (dữ liệu không đi qua MovieService)
+        with Session(bind=conn) as db:
+            MovieRepository().reindex_search(db)
+            db.commit()
+        conn.commit()
+    print(f"done in {time.perf_counter() - started:.1f}s; users log in as "
+          f"{EMAIL_PATTERN.format(n=0)} .. {EMAIL_PATTERN.format(n=plan.users - 1)} / {LOADTEST_PASSWORD}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a large deterministic dataset for performance tests")
+    parser.add_argument("--scale", type=float, default=0.01,
+                        help="Fraction of the full-size dataset (1 = 1M users / 50M bookings)")
+    for key, value in FULL_SCALE.items():
+        parser.add_argument(f"--{key}", type=int, help=f"Override {key} count (full scale: {value:,})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date.today(),
+                        help="'Today' of the dataset (YYYY-MM-DD); half of the schedule lies before it")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per insert / COPY batch")
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL from settings)")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    parser.add_argument("--no-copy", action="store_true", help="Use Core insert instead of COPY on Postgres")
+    generate(parser.parse_args())
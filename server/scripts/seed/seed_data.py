@@ -17,6 +17,7 @@ sys.path.insert(0, server_dir)
 from app.config.database import get_db, engine
 from app.models import Base, User, Movie, Theater, Room, Seat, Showtime, Booking, Payment
 from app.auth.jwt_auth import get_password_hash
+from app.repositories.movie_repo import MovieRepository
 
 def create_sample_data():
     """Tạo dữ liệu mẫu"""
@@ -39,7 +40,8 @@ def create_sample_data():
         )
         db.add(admin_user)
         
-        # 2. Tạo Customer Users
+        # 2. Tạo Customer Users (cùng mật khẩu -> chỉ hash 1 lần)
+        customer_password_hash = get_password_hash("password123")
         customers = [
             User(
                 email="john@example.com",
@@ -48,7 +50,7 @@ def create_sample_data():
                 role="customer",
                 is_active=True,
                 is_verified=True,
-                hashed_password=get_password_hash("password123")
+                hashed_password=customer_password_hash
             ),
             User(
                 email="jane@example.com", 
@@ -57,7 +59,7 @@ def create_sample_data():
                 role="customer",
                 is_active=True,
                 is_verified=True,
-                hashed_password=get_password_hash("password123")
+                hashed_password=customer_password_hash
             )
         ]
         db.add_all(customers)
@@ -206,6 +208,10 @@ def create_sample_data():
         # Link payment với booking
         sample_bookings[0].payment_id = payment.id
         
+        # Dựng chỉ mục tìm kiếm phim (dữ liệu mẫu không đi qua MovieService)
+        db.flush()
+        MovieRepository().reindex_search(db)
+        
         db.commit()
         print("SUCCESS: Du lieu mau da duoc tao thanh cong!")
         print("\nThong tin dang nhap:")
@@ -1,16 +1,29 @@
 """
 Pytest configuration và fixtures cho testing
 """
+from contextlib import contextmanager
+from typing import Iterator
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.config.database import get_db
+from app.config.database import get_db, get_async_db, to_async_url
+from app.controllers import movie_controller, showtime_controller
 from app.models import Base, User, Movie, Theater, Room, Seat, Showtime, Booking, Payment
 from app.auth.jwt_auth import create_access_token
+from app.services.occupancy_service import occupancy_service
+from app.services.seat_hold_service import seat_hold_service
+from app.services.seat_map_service import seat_map_service
+from app.services.seat_stream_service import seat_stream_service
+from app.cache import response_cache
+from app.auth.token_cache import token_cache
+from app.metrics.query_tracker import query_tracker
 
 
 # Test database URL - sử dụng in-memory SQLite
@@ -23,9 +36,56 @@ test_engine = create_engine(
     poolclass=StaticPool,
 )
 
+# Đếm query theo request như engine thật (dùng cho @pytest.mark.query_budget)
+query_tracker.instrument(test_engine)
+
 # Test session factory
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Scheduler giữ ghế chạy nền / snapshot của seat stream cũng phải dùng test database
+seat_hold_service.session_factory = TestingSessionLocal
+seat_stream_service.session_factory = TestingSessionLocal
+
+
+class CapturedStatements(list):
+    """
+    Các câu SQL đã gửi xuống test_engine theo thứ tự (kèm "COMMIT" ở mỗi lần commit);
+    parameters[i] là tham số của self[i].
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.parameters: list = []
+
+    def of(self, keyword: str) -> list:
+        """Các câu bắt đầu bằng keyword (SELECT / INSERT / UPDATE / DELETE)."""
+        return [statement for statement in self if statement.lstrip().upper().startswith(keyword)]
+
+
+@contextmanager
+def captured_statements() -> Iterator[CapturedStatements]:
+    """
+    Ghi lại mọi câu SQL chạy trên test_engine trong khối with (kể cả trong request của client).
+    query_budget chỉ đếm theo request; dùng cái này khi test cần xem chính các câu SQL.
+    """
+    statements = CapturedStatements()
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+        statements.parameters.append(parameters)
+
+    def commit_listener(conn):
+        statements.append("COMMIT")
+        statements.parameters.append(None)
+
+    event.listen(test_engine, "before_cursor_execute", listener)
+    event.listen(test_engine, "commit", commit_listener)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine, "before_cursor_execute", listener)
+        event.remove(test_engine, "commit", commit_listener)
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -45,6 +105,31 @@ def db_session():
         session.close()
         # Xóa tất cả tables sau mỗi test
         Base.metadata.drop_all(bind=test_engine)
+        # Cache in-process giữ id của test trước -> reset để test độc lập
+        occupancy_service.clear()
+        seat_hold_service.clear()
+        seat_map_service.clear()
+        seat_stream_service.clear()
+        response_cache.clear()
+        token_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request):
+    """
+    Strict mode cho số query: test đánh dấu @pytest.mark.query_budget(n) sẽ fail
+    nếu bất kỳ request nào trong test chạy quá n câu SQL.
+    """
+    marker = request.node.get_closest_marker("query_budget")
+    query_tracker.budget = marker.args[0] if marker else None
+    query_tracker.violations.clear()
+    yield
+    violations = list(query_tracker.violations)
+    query_tracker.budget = None
+    query_tracker.violations.clear()
+    if violations:
+        details = ", ".join(f"{endpoint}: {count} queries" for endpoint, count in violations)
+        pytest.fail(f"Query budget {marker.args[0]} exceeded - {details}")
 
 
 @pytest.fixture(scope="function")
@@ -66,6 +151,37 @@ def client(db_session: Session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="function")
+def async_client(tmp_path):
+    """
+    Client cho các route đọc /async/... (AsyncSession + aiosqlite).
+    aiosqlite không dùng chung được DB in-memory của test_engine nên dùng file SQLite tạm.
+    Trả về (client, session) - session đồng bộ để seed dữ liệu.
+    """
+    url = f"sqlite:///{tmp_path / 'async_test.db'}"
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=sync_engine)
+    async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_app.include_router(movie_controller.async_router)
+    async_app.include_router(showtime_controller.async_router)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    session = sessionmaker(bind=sync_engine)()
+    try:
+        with TestClient(async_app) as test_client:
+            yield test_client, session
+    finally:
+        session.close()
+        sync_engine.dispose()
+
+
 @pytest.fixture
 def test_user(db_session: Session) -> User:
     """Tạo test user"""
@@ -186,3 +302,17 @@ def test_showtime(db_session: Session, test_movie: Movie, test_room: Room) -> Sh
     db_session.refresh(showtime)
     return showtime
 
+
+@pytest.fixture
+def test_seats(db_session: Session, test_room: Room) -> list:
+    """Tạo 10 ghế (A1-A5, B1-B5) cho test room"""
+    seats = [
+        Seat(room_id=test_room.id, row=row, number=number, seat_type="standard", price_modifier=1.0, is_active=True)
+        for row in ("A", "B")
+        for number in range(1, 6)
+    ]
+    db_session.add_all(seats)
+    db_session.commit()
+    for seat in seats:
+        db_session.refresh(seat)
+    return seats
@@ -1,9 +1,16 @@
 """
 Integration tests cho Authentication API endpoints
 """
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.auth.password_hasher import password_hasher
+from app.schemas.user_schema import UserUpdate
+from app.services.user_service import UserService
+from tests.conftest import captured_statements
+
 
 def test_register_user(client: TestClient):
     """Test đăng ký user mới"""
@@ -141,3 +148,49 @@ def test_get_current_user_invalid_token(client: TestClient):
     
     assert response.status_code == 401
 
+
+
+def test_authenticated_request_reuses_cached_user(client: TestClient, auth_headers):
+    """Test token đã xác thực không query lại bảng users"""
+    assert client.get("/payments/me", headers=auth_headers).status_code == 200
+
+    with captured_statements() as statements:
+        response = client.get("/payments/me", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def test_cached_user_invalidated_on_update(client: TestClient, db_session, test_user, auth_headers):
+    """Test đổi role / khóa tài khoản qua UserService có hiệu lực ngay với token đã cache"""
+    assert client.get("/payments/", headers=auth_headers).status_code == 403
+
+    UserService().update(db_session, test_user.id, UserUpdate(role="admin"))
+    assert client.get("/payments/", headers=auth_headers).status_code == 200
+
+    UserService().delete(db_session, test_user.id)
+    assert client.get("/payments/", headers=auth_headers).status_code == 401
+
+
+def test_login_rejected_when_hash_queue_full(client: TestClient, test_user, monkeypatch):
+    """Test hàng đợi bcrypt đầy -> 503 thay vì chờ"""
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post(
+        "/auth/login",
+        json={"email": test_user.email, "password": "testpassword123"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_password_hasher_async_entry_points():
+    """Test ahash / averify chạy qua process pool"""
+    async def run():
+        hashed = await password_hasher.ahash("s3cret-Passw0rd")
+        return hashed, await password_hasher.averify("s3cret-Passw0rd", hashed), await password_hasher.averify("wrong", hashed)
+
+    hashed, ok, wrong = asyncio.run(run())
+    assert hashed.startswith("$2b$")
+    assert ok is True
+    assert wrong is False
@@ -0,0 +1,425 @@
+"""
+Integration tests cho Booking API endpoints
+"""
+import base64
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import captured_statements
+
+
+def _booked_positions(payload: dict) -> set:
+    bits = base64.b64decode(payload["bitmap"])
+    return {i for i in range(payload["seat_count"]) if bits[i // 8] & (1 << (i % 8))}
+
+
+@pytest.mark.api
+def test_showtime_occupancy_bitmap(client: TestClient, auth_headers, test_user, test_showtime, test_seats):
+    """Test bitmap ghế được cập nhật khi tạo và hủy booking"""
+    response = client.get(f"/bookings/showtime/{test_showtime.id}/occupancy")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["seat_count"] == len(test_seats)
+    assert data["booked_count"] == 0
+    assert len(base64.b64decode(data["bitmap"])) == (len(test_seats) + 7) // 8
+
+    seat = test_seats[3]
+    response = client.post(
+        "/bookings",
+        headers=auth_headers,
+        json=[{"showtime_id": test_showtime.id, "seat_id": seat.id, "price": 100000.0, "user_id": test_user.id}],
+    )
+    assert response.status_code == 201
+    booking_id = response.json()[0]["id"]
+
+    data = client.get(f"/bookings/showtime/{test_showtime.id}/occupancy").json()
+    assert data["booked_count"] == 1
+    assert _booked_positions(data) == {3}
+
+    response = client.put(f"/bookings/{booking_id}/cancel", headers=auth_headers)
+    assert response.status_code == 200
+
+    data = client.get(f"/bookings/showtime/{test_showtime.id}/occupancy").json()
+    assert data["booked_count"] == 0
+    assert _booked_positions(data) == set()
+
+
+@pytest.mark.api
+def test_showtime_occupancy_served_from_memory(client: TestClient, test_showtime, test_seats):
+    """Test lần đọc thứ 2 không query database"""
+    assert client.get(f"/bookings/showtime/{test_showtime.id}/occupancy").status_code == 200
+
+    with captured_statements() as statements:
+        response = client.get(f"/bookings/showtime/{test_showtime.id}/occupancy")
+
+    assert response.status_code == 200
+    assert statements == []
+
+
+def test_showtime_occupancy_not_found(client: TestClient):
+    """Test bitmap của suất chiếu không tồn tại"""
+    response = client.get("/bookings/showtime/99999/occupancy")
+
+    assert response.status_code == 404
+
+
+def _booking_payload(user, showtime, seats):
+    return [
+        {"showtime_id": showtime.id, "seat_id": seat.id, "price": 100000.0, "user_id": user.id}
+        for seat in seats
+    ]
+
+
+@pytest.mark.api
+def test_create_group_booking(client: TestClient, auth_headers, test_user, test_showtime, test_seats):
+    """Test đặt nhiều ghế trong 1 transaction"""
+    response = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:6])
+    )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert len(data) == 6
+    assert {b["seat_id"] for b in data} == {s.id for s in test_seats[:6]}
+    assert all(b["status"] == "pending" for b in data)
+
+
+@pytest.mark.api
+def test_create_group_booking_all_or_nothing(client: TestClient, auth_headers, test_user, test_showtime, test_seats, db_session):
+    """Test có ghế trùng thì không ghế nào được đặt và trả về tất cả ghế trùng"""
+    from app.models import Booking
+
+    first = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:2])
+    )
+    assert first.status_code == 201
+
+    response = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:4])
+    )
+
+    assert response.status_code == 409
+    conflicts = response.json()["detail"]["conflicts"]
+    assert {c["seat_id"] for c in conflicts} == {test_seats[0].id, test_seats[1].id}
+    assert db_session.query(Booking).count() == 2
+
+
+@pytest.mark.api
+def test_create_group_booking_reuses_cancelled_seat(client: TestClient, auth_headers, test_user, test_showtime, test_seats, db_session):
+    """Test ghế của booking đã hủy có thể được đặt lại mà booking đã hủy vẫn được giữ làm lịch sử"""
+    from app.models import Booking
+
+    first = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:1])
+    )
+    cancelled_id = first.json()[0]["id"]
+    assert client.put(f"/bookings/{cancelled_id}/cancel", headers=auth_headers).status_code == 200
+
+    response = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:1])
+    )
+    assert response.status_code == 201
+
+    # Single booking cũng đi qua luồng đặt nhóm
+    assert client.put(f"/bookings/{response.json()[0]['id']}/cancel", headers=auth_headers).status_code == 200
+    response = client.post(
+        "/bookings", headers=auth_headers,
+        json=[{"showtime_id": test_showtime.id, "seat_id": test_seats[0].id, "price": 100000.0, "user_id": test_user.id}],
+    )
+    assert response.status_code == 201
+
+    db_session.expire_all()
+    statuses = [b.status for b in db_session.query(Booking).order_by(Booking.id).all()]
+    assert statuses == ["cancelled", "cancelled", "pending"]
+    assert db_session.get(Booking, cancelled_id) is not None
+
+    # Vẫn chỉ 1 booking active cho mỗi ghế
+    response = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:1])
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.api
+def test_delete_cancelled_booking_keeps_rebooked_seat(client: TestClient, auth_headers, test_user, test_showtime, test_seats):
+    """Test xóa booking đã hủy không trả ghế đang thuộc booking active mới"""
+    payload = _booking_payload(test_user, test_showtime, test_seats[:1])
+    cancelled_id = client.post("/bookings/group", headers=auth_headers, json=payload).json()[0]["id"]
+    assert client.put(f"/bookings/{cancelled_id}/cancel", headers=auth_headers).status_code == 200
+    assert client.post("/bookings/group", headers=auth_headers, json=payload).status_code == 201
+    # Bitmap đã nằm trong cache trước khi xóa
+    assert client.get(f"/bookings/showtime/{test_showtime.id}/occupancy").json()["booked_count"] == 1
+
+    assert client.delete(f"/bookings/{cancelled_id}", headers=auth_headers).status_code == 200
+
+    data = client.get(f"/bookings/showtime/{test_showtime.id}/occupancy").json()
+    assert data["booked_count"] == 1
+    assert _booked_positions(data) == {0}
+
+
+def test_create_group_booking_for_other_user(client: TestClient, auth_headers, test_admin, test_showtime, test_seats):
+    """Test không được đặt ghế cho user khác"""
+    response = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_admin, test_showtime, test_seats[:1])
+    )
+
+    assert response.status_code == 403
+
+
+@pytest.mark.api
+def test_group_booking_holds_seats_until_expiry(client: TestClient, auth_headers, test_user, test_showtime, test_seats, db_session):
+    """Test booking pending được giữ ghế có thời hạn và được trả ghế khi hết hạn"""
+    from datetime import datetime, timedelta, timezone
+    from app.models import Booking
+    from app.services.seat_hold_service import seat_hold_service
+
+    response = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:3])
+    )
+    assert response.status_code == 201
+    assert all(b["expires_at"] for b in response.json())
+    assert seat_hold_service.pending_count() == 3
+
+    # Chưa tới hạn -> không trả ghế
+    assert seat_hold_service.expire_due(db_session) == 0
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=seat_hold_service.ttl_seconds + 1)
+    assert seat_hold_service.expire_due(db_session, now=later) == 3
+    assert seat_hold_service.pending_count() == 0
+
+    db_session.expire_all()
+    assert {b.status for b in db_session.query(Booking).all()} == {"cancelled"}
+    occupancy = client.get(f"/bookings/showtime/{test_showtime.id}/occupancy").json()
+    assert occupancy["booked_count"] == 0
+
+
+@pytest.mark.api
+def test_pay_booking_confirms_hold(client: TestClient, auth_headers, test_user, test_showtime, test_seats, db_session):
+    """Test thanh toán biến hold thành booking confirmed và không bị trả ghế"""
+    from datetime import datetime, timedelta, timezone
+    from app.services.seat_hold_service import seat_hold_service
+
+    response = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:1])
+    )
+    booking_id = response.json()[0]["id"]
+
+    response = client.post(f"/bookings/{booking_id}/pay", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "confirmed"
+    assert data["expires_at"] is None
+    later = datetime.now(timezone.utc) + timedelta(seconds=seat_hold_service.ttl_seconds + 1)
+    assert seat_hold_service.expire_due(db_session, now=later) == 0
+
+
+@pytest.mark.api
+def test_pay_booking_rejects_hold_expired_after_checks(client: TestClient, auth_headers, test_user, test_showtime,
+                                                       test_seats, db_session, monkeypatch):
+    """Test hold bị scheduler hủy (và ghế được đặt lại) giữa lúc kiểm tra và xác nhận -> 409, không hồi sinh booking"""
+    from sqlalchemy import insert, update
+    from app.controllers.booking_controller import booking_service
+    from app.models import Booking, Payment
+
+    booking_id = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:1])
+    ).json()[0]["id"]
+
+    def expire_then_rebook(booking):
+        # expire_due chạy ngay sau khi pay_booking đã kiểm tra status, rồi user khác đặt lại ghế
+        db = db_session
+        db.execute(update(Booking).where(Booking.id == booking_id).values(status="cancelled")
+                   .execution_options(synchronize_session=False))
+        db.execute(insert(Booking).values(user_id=test_user.id, showtime_id=test_showtime.id,
+                                          seat_id=test_seats[0].id, price=100000.0, status="pending"))
+        db.commit()
+        return False
+
+    monkeypatch.setattr(booking_service, "_hold_expired", expire_then_rebook)
+    response = client.post(f"/bookings/{booking_id}/pay", headers=auth_headers)
+
+    assert response.status_code == 409
+    assert db_session.query(Payment).count() == 0
+    db_session.expire_all()
+    assert [b.status for b in db_session.query(Booking).order_by(Booking.id)] == ["cancelled", "pending"]
+
+
+@pytest.mark.api
+def test_batch_cancel_whole_showtime(client: TestClient, auth_headers, admin_headers, test_user, test_showtime, test_seats, db_session):
+    """Test admin hủy cả suất chiếu bằng UPDATE set-based và hủy luôn payment liên quan"""
+    from app.models import Booking, Payment
+
+    created = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:3])
+    ).json()
+    assert client.post(f"/bookings/{created[0]['id']}/pay", headers=auth_headers).status_code == 200
+
+    with captured_statements() as statements:
+        response = client.post("/bookings/batch-cancel", headers=admin_headers, json={"showtime_id": test_showtime.id})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["action"] == "cancel"
+    assert data["updated_ids"] == sorted(b["id"] for b in created)
+    assert data["payments_cancelled"] == 1
+    # 1 UPDATE bookings + 1 UPDATE payments
+    assert len(statements.of("UPDATE")) == 2
+    db_session.expire_all()
+    assert {b.status for b in db_session.query(Booking).all()} == {"cancelled"}
+    assert db_session.query(Payment).one().status == "cancelled"
+    assert client.get(f"/bookings/showtime/{test_showtime.id}/occupancy").json()["booked_count"] == 0
+
+
+@pytest.mark.api
+def test_batch_cancel_only_own_bookings(client: TestClient, auth_headers, admin_headers, test_user, test_admin, test_showtime, test_seats):
+    """Test user chỉ hủy được booking của mình; booking của người khác nằm trong skipped_ids"""
+    own = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:1])
+    ).json()[0]
+    other = client.post(
+        "/bookings/group", headers=admin_headers, json=_booking_payload(test_admin, test_showtime, test_seats[1:2])
+    ).json()[0]
+
+    response = client.post("/bookings/batch-cancel", headers=auth_headers, json={"booking_ids": [own["id"], other["id"]]})
+
+    assert response.status_code == 200
+    assert response.json()["updated_ids"] == [own["id"]]
+    assert response.json()["skipped_ids"] == [other["id"]]
+    response = client.post("/bookings/batch-cancel", headers=auth_headers, json={"showtime_id": test_showtime.id})
+    assert response.status_code == 403
+
+
+@pytest.mark.api
+def test_batch_pay_creates_one_payment_per_user(client: TestClient, auth_headers, test_user, test_showtime, test_seats, db_session):
+    """Test thanh toán nhiều booking tạo 1 payment với tổng tiền, booking không hợp lệ bị bỏ qua"""
+    from app.models import Booking, Payment
+
+    created = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:3])
+    ).json()
+    ids = [b["id"] for b in created]
+
+    response = client.post(
+        "/bookings/batch-pay", headers=auth_headers, json={"booking_ids": ids + [99999], "payment_method": "momo"}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["updated_ids"] == ids
+    assert data["skipped_ids"] == [99999]
+    assert data["payments_created"] == 1
+    payment = db_session.query(Payment).one()
+    assert payment.amount == 300000.0
+    assert payment.method == "momo"
+    db_session.expire_all()
+    assert {(b.status, b.payment_id, b.expires_at) for b in db_session.query(Booking).all()} == {("confirmed", payment.id, None)}
+
+    # Đã thanh toán -> không thanh toán lại
+    response = client.post("/bookings/batch-pay", headers=auth_headers, json={"booking_ids": ids})
+    assert response.json()["updated"] == 0
+    assert response.json()["payments_created"] == 0
+
+
+@pytest.mark.api
+def test_batch_pay_rejects_bookings_changed_after_select(client: TestClient, auth_headers, test_user, test_showtime,
+                                                         test_seats, db_session, monkeypatch):
+    """Test booking bị hủy giữa SELECT và UPDATE thì không bị xác nhận lại, cả lô rollback với 409"""
+    from fastapi import HTTPException
+    from sqlalchemy import update
+    from app.models import Booking, Payment
+    from app.services.booking_service import BookingService
+
+    created = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:2])
+    ).json()
+    ids = [b["id"] for b in created]
+    service = BookingService()
+    get_payable = service.repository.get_payable
+
+    def get_payable_then_cancel(db, conditions, now):
+        rows = get_payable(db, conditions, now)
+        # Request khác hủy booking ngay sau khi SELECT đọc xong
+        db.execute(update(Booking).where(Booking.id == ids[1]).values(status="cancelled"))
+        return rows
+
+    monkeypatch.setattr(service.repository, "get_payable", get_payable_then_cancel)
+    with pytest.raises(HTTPException) as exc_info:
+        service.batch_pay(db_session, booking_ids=ids)
+
+    assert exc_info.value.status_code == 409
+    assert db_session.query(Payment).count() == 0
+    db_session.expire_all()
+    assert [db_session.get(Booking, booking_id).status for booking_id in ids] == ["pending", "pending"]
+
+
+@pytest.mark.api
+def test_batch_expire_releases_overdue_holds(client: TestClient, auth_headers, test_user, test_showtime, test_seats, db_session):
+    """Test batch expire chỉ trả ghế của hold đã quá hạn"""
+    from datetime import datetime, timedelta, timezone
+    from app.controllers.booking_controller import booking_service
+    from app.services.seat_hold_service import seat_hold_service
+
+    created = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:2])
+    ).json()
+
+    assert booking_service.batch_expire(db_session, showtime_id=test_showtime.id)["updated"] == 0
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=seat_hold_service.ttl_seconds + 1)
+    summary = booking_service.batch_expire(db_session, showtime_id=test_showtime.id, now=later)
+
+    assert summary["action"] == "expire"
+    assert summary["updated_ids"] == sorted(b["id"] for b in created)
+    assert seat_hold_service.pending_count() == 0
+    assert client.get(f"/bookings/showtime/{test_showtime.id}/occupancy").json()["booked_count"] == 0
+
+
+@pytest.mark.api
+def test_checkout_creates_single_payment(client: TestClient, auth_headers, test_user, test_showtime, test_seats, db_session):
+    """Test checkout giỏ hàng: 1 payment với tổng tiền, mọi booking trỏ tới payment đó"""
+    from app.models import Booking, Payment
+
+    created = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:6])
+    ).json()
+    ids = [b["id"] for b in created]
+
+    with captured_statements() as statements:
+        response = client.post(
+            "/bookings/checkout", headers=auth_headers, json={"booking_ids": ids, "payment_method": "momo"}
+        )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["amount"] == 600000.0
+    assert data["booking_ids"] == ids
+    # 1 INSERT payment + 1 UPDATE bookings
+    assert len(statements.of("INSERT")) == 1
+    assert len(statements.of("UPDATE")) == 1
+    payment = db_session.query(Payment).one()
+    assert payment.id == data["payment_id"]
+    assert payment.amount == 600000.0
+    db_session.expire_all()
+    assert {(b.status, b.payment_id) for b in db_session.query(Booking).all()} == {("confirmed", payment.id)}
+
+
+@pytest.mark.api
+def test_checkout_all_or_nothing(client: TestClient, auth_headers, test_user, test_showtime, test_seats, db_session):
+    """Test checkout có booking không hợp lệ thì không tạo payment và trả về các id bị từ chối"""
+    from app.models import Booking, Payment
+
+    created = client.post(
+        "/bookings/group", headers=auth_headers, json=_booking_payload(test_user, test_showtime, test_seats[:2])
+    ).json()
+    assert client.put(f"/bookings/{created[1]['id']}/cancel", headers=auth_headers).status_code == 200
+
+    response = client.post(
+        "/bookings/checkout", headers=auth_headers, json={"booking_ids": [created[0]["id"], created[1]["id"], 99999]}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["booking_ids"] == [created[1]["id"], 99999]
+    assert db_session.query(Payment).count() == 0
+    db_session.expire_all()
+    assert db_session.get(Booking, created[0]["id"]).status == "pending"
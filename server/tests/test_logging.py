@@ -0,0 +1,48 @@
+"""
+Unit tests cho logging pipeline (JSON formatter, request id, sampling)
+"""
+import json
+import logging
+
+import pytest
+
+from app.config.logger import JsonFormatter, RequestIdFilter, SamplingFilter, parse_levels, request_id_var
+
+
+def _record(level=logging.INFO, msg="Get by ID=%s", args=(7,)):
+    return logging.LogRecord("movie_booking.repository", level, __file__, 1, msg, args, None, func="get_by_id")
+
+
+@pytest.mark.unit
+def test_json_formatter_includes_request_id():
+    """Test record được format thành 1 dòng JSON kèm request id của context hiện tại"""
+    token = request_id_var.set("abc123")
+    try:
+        record = _record()
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["message"] == "Get by ID=7"
+    assert payload["request_id"] == "abc123"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "movie_booking.repository"
+
+
+@pytest.mark.unit
+def test_sampling_keeps_one_in_n_but_all_warnings():
+    """Test sampling chỉ giữ 1/N record INFO, luôn giữ WARNING"""
+    sampler = SamplingFilter(rate=0.25)
+
+    kept = sum(sampler.filter(_record()) for _ in range(100))
+    assert kept == 25
+    assert all(sampler.filter(_record(level=logging.WARNING)) for _ in range(10))
+
+
+@pytest.mark.unit
+def test_parse_levels():
+    assert parse_levels("movie_booking.repository=warning, sqlalchemy.engine=INFO,bad") == {
+        "movie_booking.repository": "WARNING",
+        "sqlalchemy.engine": "INFO",
+    }
@@ -0,0 +1,116 @@
+"""
+Tests cho metrics (registry + MetricsMiddleware + GET /metrics)
+"""
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.metrics import http_request_duration_seconds, http_requests_total
+from app.metrics.query_tracker import db_repeated_queries_total, fingerprint, query_tracker
+from app.metrics.registry import Counter, Histogram, Registry
+from app.middleware.metrics import MetricsMiddleware
+from app.models.movie import Movie
+
+
+@pytest.mark.unit
+def test_registry_merges_thread_shards():
+    """Test counter / histogram gom đúng số liệu ghi từ nhiều thread"""
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Jobs", ("kind",)))
+    histogram = registry.register(Histogram("job_seconds", "Job time", buckets=(0.1, 1.0)))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("a",))
+            histogram.observe((), 0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    histogram.observe((), 0.1)
+
+    text = registry.render()
+    assert 'jobs_total{kind="a"} 4000' in text
+    assert 'job_seconds_bucket{le="0.1"} 1' in text
+    assert 'job_seconds_bucket{le="1.0"} 4001' in text
+    assert 'job_seconds_bucket{le="+Inf"} 4001' in text
+    assert "job_seconds_count 4001" in text
+
+
+@pytest.mark.integration
+def test_metrics_use_route_template(client: TestClient, test_movie: Movie):
+    """Test request được gán nhãn theo route template, không theo id cụ thể"""
+    labels = ("GET", "/movies/{movie_id}", "200")
+    before = http_requests_total.values().get(labels, 0)
+
+    assert client.get(f"/movies/{test_movie.id}").status_code == 200
+    assert client.get("/movies/999999").status_code == 404
+    assert client.get("/no/such/path").status_code == 404
+
+    assert http_requests_total.values()[labels] == before + 1
+    assert http_requests_total.values()[("GET", "/movies/{movie_id}", "404")] >= 1
+    assert http_requests_total.values()[("GET", "unmatched", "404")] >= 1
+    assert http_request_duration_seconds.values()[("GET", "/movies/{movie_id}")][-1] >= 2
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/movies/{movie_id}",status="200"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/movies/{movie_id}",le="+Inf"}' in text
+    assert f"/movies/{test_movie.id}\"" not in text
+    assert 'db_pool_connections{state="checkedout"}' in text
+    assert 'response_cache{stat="hit_ratio"}' in text
+    assert "# TYPE rate_limit_rejections_total counter" in text
+
+
+@pytest.mark.unit
+def test_fingerprint_ignores_literals():
+    """Test cùng 1 câu SQL khác tham số cho cùng fingerprint"""
+    assert fingerprint("SELECT * FROM seats WHERE id = 1") == fingerprint("SELECT *  FROM seats\nWHERE id = 42")
+    assert fingerprint("SELECT * FROM users WHERE email = 'a@b.c'") == "SELECT * FROM users WHERE email = ?"
+    assert fingerprint("DELETE FROM seats WHERE id IN (?, ?, ?)") == "DELETE FROM seats WHERE id IN (?)"
+
+
+@pytest.mark.integration
+def test_query_stats_header_and_repeated_queries(db_session):
+    """Test header debug đếm query của request và N+1 được ghi vào metrics"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, debug_headers=True)
+
+    @app.get("/loop/{times}")
+    def loop(times: int):
+        for i in range(times):
+            db_session.execute(text("SELECT :i"), {"i": i})
+        return {"ok": True}
+
+    client = TestClient(app)
+    before = db_repeated_queries_total.values().get(("/loop/{times}",), 0)
+
+    response = client.get("/loop/2")
+    assert response.headers["X-DB-Query-Count"] == "2"
+    assert response.headers["X-DB-Query-Max-Repeat"] == "2"
+    assert response.headers["X-DB-Query-Time"].endswith("ms")
+    assert db_repeated_queries_total.values().get(("/loop/{times}",), 0) == before
+
+    response = client.get(f"/loop/{query_tracker.repeat_threshold}")
+    assert response.headers["X-DB-Query-Count"] == str(query_tracker.repeat_threshold)
+    assert db_repeated_queries_total.values()[("/loop/{times}",)] == before + 1
+
+
+@pytest.mark.unit
+def test_query_budget_records_violations():
+    """Test request vượt budget bị ghi lại (conftest biến thành test fail)"""
+    with query_tracker.track() as stats:
+        stats.record("SELECT 1", 0.001)
+        stats.record("SELECT 2", 0.001)
+
+    query_tracker.budget = 1
+    query_tracker.finish("GET", "/movies/", stats)
+    assert query_tracker.violations == [("GET /movies/", 2)]
+    query_tracker.violations.clear()
@@ -0,0 +1,105 @@
+"""
+Integration tests cho middleware stack production (ASGI thuần)
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware import setup_middleware
+
+
+@pytest.fixture
+def stack_client():
+    app = FastAPI()
+    setup_middleware(app)
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.post("/echo")
+    def echo(payload: dict):
+        return payload
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.integration
+def test_stack_adds_headers(stack_client: TestClient):
+    """Test security / CORS / rate limit / timing headers được thêm vào response"""
+    response = stack_client.get("/ping", headers={"Origin": "http://localhost:5173"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.headers["Access-Control-Max-Age"] == "86400"
+    assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:5173"
+    assert "X-RateLimit-Remaining" in response.headers
+    assert float(response.headers["X-Process-Time"]) >= 0
+    assert response.headers["X-Request-ID"]
+    # Request id của client được giữ nguyên để trace
+    assert stack_client.get("/ping", headers={"X-Request-ID": "trace-1"}).headers["X-Request-ID"] == "trace-1"
+
+
+@pytest.mark.integration
+def test_stack_replays_and_rejects_body(stack_client: TestClient):
+    """Test body hợp lệ tới được route; body nguy hiểm bị chặn với 400"""
+    assert stack_client.post("/echo", json={"title": "Hello"}).json() == {"title": "Hello"}
+
+    response = stack_client.post("/echo", json={"title": "<script>alert(1)</script>"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid request content"}
+
+
+@pytest.mark.integration
+def test_stack_error_keeps_security_headers(stack_client: TestClient):
+    """Test lỗi trong route vẫn trả 500 kèm security headers"""
+    response = stack_client.get("/boom")
+
+    assert response.status_code == 500
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+
+@pytest.mark.unit
+def test_body_scanned_across_chunk_boundaries():
+    """Test pattern bị cắt đôi giữa 2 chunk vẫn bị phát hiện; body sạch được chuyển tiếp từng chunk"""
+    import asyncio
+    from app.middleware.validation import RequestValidationMiddleware
+
+    seen_chunks = []
+
+    async def downstream(scope, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                raise RuntimeError("client disconnected")
+            seen_chunks.append(message["body"])
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    def run(chunks):
+        messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1} for i, c in enumerate(chunks)]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/upload", "query_string": b"",
+                 "headers": [(b"host", b"test")], "scheme": "http", "server": ("test", 80)}
+        asyncio.run(RequestValidationMiddleware(downstream)(scope, receive, send))
+        return sent[0]["status"], sent[-1]["body"]
+
+    assert run([b'{"note": "hello ', b'world"}']) == (200, b"ok")
+    assert seen_chunks == [b'{"note": "hello ', b'world"}']
+
+    status_code, body = run([b'{"note": "<SCR', b'IPT>"}'])
+    assert status_code == 400
+    assert b"Invalid request content" in body
@@ -17,6 +17,7 @@ def test_get_movies(client: TestClient):
     assert isinstance(data["data"], list)
 
 
+@pytest.mark.query_budget(1)
 def test_get_movie_by_id(client: TestClient, test_movie):
     """Test lấy chi tiết phim"""
     response = client.get(f"/movies/{test_movie.id}")
@@ -105,3 +106,211 @@ def test_delete_movie_as_admin(client: TestClient, admin_headers, test_movie):
     get_response = client.get(f"/api/movies/{test_movie.id}")
     assert get_response.status_code == 404
 
+
+
+@pytest.mark.api
+def test_async_movie_reads_match_sync_shape(async_client):
+    """Test route /async/movies trả về cùng dữ liệu (kể cả liked_by_count) như bản sync"""
+    from app.models import Movie, User
+    from app.repositories.movie_repo import MovieRepository
+
+    client, db = async_client
+    fan = User(email="fan@example.com", username="fan", hashed_password="x", role="customer")
+    movies = [Movie(title=f"Async Movie {i}", genre="Drama") for i in range(3)]
+    db.add_all([fan, *movies])
+    db.commit()
+    fan.favorite_movies.append(movies[1])
+    MovieRepository().reindex_search(db)
+    db.commit()
+
+    response = client.get("/async/movies?page=1&size=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert data["pages"] == 2
+    assert [m["title"] for m in data["data"]] == ["Async Movie 0", "Async Movie 1"]
+    assert [m["liked_by_count"] for m in data["data"]] == [0, 1]
+
+    response = client.get("/async/movies?search=movie 2")
+    assert response.status_code == 200
+    assert [m["id"] for m in response.json()["data"]] == [movies[2].id]
+
+    response = client.get(f"/async/movies/{movies[1].id}")
+    assert response.status_code == 200
+    assert response.json()["liked_by_count"] == 1
+    assert client.get("/async/movies/99999").status_code == 404
+
+
+@pytest.mark.api
+def test_async_showtimes_by_movie(async_client):
+    """Test route /async/showtimes/movie/{id} chỉ trả về suất chiếu chưa kết thúc, theo start_time"""
+    from datetime import datetime, timedelta
+    from app.models import Movie, Theater, Room, Showtime
+
+    client, db = async_client
+    movie = Movie(title="Async Showtime Movie")
+    room = Room(name="Room A", room_type="2D", total_seats=10, theater=Theater(name="Async Theater", city="HCM", address="1 Street"))
+    db.add_all([movie, room])
+    db.commit()
+    now = datetime.utcnow()
+    for hours in (5, -5, 2):
+        db.add(Showtime(
+            movie_id=movie.id,
+            room_id=room.id,
+            start_time=now + timedelta(hours=hours),
+            end_time=now + timedelta(hours=hours + 2),
+            base_price=100000.0,
+        ))
+    db.commit()
+
+    response = client.get(f"/async/showtimes/movie/{movie.id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    starts = [s["start_time"] for s in data["data"]]
+    assert starts == sorted(starts)
+
+    showtime_id = data["data"][0]["id"]
+    assert client.get(f"/async/showtimes/{showtime_id}").json()["id"] == showtime_id
+    assert client.get("/async/showtimes/99999").status_code == 404
+
+
+@pytest.mark.api
+@pytest.mark.query_budget(3)
+def test_get_movies_with_cursor(client: TestClient, db_session):
+    """Test duyệt danh sách phim bằng next_cursor (keyset) và bỏ qua total"""
+    from app.models import Movie
+
+    db_session.add_all(Movie(title=f"Cursor Movie {i}") for i in range(5))
+    db_session.commit()
+
+    first = client.get("/movies?size=2").json()
+    assert first["total"] == 5
+    assert first["next_cursor"]
+
+    seen = [m["id"] for m in first["data"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(f"/movies?size=2&with_total=false&cursor={cursor}").json()
+        assert page["total"] is None and page["pages"] is None
+        seen += [m["id"] for m in page["data"]]
+        cursor = page["next_cursor"]
+    assert seen == sorted(seen) and len(set(seen)) == 5
+
+    assert client.get("/movies?cursor=not-a-cursor").status_code == 400
+
+
+@pytest.mark.api
+def test_search_movies_full_text(client: TestClient, admin_headers):
+    """Test search qua chỉ mục full-text: prefix, xếp hạng, đồng bộ khi tạo / sửa / xóa phim"""
+    def create(title, description, genre):
+        response = client.post(
+            "/movies",
+            json={"title": title, "description": description, "genre": genre, "duration": 100},
+            headers=admin_headers,
+        )
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    in_description = create("Night Walk", "A story about an interstellar voyage", "Drama")
+    in_title = create("Interstellar", "Space travel", "Sci-Fi")
+    create("Tình Yêu", "Phim tình cảm", "Romance")
+
+    # Prefix query (typeahead), title được xếp trên description
+    data = client.get("/movies?search=inters").json()
+    assert [m["id"] for m in data["data"]] == [in_title, in_description]
+    assert data["total"] == 2
+
+    # Bỏ dấu khi so khớp, nhiều từ = AND
+    assert [m["title"] for m in client.get("/movies?search=tinh yeu").json()["data"]] == ["Tình Yêu"]
+    assert client.get("/movies?search=space drama").json()["total"] == 0
+
+    response = client.put(f"/movies/{in_title}", json={"title": "Gravity"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert [m["id"] for m in client.get("/movies?search=gravity").json()["data"]] == [in_title]
+    assert [m["id"] for m in client.get("/movies?search=interstellar").json()["data"]] == [in_description]
+
+    assert client.delete(f"/movies/{in_description}", headers=admin_headers).status_code == 200
+    assert client.get("/movies?search=interstellar").json()["total"] == 0
+
+
+@pytest.mark.api
+@pytest.mark.query_budget(3)
+def test_liked_by_count_uses_grouped_count(client: TestClient, db_session, test_user, auth_headers):
+    """Test liked_by_count được đếm bằng GROUP BY, không load các User đã like"""
+    from app.models import Movie, User
+    from tests.conftest import captured_statements
+
+    movies = [Movie(title=f"Liked Movie {i}") for i in range(3)]
+    fans = [User(email=f"fan{i}@example.com", username=f"fan{i}", hashed_password="x") for i in range(4)]
+    db_session.add_all(movies + fans)
+    db_session.commit()
+    for fan in fans:
+        fan.favorite_movies.append(movies[0])
+    fans[0].favorite_movies.append(movies[2])
+    test_user.favorite_movies.extend([movies[0], movies[2]])
+    db_session.commit()
+    db_session.expire_all()
+
+    with captured_statements() as statements:
+        page = client.get("/movies?size=10").json()
+        favorites = client.get(f"/favorites/user/{test_user.id}", headers=auth_headers).json()
+
+    assert [m["liked_by_count"] for m in page["data"]] == [5, 0, 2]
+    assert [(m["id"], m["liked_by_count"]) for m in favorites] == [(movies[0].id, 5), (movies[2].id, 2)]
+    # Không có query lazy-load danh sách người like (SELECT users ... FROM users, favorites)
+    assert not any("FROM users, favorites" in s for s in statements)
+
+
+@pytest.mark.api
+@pytest.mark.query_budget(3)
+def test_search_movies_counts_likes_once_per_page(client: TestClient, db_session, test_user):
+    """Test search gán liked_by_count cho cả trang bằng 1 query (search + count + GROUP BY)"""
+    from app.models import Movie
+    from app.repositories.movie_repo import MovieRepository
+
+    movies = [Movie(title=f"Searchable Movie {i}") for i in range(5)]
+    db_session.add_all(movies)
+    db_session.commit()
+    test_user.favorite_movies.extend([movies[0], movies[3]])
+    db_session.commit()
+    MovieRepository().reindex_search(db_session)
+    db_session.commit()
+
+    data = client.get("/movies?search=searchable&size=10").json()
+
+    assert data["total"] == 5
+    assert sorted(m["liked_by_count"] for m in data["data"]) == [0, 0, 0, 1, 1]
+
+
+@pytest.mark.api
+def test_movie_reads_are_cached_and_invalidated(client: TestClient, admin_headers, test_movie):
+    """Lần đọc thứ 2 lấy từ response cache; cập nhật phim làm mới chi tiết và danh sách"""
+    first = client.get(f"/movies/{test_movie.id}")
+    second = client.get(f"/movies/{test_movie.id}")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    assert client.get("/movies/?page=1&size=10").headers["X-Cache"] == "MISS"
+    # Thứ tự query param không tạo key mới
+    assert client.get("/movies/?size=10&page=1").headers["X-Cache"] == "HIT"
+
+    response = client.put(
+        f"/movies/{test_movie.id}",
+        headers=admin_headers,
+        json={"title": "Cached Title Changed", "genre": test_movie.genre, "duration": test_movie.duration},
+    )
+    assert response.status_code == 200
+
+    detail = client.get(f"/movies/{test_movie.id}")
+    assert detail.headers["X-Cache"] == "MISS"
+    assert detail.json()["title"] == "Cached Title Changed"
+    listing = client.get("/movies/?page=1&size=10")
+    assert listing.headers["X-Cache"] == "MISS"
+    assert listing.json()["data"][0]["title"] == "Cached Title Changed"
+
+    stats = client.get("/cache/stats", headers=admin_headers).json()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert stats["hit_ratio"] == round(2 / 6, 4)
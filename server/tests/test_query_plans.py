@@ -0,0 +1,64 @@
+"""
+Regression tests: các query nóng phải dùng index (EXPLAIN QUERY PLAN trên SQLite)
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.repositories.booking_repo import BookingRepository
+from app.repositories.payment_repo import PaymentRepository
+from app.repositories.showtime_repo import ShowtimeRepository
+from app.services.showtime_service import ShowtimeService
+from tests.conftest import captured_statements
+
+
+def _query_plans(db_session, run):
+    """Chạy hàm repository, rồi EXPLAIN QUERY PLAN từng câu SELECT nó đã gửi xuống DB."""
+    with captured_statements() as statements:
+        run()
+
+    connection = db_session.connection()
+    return [
+        " / ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        for statement, parameters in zip(statements, statements.parameters)
+        if statement.lstrip().upper().startswith("SELECT")
+    ]
+
+
+# tên -> (gọi query, index phải dùng, thứ tự lấy từ index - không cần sort tạm)
+HOT_QUERIES = {
+    "booking_by_showtime": (
+        lambda db: BookingRepository().get_by_showtime(db, 1),
+        "ix_bookings_showtime_id_status", True,
+    ),
+    "user_bookings_newest_first": (
+        lambda db: BookingRepository().get_paginated_by_user_with_details(db, 1, offset=0, limit=10),
+        "ix_bookings_user_id_id", True,
+    ),
+    "showtime_conflict": (
+        lambda db: ShowtimeService().validate_conflict(db, 1, datetime(2030, 1, 1), datetime(2030, 1, 1) + timedelta(hours=2)),
+        "ix_showtimes_room_id_start_end", True,
+    ),
+    "upcoming_showtimes_by_movie": (
+        lambda db: ShowtimeRepository().get_paginated_by_movie(db, 1, offset=0, limit=10),
+        # Lọc theo khoảng end_time nên ORDER BY start_time vẫn sort trên tập đã lọc (nhỏ)
+        "ix_showtimes_movie_id_end_start", False,
+    ),
+    "payments_by_user": (
+        lambda db: PaymentRepository().get_by_user(db, 1),
+        "ix_payments_created_by_status", True,
+    ),
+}
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_index(db_session, name):
+    """Test query đầu tiên của mỗi đường nóng tìm theo index ghép, không quét cả bảng"""
+    run, index, ordered_by_index = HOT_QUERIES[name]
+
+    plan = _query_plans(db_session, lambda: run(db_session))[0]
+
+    assert f"INDEX {index} (" in plan, plan
+    if ordered_by_index:
+        assert "TEMP B-TREE" not in plan, plan
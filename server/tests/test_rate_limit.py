@@ -0,0 +1,72 @@
+"""
+Unit tests cho rate limiter (sliding-window-counter)
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth.jwt_auth import create_access_token
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.rate_limit_backends import MemoryRateLimitBackend
+
+
+def _hit(backend, key, limit, period, now):
+    return asyncio.run(backend.hit(key, limit, period, now=now))
+
+
+@pytest.mark.unit
+def test_sliding_window_counter_limits_and_recovers():
+    """Test quota tính cả phần còn lại của cửa sổ trước"""
+    backend = MemoryRateLimitBackend()
+
+    assert all(_hit(backend, "ip:a", 3, 60, 10.0).allowed for _ in range(3))
+    rejected = _hit(backend, "ip:a", 3, 60, 11.0)
+    assert not rejected.allowed
+    assert rejected.remaining == 0
+    assert rejected.reset == 60
+
+    # Đầu cửa sổ sau: 3 request cũ còn trọng số 0.95 (ước lượng 2.85) -> chỉ thêm được 1
+    assert _hit(backend, "ip:a", 3, 60, 63.0).allowed
+    assert not _hit(backend, "ip:a", 3, 60, 63.0).allowed
+    # Giữa cửa sổ sau: 3 * 0.5 + 1 = 2.5 -> thêm được 1 nữa
+    assert _hit(backend, "ip:a", 3, 60, 90.0).allowed
+    assert not _hit(backend, "ip:a", 3, 60, 90.0).allowed
+    # Key khác không bị ảnh hưởng
+    assert _hit(backend, "ip:b", 3, 60, 90.0).allowed
+
+
+@pytest.mark.unit
+def test_idle_keys_are_evicted():
+    """Test key idle quá 2 period bị dọn, bộ nhớ không tăng theo số IP đã gặp"""
+    backend = MemoryRateLimitBackend(shards=4, sweep_every=1)
+    for i in range(100):
+        _hit(backend, f"ip:{i}", 10, 60, 0.0)
+    assert backend.size() == 100
+
+    for i in range(8):
+        _hit(backend, "ip:active", 10, 60, 1000.0)
+    assert backend.size() == 1
+
+
+@pytest.mark.unit
+def test_rate_limit_keyed_on_user_when_token_present():
+    """Test 2 user cùng IP có quota riêng"""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, calls=2, period=60, backend=MemoryRateLimitBackend())
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': '2'})}"}
+
+    assert client.get("/ping", headers=alice).headers["X-RateLimit-Remaining"] == "1"
+    assert client.get("/ping", headers=alice).status_code == 200
+    assert client.get("/ping", headers=alice).status_code == 429
+    assert client.get("/ping", headers=bob).status_code == 200
+    # Không có token -> tính theo IP
+    assert client.get("/ping").status_code == 200
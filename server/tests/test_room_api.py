@@ -0,0 +1,95 @@
+"""
+Integration tests cho Room API (sinh ghế)
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.models import Booking, Room, Seat
+
+
+def _seat_codes(db_session, room_id):
+    return db_session.execute(
+        select(Seat.row, Seat.number).where(Seat.room_id == room_id).order_by(Seat.id)
+    ).all()
+
+
+@pytest.mark.api
+@pytest.mark.query_budget(10)
+def test_generate_seats_overwrite_is_set_based(client: TestClient, admin_headers, db_session, test_room, test_seats):
+    """Test sinh lại ghế bằng 1 DELETE + 1 INSERT, số query không phụ thuộc số ghế"""
+    response = client.post(f"/rooms/{test_room.id}/generate-seats", headers=admin_headers)
+    assert response.json() == {"message": "Seats already exist for this room", "existing": 10}
+
+    response = client.post(f"/rooms/{test_room.id}/generate-seats?overwrite=true", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == {"created": 50}
+
+    codes = _seat_codes(db_session, test_room.id)
+    assert len(codes) == 50
+    assert codes[0] == ("A", 1) and codes[9] == ("A", 10) and codes[-1] == ("E", 10)
+
+
+@pytest.mark.api
+@pytest.mark.query_budget(10)
+def test_generate_seats_batch(client: TestClient, admin_headers, db_session, test_theater, test_room, test_seats):
+    """Test sinh ghế cho nhiều phòng trong 1 request; phòng đã có ghế bị bỏ qua nếu không overwrite"""
+    rooms = [Room(name=f"Hall {i}", room_type="IMAX", total_seats=30 + i, theater_id=test_theater.id) for i in range(3)]
+    db_session.add_all(rooms)
+    db_session.commit()
+    layout = [{"row": "VIP", "seats": [{"number": n, "type": "vip", "price_modifier": 1.5} for n in range(1, 5)]}]
+
+    payload = {"rooms": [{"room_id": test_room.id}, {"room_id": rooms[0].id, "seats_per_row": 15},
+                         {"room_id": rooms[1].id}, {"room_id": rooms[2].id, "layout": layout}]}
+    response = client.post("/rooms/generate-seats", json=payload, headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["skipped"] == [test_room.id]
+    assert data["created"] == {str(rooms[0].id): 30, str(rooms[1].id): 31, str(rooms[2].id): 4}
+    assert data["total_created"] == 65
+    assert _seat_codes(db_session, rooms[0].id)[-1] == ("B", 15)
+    vip = db_session.scalars(select(Seat).where(Seat.room_id == rooms[2].id)).all()
+    assert {(s.row, s.seat_type, s.price_modifier) for s in vip} == {("VIP", "vip", 1.5)}
+
+    payload = {"rooms": [{"room_id": test_room.id}], "overwrite": True}
+    assert client.post("/rooms/generate-seats", json=payload, headers=admin_headers).json()["created"] == {str(test_room.id): 50}
+    assert db_session.scalar(select(func.count()).select_from(Seat)) == 115
+
+
+@pytest.mark.api
+def test_generate_seats_batch_missing_room(client: TestClient, admin_headers, test_room):
+    """Test batch chứa phòng không tồn tại bị từ chối toàn bộ"""
+    payload = {"rooms": [{"room_id": test_room.id}, {"room_id": 99999}]}
+    response = client.post("/rooms/generate-seats", json=payload, headers=admin_headers)
+
+    assert response.status_code == 404
+    assert "99999" in response.json()["detail"]
+
+
+@pytest.mark.api
+def test_generate_seats_overwrite_rejects_booked_seats(client: TestClient, admin_headers, db_session,
+                                                       test_user, test_showtime, test_room, test_seats):
+    """Test overwrite ghế đang có booking pending / confirmed bị từ chối (không cascade xóa booking)"""
+    booking = Booking(user_id=test_user.id, showtime_id=test_showtime.id, seat_id=test_seats[0].id,
+                      price=100000.0, status="confirmed")
+    db_session.add(booking)
+    db_session.commit()
+
+    response = client.post(f"/rooms/{test_room.id}/generate-seats?overwrite=true", headers=admin_headers)
+    assert response.status_code == 409
+    assert str(test_room.id) in response.json()["detail"]
+
+    payload = {"rooms": [{"room_id": test_room.id}], "overwrite": True}
+    assert client.post("/rooms/generate-seats", json=payload, headers=admin_headers).status_code == 409
+
+    db_session.expire_all()
+    assert len(_seat_codes(db_session, test_room.id)) == 10
+    assert db_session.get(Booking, booking.id).status == "confirmed"
+
+    # Booking đã hủy không giữ ghế -> sinh lại được
+    booking.status = "cancelled"
+    db_session.commit()
+    response = client.post(f"/rooms/{test_room.id}/generate-seats?overwrite=true", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == {"created": 50}
@@ -0,0 +1,82 @@
+"""
+Integration tests cho Seat API (sơ đồ ghế + ETag)
+"""
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import captured_statements
+
+
+@pytest.mark.api
+def test_seat_map_is_columnar(client: TestClient, test_room, test_seats):
+    """Test sơ đồ ghế dạng cột theo thứ tự (row, number)"""
+    response = client.get(f"/seats/room/{test_room.id}/map")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["seat_count"] == 10
+    assert data["rows"] == ["A", "B"]
+    assert data["row_index"] == [0] * 5 + [1] * 5
+    assert data["numbers"] == [1, 2, 3, 4, 5] * 2
+    assert [data["types"][i] for i in data["type_index"]] == ["standard"] * 10
+    assert base64.b64decode(data["active"]) == b"\xff\x03"
+    assert response.headers["ETag"] == f'"seatmap-{test_room.id}-v0"'
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+@pytest.mark.api
+def test_seat_map_not_modified_without_database(client: TestClient, admin_headers, test_room, test_seats):
+    """Test If-None-Match khớp -> 304 không query; sửa ghế / sinh lại ghế đổi ETag"""
+    etag = client.get(f"/seats/room/{test_room.id}/map").headers["ETag"]
+
+    with captured_statements() as statements:
+        response = client.get(f"/seats/room/{test_room.id}/map", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert statements == []
+
+    seat = test_seats[0]
+    payload = {"row": seat.row, "number": seat.number, "seat_type": "vip", "price_modifier": 1.5, "room_id": test_room.id}
+    assert client.put(f"/seats/{seat.id}", json=payload, headers=admin_headers).status_code == 200
+
+    response = client.get(f"/seats/room/{test_room.id}/map", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"seatmap-{test_room.id}-v1"'
+    assert response.json()["types"] == ["vip", "standard"]
+    assert response.json()["price_modifiers"][0] == 1.5
+
+    client.post(f"/rooms/{test_room.id}/generate-seats?overwrite=true", headers=admin_headers)
+    response = client.get(f"/seats/room/{test_room.id}/map")
+    assert response.headers["ETag"] == f'"seatmap-{test_room.id}-v2"'
+    assert response.json()["seat_count"] == 50
+
+
+@pytest.mark.api
+def test_seat_change_bumps_map_version_in_same_transaction(client: TestClient, admin_headers, test_room, test_seats):
+    """Test tạo / sửa / xóa ghế và tăng seat_map_version nằm trong 1 transaction (1 commit)"""
+    payload = {"row": "C", "number": 1, "seat_type": "standard", "price_modifier": 1.0, "room_id": test_room.id}
+
+    with captured_statements() as statements:
+        response = client.post("/seats/", json=payload, headers=admin_headers)
+        seat_id = response.json()["id"]
+        client.put(f"/seats/{seat_id}", json={**payload, "seat_type": "vip"}, headers=admin_headers)
+        client.delete(f"/seats/{seat_id}", headers=admin_headers)
+
+    # "INSERT INTO seats ..." -> "INSERT seats", "UPDATE rooms SET ..." -> "UPDATE rooms"
+    writes = [
+        " ".join(word for word in statement.split()[:3] if word not in ("INTO", "FROM", "SET"))
+        for statement in statements if not statement.lstrip().upper().startswith("SELECT")
+    ]
+    assert writes == [
+        "INSERT seats", "UPDATE rooms", "COMMIT",
+        "UPDATE seats", "UPDATE rooms", "COMMIT",
+        "DELETE seats", "UPDATE rooms", "COMMIT",
+    ]
+    assert client.get(f"/seats/room/{test_room.id}/map").headers["ETag"] == f'"seatmap-{test_room.id}-v3"'
+
+
+@pytest.mark.api
+def test_seat_map_room_not_found(client: TestClient):
+    """Test sơ đồ ghế của phòng không tồn tại"""
+    assert client.get("/seats/room/99999/map").status_code == 404
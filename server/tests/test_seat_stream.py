@@ -0,0 +1,147 @@
+"""
+Tests cho stream trạng thái ghế (SSE) GET /showtimes/{id}/seats/stream
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.seat_stream_service import SeatStreamService, seat_stream_service
+from tests.conftest import TestingSessionLocal
+
+
+def _parse_event(chunk: str) -> tuple:
+    """'event: x\\ndata: {...}\\n\\n' -> (x, dict)."""
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class SSEConnection:
+    """Gọi thẳng ASGI app (TestClient buffer cả response nên không đọc được stream vô hạn)."""
+
+    def __init__(self, path: str):
+        self.scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"testserver"), (b"accept", b"text/event-stream")],
+            "client": ("testclient", 50000), "server": ("testserver", 80),
+        }
+        self.status = None
+        self.headers = {}
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self._disconnected = asyncio.Event()
+        self._request_sent = False
+        self.task = None
+
+    async def _receive(self):
+        if not self._request_sent:
+            self._request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self._disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body" and message.get("body"):
+            await self.chunks.put(message["body"].decode())
+
+    def open(self) -> None:
+        self.task = asyncio.create_task(app(self.scope, self._receive, self._send))
+
+    async def next_event(self) -> tuple:
+        while True:
+            chunk = await asyncio.wait_for(self.chunks.get(), 5)
+            if not chunk.startswith(":"):
+                return _parse_event(chunk)
+
+    async def close(self) -> None:
+        self._disconnected.set()
+        await asyncio.wait_for(self.task, 5)
+
+
+def _booking_payload(user, showtime, seats) -> list:
+    return [{"showtime_id": showtime.id, "seat_id": s.id, "price": 100000.0, "user_id": user.id} for s in seats]
+
+
+@pytest.mark.api
+async def test_seat_stream_snapshot_then_deltas(client: TestClient, auth_headers, test_user, test_showtime, test_seats):
+    """Test stream gửi snapshot rồi delta khi đặt / hủy ghế, và bỏ subscriber khi client ngắt"""
+    connection = SSEConnection(f"/showtimes/{test_showtime.id}/seats/stream")
+    connection.open()
+
+    name, snapshot = await connection.next_event()
+    assert connection.status == 200
+    assert connection.headers["content-type"].startswith("text/event-stream")
+    assert name == "snapshot"
+    assert snapshot["seat_count"] == len(test_seats)
+    assert snapshot["booked_count"] == 0
+    assert seat_stream_service.stats()["subscribers"] == 1
+
+    response = await asyncio.to_thread(
+        client.post, "/bookings/group", headers=auth_headers,
+        json=_booking_payload(test_user, test_showtime, test_seats[:2]),
+    )
+    assert response.status_code == 201
+    name, delta = await connection.next_event()
+    assert name == "delta"
+    assert delta == {"showtime_id": test_showtime.id, "booked": [test_seats[0].id, test_seats[1].id], "released": []}
+
+    booking_id = response.json()[0]["id"]
+    response = await asyncio.to_thread(client.put, f"/bookings/{booking_id}/cancel", headers=auth_headers)
+    assert response.status_code == 200
+    name, delta = await connection.next_event()
+    assert name == "delta"
+    assert delta["released"] == [test_seats[0].id]
+
+    await connection.close()
+    assert seat_stream_service.stats()["subscribers"] == 0
+
+
+@pytest.mark.api
+async def test_seat_stream_slow_client_gets_fresh_snapshot(test_showtime, test_seats):
+    """Test queue đầy thì delta bị bỏ và client nhận lại snapshot thay vì queue phình ra"""
+    service = SeatStreamService(max_queue=2, keepalive_seconds=5, session_factory=TestingSessionLocal)
+    events = await service.open(test_showtime.id)
+    assert _parse_event(await events.__anext__())[0] == "snapshot"
+
+    for seat in test_seats[:5]:
+        service.publish(test_showtime.id, booked=[seat.id])
+    await asyncio.sleep(0)
+
+    assert service.stats()["dropped"] == 3
+    name, _ = _parse_event(await events.__anext__())
+    assert name == "snapshot"
+    await events.aclose()
+    assert service.stats()["subscribers"] == 0
+
+
+@pytest.mark.api
+def test_seat_stream_unknown_showtime(client: TestClient):
+    """Test suất chiếu không tồn tại trả về 404 thay vì mở stream"""
+    response = client.get("/showtimes/99999/seats/stream")
+
+    assert response.status_code == 404
+    assert seat_stream_service.stats()["subscribers"] == 0
+
+
+@pytest.mark.api
+async def test_seat_stream_remote_delta_updates_snapshot(test_showtime, test_seats):
+    """Test delta từ worker khác (qua deliver) được áp vào bitmap nên snapshot tiếp theo khớp với delta"""
+    service = SeatStreamService(max_queue=1, keepalive_seconds=5, session_factory=TestingSessionLocal)
+    events = await service.open(test_showtime.id)
+    assert _parse_event(await events.__anext__())[1]["booked_count"] == 0
+
+    # Booking được tạo ở worker khác: DB của test không có booking nào, chỉ có event qua Redis
+    service.deliver({"showtime_id": test_showtime.id, "booked": [test_seats[0].id, test_seats[1].id], "released": []})
+    service.deliver({"showtime_id": test_showtime.id, "booked": [], "released": [test_seats[0].id]})
+    await asyncio.sleep(0)
+
+    # Queue 1 chỗ -> client chậm nhận RESYNC snapshot, phải phản ánh cả 2 delta
+    name, snapshot = _parse_event(await events.__anext__())
+    assert name == "snapshot"
+    assert snapshot["booked_count"] == 1
+    await events.aclose()
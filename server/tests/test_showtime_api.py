@@ -0,0 +1,96 @@
+"""
+Integration tests cho Showtime API endpoints
+"""
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.api
+def test_showtimes_cursor_pagination_breaks_ties_by_id(client: TestClient, db_session, test_movie, test_room):
+    """Test cursor (start_time, id): các suất chiếu trùng start_time không bị lặp hay bỏ sót giữa các trang"""
+    from app.models import Showtime
+
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    for offset_hours in (0, 0, 0, 3, 3):
+        db_session.add(Showtime(
+            movie_id=test_movie.id,
+            room_id=test_room.id,
+            start_time=start + timedelta(hours=offset_hours),
+            end_time=start + timedelta(hours=offset_hours + 2),
+            base_price=100000.0,
+        ))
+    db_session.commit()
+
+    seen = []
+    url = "/showtimes?size=2"
+    while url:
+        page = client.get(url).json()
+        seen += [(s["start_time"], s["id"]) for s in page["data"]]
+        url = f"/showtimes?size=2&with_total=false&cursor={page['next_cursor']}" if page["next_cursor"] else None
+
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+    by_movie = client.get(f"/showtimes/movie/{test_movie.id}?size=3").json()
+    rest = client.get(f"/showtimes/movie/{test_movie.id}?size=3&cursor={by_movie['next_cursor']}").json()
+    assert [s["id"] for s in by_movie["data"] + rest["data"]] == [s[1] for s in seen]
+
+
+@pytest.mark.unit
+def test_find_schedule_conflicts_sweep():
+    """Test sweep-line: trùng với suất đã có (kể cả suất dài bắt đầu sớm) và trùng giữa các dòng"""
+    from app.services.showtime_service import find_schedule_conflicts
+
+    t = lambda hour: datetime(2030, 1, 1) + timedelta(hours=hour)
+    existing = [(10, t(0), t(10)), (11, t(12), t(13))]
+    proposals = [
+        (0, t(10), t(12)),    # vừa khít giữa 2 suất -> hợp lệ
+        (1, t(9), t(11)),     # chồng lên suất 10
+        (2, t(11), t(12.5)),  # chồng lên suất 11
+        (3, t(14), t(16)),
+        (4, t(15), t(17)),    # chồng lên dòng 3
+        (5, t(16), t(18)),    # dòng 4 bị loại nên không chặn dòng 5
+    ]
+
+    assert find_schedule_conflicts(existing, proposals) == {
+        1: ("showtime", 10),
+        2: ("showtime", 11),
+        4: ("row", 3),
+    }
+
+
+@pytest.mark.api
+@pytest.mark.query_budget(8)
+def test_import_showtimes_reports_conflicts(client: TestClient, admin_headers, db_session, test_movie, test_room, test_showtime):
+    """Test import lịch chiếu: dòng hợp lệ được tạo trong 1 lần, dòng trùng giờ được báo theo index"""
+    from app.models import Showtime
+
+    start = test_showtime.start_time.replace(tzinfo=None)
+    row = lambda hours, room_id=test_room.id: {
+        "movie_id": test_movie.id,
+        "room_id": room_id,
+        "start_time": (start + timedelta(hours=hours)).isoformat(),
+        "end_time": (start + timedelta(hours=hours + 2)).isoformat(),
+        "base_price": 90000,
+    }
+    payload = {"showtimes": [row(2), row(1), row(4), row(5), row(10, room_id=99999)]}
+
+    response = client.post("/showtimes/import", json=payload, headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert [(c["index"], c["conflicting_showtime_id"], c["conflicting_index"]) for c in data["conflicts"]] == [
+        (1, test_showtime.id, None),
+        (3, None, 2),
+        (4, None, None),
+    ]
+    assert data["conflicts"][2]["reason"] == "Room not found"
+    created = db_session.query(Showtime).filter(Showtime.id.in_(data["created_ids"])).order_by(Showtime.id).all()
+    assert [s.start_time for s in created] == [start + timedelta(hours=2), start + timedelta(hours=4)]
+
+    payload = {"showtimes": [row(8), row(3)], "all_or_nothing": True}
+    data = client.post("/showtimes/import", json=payload, headers=admin_headers).json()
+    assert data["created"] == 0
+    assert [c["index"] for c in data["conflicts"]] == [1]